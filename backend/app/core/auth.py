@@ -160,6 +160,15 @@ async def get_current_user_optional(
         return None
 
 
+# 역할별 접근 가능한 access_level
+ROLE_ACCESS_LEVELS = {
+    "guest": {"public"},
+    "user": {"public", "user"},
+    "moderator": {"public", "user", "moderator"},
+    "admin": {"public", "user", "moderator", "admin"},
+}
+
+
 def require_admin(
     current_user: Dict[str, Any] = Depends(get_current_user),
 ) -> Dict[str, Any]:
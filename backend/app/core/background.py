@@ -0,0 +1,28 @@
+import asyncio
+from typing import Optional
+
+
+class BackgroundService:
+    """애플리케이션 수명 동안 도는 백그라운드 작업의 시작/종료 관리
+
+    하위 클래스는 `_run`만 구현하고, main.py의 startup/shutdown에서
+    `start()`와 `stop()`을 호출한다.
+    """
+
+    _task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        raise NotImplementedError
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,127 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReplaceOne
+
+from .database import database
+from .dates import parse_datetime
+
+
+def archive_label(year: int, month: int) -> str:
+    return f"{year}년 {month}월"
+
+
+def archive_bucket(year: int, month: int, count: int) -> Dict[str, Any]:
+    return {
+        "_id": f"{year:04d}-{month:02d}",
+        "year": year,
+        "month": month,
+        "label": archive_label(year, month),
+        "count": count,
+    }
+
+
+def created_at_range(year: int, month: Optional[int] = None) -> Dict[str, Any]:
+    """연/월 단위 `created_at` 범위 조건
+
+    `created_at`은 ISO 문자열과 datetime이 섞여 저장되어 있고 MongoDB 비교는 같은
+    타입끼리만 이루어지므로, 두 타입의 범위를 `$or`로 묶는다. 두 조건 모두 같은
+    인덱스 범위 조회로 처리된다.
+    """
+    if month is None:
+        start, end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+        start_text, end_text = f"{year:04d}", f"{year + 1:04d}"
+    else:
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        start, end = datetime(year, month, 1), datetime(next_year, next_month, 1)
+        start_text = f"{year:04d}-{month:02d}"
+        end_text = f"{next_year:04d}-{next_month:02d}"
+
+    return {
+        "$or": [
+            {"created_at": {"$gte": start_text, "$lt": end_text}},
+            {"created_at": {"$gte": start, "$lt": end}},
+        ]
+    }
+
+
+async def rebuild_archive() -> List[Dict[str, Any]]:
+    """게시된 글의 연/월별 개수를 집계 한 번으로 다시 계산해 `blog_archive`에 저장"""
+    pipeline = [
+        {"$match": {"published": True, "created_at": {"$type": ["string", "date"]}}},
+        {
+            "$group": {
+                "_id": {
+                    "$cond": [
+                        {"$eq": [{"$type": "$created_at"}, "string"]},
+                        {"$substrCP": ["$created_at", 0, 7]},
+                        {"$dateToString": {"format": "%Y-%m", "date": "$created_at"}},
+                    ]
+                },
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+    rows = (
+        await database.get_collection("blog_posts")
+        .aggregate(pipeline)
+        .to_list(length=None)
+    )
+
+    buckets = []
+    for row in rows:
+        try:
+            year, month = (int(part) for part in row["_id"].split("-"))
+        except (AttributeError, ValueError):
+            continue
+        buckets.append(archive_bucket(year, month, row["count"]))
+
+    collection = database.get_collection("blog_archive")
+    if buckets:
+        await collection.bulk_write(
+            [ReplaceOne({"_id": b["_id"]}, b, upsert=True) for b in buckets],
+            ordered=False,
+        )
+    await collection.delete_many({"_id": {"$nin": [b["_id"] for b in buckets]}})
+
+    buckets.sort(key=lambda bucket: bucket["_id"], reverse=True)
+    return buckets
+
+
+async def get_archive() -> List[Dict[str, Any]]:
+    """연/월별 게시물 수 (최신순, 없으면 집계로 생성)"""
+    cursor = database.get_collection("blog_archive").find().sort("_id", -1)
+    buckets = await cursor.to_list(length=None)
+    if not buckets:
+        return await rebuild_archive()
+    return buckets
+
+
+async def update_archive(created_at: Any, delta: int) -> None:
+    """게시/게시 취소에 맞춰 해당 월의 게시물 수 증감
+
+    Args:
+        created_at: 게시물 작성 시각 (저장된 값 그대로)
+        delta: 게시 시 1, 게시 취소/삭제 시 -1
+    """
+    created = parse_datetime(created_at)
+    if created is None or not delta:
+        return
+
+    collection = database.get_collection("blog_archive")
+    if await collection.count_documents({}, limit=1) == 0:
+        # 아직 생성 전이면 이번 변경까지 포함해 집계로 생성
+        await rebuild_archive()
+        return
+
+    bucket = archive_bucket(created.year, created.month, 0)
+    await collection.update_one(
+        {"_id": bucket["_id"]},
+        {
+            "$inc": {"count": delta},
+            "$setOnInsert": {key: bucket[key] for key in ("year", "month", "label")},
+        },
+        upsert=True,
+    )
+    if delta < 0:
+        await collection.delete_one({"_id": bucket["_id"], "count": {"$lte": 0}})
@@ -0,0 +1,267 @@
+import asyncio
+import heapq
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pymongo import DeleteOne, ReplaceOne
+
+from .background import BackgroundService
+from .config import settings
+from .database import database, object_id_or_str
+
+# 특성 종류별 가중치 (카테고리는 태그보다 범위가 넓어 낮게)
+TAG_WEIGHT = 1.0
+CATEGORY_WEIGHT = 0.5
+
+Features = Dict[str, float]
+
+
+def post_features(post: Dict[str, Any]) -> Features:
+    """게시물의 태그/카테고리를 가중치 특성 집합으로 변환"""
+    features: Features = {}
+    for tag in post.get("tags") or []:
+        features[f"tag:{tag}"] = TAG_WEIGHT
+    for category in post.get("categories") or []:
+        features[f"category:{category}"] = CATEGORY_WEIGHT
+    return features
+
+
+def weighted_jaccard(a: Features, b: Features) -> float:
+    """가중 Jaccard 유사도: Σ min(a, b) / Σ max(a, b)"""
+    numerator = 0.0
+    denominator = 0.0
+    for feature in a.keys() | b.keys():
+        left = a.get(feature, 0.0)
+        right = b.get(feature, 0.0)
+        numerator += min(left, right)
+        denominator += max(left, right)
+    return numerator / denominator if denominator else 0.0
+
+
+class BlogRelatedIndex(BackgroundService):
+    """태그/카테고리 겹침 기반 블로그 연관 게시물 인덱스
+
+    특성(태그/카테고리)→게시물 역색인을 메모리에 유지하고, 게시물별 가중 Jaccard
+    상위 이웃을 `blog_related` 컬렉션에 저장한다. 게시물이 바뀌면 그 게시물과
+    변경 전후 특성을 공유하는 게시물만 다시 계산한다. 다른 워커의 변경은 주기적
+    전체 재구축으로 반영된다.
+    """
+
+    PROJECTION = {
+        "title": 1,
+        "slug": 1,
+        "tags": 1,
+        "categories": 1,
+        "access_level": 1,
+    }
+
+    def __init__(self):
+        self.top_k = settings.RELATED_CONTENT_TOP_K
+        # 권한 필터링 후에도 k개를 채울 수 있도록 여유분을 함께 저장
+        self.keep = self.top_k * 2
+        self.refresh_interval = settings.RELATED_CONTENT_REFRESH_SECONDS
+        self.rebuild_interval = settings.RELATED_CONTENT_REBUILD_SECONDS
+
+        self._features: Dict[str, Features] = {}
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._neighbors: Dict[str, List[Tuple[float, str]]] = {}
+        self._pending: Set[str] = set()
+        self._last_rebuild: Optional[datetime] = None
+
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+
+    def get_collection(self):
+        return database.get_collection("blog_related")
+
+    # ------------------------------------------------------------------
+    # 메모리 인덱스
+    # ------------------------------------------------------------------
+
+    def _set_post(self, post: Dict[str, Any]) -> None:
+        post_id = str(post["_id"])
+        self._drop_post(post_id)
+        features = post_features(post)
+        self._features[post_id] = features
+        self._meta[post_id] = {
+            "id": post_id,
+            "title": post.get("title", ""),
+            "slug": post.get("slug"),
+            "access_level": post.get("access_level", "public"),
+        }
+        for feature in features:
+            self._postings[feature].add(post_id)
+
+    def _drop_post(self, post_id: str) -> None:
+        for feature in self._features.pop(post_id, {}):
+            postings = self._postings.get(feature)
+            if postings is not None:
+                postings.discard(post_id)
+                if not postings:
+                    del self._postings[feature]
+        self._meta.pop(post_id, None)
+        self._neighbors.pop(post_id, None)
+
+    def _sharing(self, features: Features) -> Set[str]:
+        """특성을 하나 이상 공유하는 게시물 (역색인 합집합)"""
+        candidates: Set[str] = set()
+        for feature in features:
+            candidates |= self._postings.get(feature, set())
+        return candidates
+
+    def _compute(self, post_id: str) -> List[Tuple[float, str]]:
+        features = self._features.get(post_id, {})
+        scored = (
+            (weighted_jaccard(features, self._features[other]), other)
+            for other in self._sharing(features)
+            if other != post_id
+        )
+        return heapq.nlargest(
+            self.keep, ((score, other) for score, other in scored if score > 0)
+        )
+
+    # ------------------------------------------------------------------
+    # 갱신 작업
+    # ------------------------------------------------------------------
+
+    async def _load(self, post_ids: Optional[List[str]] = None) -> List[Dict]:
+        query: Dict[str, Any] = {"published": True}
+        if post_ids is not None:
+            query["_id"] = {"$in": [object_id_or_str(value) for value in post_ids]}
+        cursor = database.get_collection("blog_posts").find(query, self.PROJECTION)
+        return await cursor.to_list(length=None)
+
+    def _rebuild(self, posts: List[Dict]) -> None:
+        """메모리 인덱스와 모든 게시물의 이웃 재계산"""
+        self._features.clear()
+        self._meta.clear()
+        self._postings.clear()
+        self._neighbors.clear()
+        for post in posts:
+            self._set_post(post)
+        for post_id in self._features:
+            self._neighbors[post_id] = self._compute(post_id)
+
+    def _apply_changes(
+        self, post_ids: Set[str], loaded: Dict[str, Dict]
+    ) -> Tuple[Set[str], List[str]]:
+        """변경 게시물을 반영하고 이웃이 바뀐 게시물과 삭제된 게시물 반환"""
+        affected: Set[str] = set()
+        for post_id in post_ids:
+            affected |= self._sharing(self._features.get(post_id, {}))
+
+        removed = [post_id for post_id in post_ids if post_id not in loaded]
+        for post_id in removed:
+            self._drop_post(post_id)
+        for post_id, post in loaded.items():
+            self._set_post(post)
+            affected |= self._sharing(self._features[post_id])
+        affected |= set(loaded)
+        affected -= set(removed)
+
+        dirty = set()
+        for post_id in affected:
+            neighbors = self._compute(post_id)
+            # 이웃의 제목/slug가 바뀐 경우도 저장된 행을 다시 써야 함
+            if neighbors != self._neighbors.get(post_id) or any(
+                other in loaded for _, other in neighbors
+            ):
+                self._neighbors[post_id] = neighbors
+                dirty.add(post_id)
+        return dirty, removed
+
+    async def rebuild(self) -> int:
+        """전체 재구축 (계산은 스레드에서 실행해 이벤트 루프를 막지 않음)"""
+        async with self._lock:
+            posts = await self._load()
+            await asyncio.to_thread(self._rebuild, posts)
+
+            await self._persist(set(self._neighbors), [])
+            await self.get_collection().delete_many(
+                {"_id": {"$nin": list(self._features)}}
+            )
+            self._last_rebuild = datetime.utcnow()
+            print(f"🏷️ Blog related posts rebuilt: {len(posts)} posts")
+            return len(posts)
+
+    async def update(self, post_ids: Set[str]) -> int:
+        """변경된 게시물과 변경 전후 특성을 공유하는 게시물만 다시 계산"""
+        async with self._lock:
+            loaded = {str(post["_id"]): post for post in await self._load(post_ids)}
+            dirty, removed = await asyncio.to_thread(
+                self._apply_changes, post_ids, loaded
+            )
+
+            await self._persist(dirty, removed)
+            return len(dirty)
+
+    async def _persist(self, dirty: Set[str], removed: List[str]) -> None:
+        now = datetime.utcnow()
+        operations = []
+        for post_id in dirty:
+            related = []
+            for score, other in self._neighbors.get(post_id, []):
+                meta = self._meta.get(other)
+                if meta:
+                    related.append({**meta, "score": round(score, 4)})
+            operations.append(
+                ReplaceOne(
+                    {"_id": post_id},
+                    {
+                        "_id": post_id,
+                        "access_level": self._meta[post_id]["access_level"],
+                        "related": related,
+                        "updated_at": now,
+                    },
+                    upsert=True,
+                )
+            )
+        operations.extend(DeleteOne({"_id": post_id}) for post_id in removed)
+
+        collection = self.get_collection()
+        for start in range(0, len(operations), 500):
+            await collection.bulk_write(operations[start : start + 500], ordered=False)
+
+    async def get_related(self, post_id: str) -> Optional[Dict[str, Any]]:
+        """저장된 이웃 목록 조회 (`_id` 단건 조회)"""
+        return await self.get_collection().find_one({"_id": post_id})
+
+    # ------------------------------------------------------------------
+    # 백그라운드 실행
+    # ------------------------------------------------------------------
+
+    def request_update(self, post_id: str) -> None:
+        """게시물 생성/수정/삭제 시 해당 게시물 갱신 요청"""
+        self._pending.add(str(post_id))
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if (
+                    self._last_rebuild is None
+                    or (datetime.utcnow() - self._last_rebuild).total_seconds()
+                    >= self.rebuild_interval
+                ):
+                    # 최초 실행 및 다른 워커의 변경 반영을 위한 주기적 전체 재구축
+                    self._pending.clear()
+                    await self.rebuild()
+                elif self._pending:
+                    pending, self._pending = self._pending, set()
+                    await self.update(pending)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Blog related posts refresh error: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+# 전역 블로그 연관 게시물 인덱스 인스턴스
+blog_related_index = BlogRelatedIndex()
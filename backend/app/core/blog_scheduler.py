@@ -0,0 +1,115 @@
+import asyncio
+import heapq
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from .background import BackgroundService
+from .blog_archive import update_archive
+from .blog_related import blog_related_index
+from .cache import response_cache
+from .config import settings
+from .database import database, object_id_or_str
+from .related import related_index
+from .revalidation import revalidation_service
+
+
+class PublishScheduler(BackgroundService):
+    """블로그 예약 발행 스케줄러
+
+    앞으로 `horizon` 이내에 발행할 게시물을 (publish_at, ID) 힙에 올려 두고 가장
+    이른 시각까지만 대기한다. 시작 시와 `horizon`의 절반마다 인덱스 범위 조회
+    한 번으로 힙을 다시 채우며, 이 조회가 재시작 중 놓친 발행(publish_at이 이미
+    지난 게시물)도 함께 가져온다.
+
+    발행은 `published: False`와 예약 시각이 그대로일 때만 적용되는 조건부 업데이트라
+    여러 워커가 같은 게시물을 처리해도 한 번만 발행되고, 예약이 바뀐 오래된 힙
+    항목은 아무 것도 하지 않는다.
+    """
+
+    def __init__(self):
+        self.horizon = timedelta(seconds=settings.BLOG_PUBLISH_HORIZON_SECONDS)
+        self._heap: List[Tuple[datetime, str]] = []
+        self._next_reload: Optional[datetime] = None
+        self._wakeup = asyncio.Event()
+
+    async def _reload(self) -> None:
+        """발행 대기 게시물 조회 (놓친 발행 포함, 인덱스 범위 조회 1회)"""
+        now = datetime.utcnow()
+        cursor = database.get_collection("blog_posts").find(
+            {"published": False, "publish_at": {"$lte": now + self.horizon}},
+            {"publish_at": 1},
+        )
+        heap = [(post["publish_at"], str(post["_id"])) async for post in cursor]
+        heapq.heapify(heap)
+        self._heap = heap
+        self._next_reload = now + self.horizon / 2
+
+    def schedule(self, post_id: str, publish_at: datetime) -> None:
+        """예약 발행 등록 (horizon 밖이면 다음 재적재 때 올라옴)"""
+        if self._next_reload is None:
+            return
+        if publish_at <= self._next_reload + self.horizon / 2:
+            heapq.heappush(self._heap, (publish_at, str(post_id)))
+            self._wakeup.set()
+
+    async def _publish(self, post_id: str, publish_at: datetime) -> bool:
+        now = datetime.utcnow()
+        post = await database.get_collection("blog_posts").find_one_and_update(
+            {
+                "_id": object_id_or_str(post_id),
+                "published": False,
+                "publish_at": publish_at,
+            },
+            {
+                "$set": {
+                    "published": True,
+                    "published_at": now,
+                    "updated_at": now.isoformat() + "Z",
+                },
+                "$unset": {"publish_at": ""},
+            },
+            projection={"title": 1, "created_at": 1},
+        )
+        if post is None:
+            return False
+
+        print(f"🗓️ Blog post published on schedule: {post.get('title')} ({post_id})")
+        # 목록/피드 캐시 버전 갱신 → 다음 요청 때 피드 재생성
+        await update_archive(post.get("created_at"), 1)
+        response_cache.bump("blog_posts")
+        related_index.request_refresh()
+        blog_related_index.request_update(post_id)
+        revalidation_service.trigger_revalidation_background("blog-published", post_id)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                now = datetime.utcnow()
+                if self._next_reload is None or now >= self._next_reload:
+                    await self._reload()
+
+                while self._heap and self._heap[0][0] <= now:
+                    publish_at, post_id = heapq.heappop(self._heap)
+                    await self._publish(post_id, publish_at)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Blog publish scheduler error: {e}")
+                # 실패 시 다음 주기에 다시 적재
+                self._next_reload = datetime.utcnow() + timedelta(seconds=30)
+
+            deadline = self._next_reload
+            if self._heap and self._heap[0][0] < deadline:
+                deadline = self._heap[0][0]
+            timeout = max((deadline - datetime.utcnow()).total_seconds(), 0)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+# 전역 예약 발행 스케줄러 인스턴스
+publish_scheduler = PublishScheduler()
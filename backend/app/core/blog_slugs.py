@@ -0,0 +1,36 @@
+import re
+
+from .database import database
+
+# URL 경로에 쓰기 곤란한 문자 (단어 문자와 하이픈 외)
+_UNSAFE_SLUG_CHARS = re.compile(r"[^\w-]+")
+
+
+def slugify(title: str) -> str:
+    """제목으로 slug 생성 (한글 등 단어 문자는 유지하고 나머지는 하이픈으로)"""
+    slug = _UNSAFE_SLUG_CHARS.sub("-", title.strip().lower())
+    slug = re.sub(r"-{2,}", "-", slug).strip("-")
+    return slug or "post"
+
+
+async def next_available_slug(base: str) -> str:
+    """이미 사용 중이면 `-2`, `-3` … 접미사를 붙인 slug
+
+    최종 중복 방지는 유니크 인덱스가 담당하고, 여기서는 빈 번호를 미리 고른다.
+    """
+    pattern = f"^{re.escape(base)}(?:-(\\d+))?$"
+    cursor = database.get_collection("blog_posts").find(
+        {"slug": {"$regex": pattern}}, {"slug": 1}
+    )
+
+    taken = set()
+    async for post in cursor:
+        suffix = post["slug"][len(base) :]
+        taken.add(int(suffix[1:]) if suffix else 1)
+
+    if 1 not in taken:
+        return base
+    number = 2
+    while number in taken:
+        number += 1
+    return f"{base}-{number}"
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from .cache import response_cache
+from .config import settings
+from .database import database
+
+# 최근 게시물 수
+RECENT_POSTS_LIMIT = 5
+
+
+async def compute_blog_stats() -> Dict[str, Any]:
+    """블로그 통계를 `$facet` 집계 한 번으로 계산"""
+    pipeline = [
+        {
+            "$facet": {
+                "totals": [
+                    {
+                        "$group": {
+                            "_id": None,
+                            "total_posts": {"$sum": 1},
+                            "published_posts": {
+                                "$sum": {"$cond": [{"$eq": ["$published", True]}, 1, 0]}
+                            },
+                            "total_views": {"$sum": {"$ifNull": ["$views", 0]}},
+                        }
+                    }
+                ],
+                "categories": [
+                    {"$unwind": "$categories"},
+                    {"$group": {"_id": "$categories", "count": {"$sum": 1}}},
+                ],
+                "recent_posts": [
+                    {"$match": {"published": True}},
+                    {"$sort": {"created_at": -1}},
+                    {"$limit": RECENT_POSTS_LIMIT},
+                    {"$project": {"title": 1, "slug": 1, "created_at": 1}},
+                ],
+            }
+        }
+    ]
+    result = (
+        await database.get_collection("blog_posts")
+        .aggregate(pipeline)
+        .to_list(length=1)
+    )
+    facets = result[0] if result else {}
+
+    totals = (facets.get("totals") or [{}])[0]
+    total_posts = totals.get("total_posts", 0)
+    published_posts = totals.get("published_posts", 0)
+
+    recent_posts = facets.get("recent_posts", [])
+    for post in recent_posts:
+        post["id"] = str(post.pop("_id"))
+
+    return {
+        "total_posts": total_posts,
+        "published_posts": published_posts,
+        "draft_posts": total_posts - published_posts,
+        "total_views": totals.get("total_views", 0),
+        "category_stats": {
+            row["_id"]: row["count"] for row in facets.get("categories", [])
+        },
+        "recent_posts": recent_posts,
+    }
+
+
+class BlogStatsSnapshot:
+    """블로그 통계 스냅샷 (stale-while-revalidate)
+
+    스냅샷이 오래되었거나 블로그가 변경되면 기존 값을 즉시 반환하고 백그라운드에서
+    한 번만 다시 계산한다. 요청 경로에서 집계를 기다리는 것은 최초 1회뿐이다.
+    """
+
+    def __init__(self, max_age_seconds: int):
+        self.max_age_seconds = max_age_seconds
+        self._data: Optional[Dict[str, Any]] = None
+        self._computed_at = 0.0
+        self._version = -1
+        self._refreshing: Optional[asyncio.Task] = None
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._version == response_cache.version("blog_posts")
+            and time.monotonic() - self._computed_at < self.max_age_seconds
+        )
+
+    async def _refresh(self) -> Dict[str, Any]:
+        version = response_cache.version("blog_posts")
+        data = await compute_blog_stats()
+        self._data = data
+        self._computed_at = time.monotonic()
+        self._version = version
+        return data
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self._refresh()
+        except Exception as e:
+            print(f"❌ [Blog] Error refreshing blog stats: {e}")
+        finally:
+            self._refreshing = None
+
+    async def get(self) -> Dict[str, Any]:
+        if self._data is None:
+            return await self._refresh()
+
+        if not self._is_fresh() and self._refreshing is None:
+            self._refreshing = asyncio.create_task(self._refresh_in_background())
+        return self._data
+
+
+# 전역 블로그 통계 스냅샷 인스턴스
+blog_stats = BlogStatsSnapshot(settings.BLOG_STATS_MAX_AGE_SECONDS)
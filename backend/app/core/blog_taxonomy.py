@@ -0,0 +1,113 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+from pymongo import UpdateOne
+
+from .database import database
+
+# 분류 종류 (블로그 문서 필드 이름과 같음)
+TAXONOMY_KINDS = ("tags", "categories")
+
+
+def _unique_terms(field: str) -> Dict[str, Any]:
+    """게시물 내 중복을 제거한 분류 배열 (게시물 수 기준 집계용)"""
+    return {"$setUnion": [{"$ifNull": [f"${field}", []]}, []]}
+
+
+async def rebuild_taxonomy() -> Dict[str, Dict[str, int]]:
+    """태그/카테고리별 게시물 수를 집계 한 번으로 다시 계산해 `blog_taxonomy`에 저장"""
+    pipeline = [
+        {"$project": {kind: _unique_terms(kind) for kind in TAXONOMY_KINDS}},
+        {
+            "$facet": {
+                kind: [
+                    {"$unwind": f"${kind}"},
+                    {"$group": {"_id": f"${kind}", "count": {"$sum": 1}}},
+                ]
+                for kind in TAXONOMY_KINDS
+            }
+        },
+    ]
+    result = (
+        await database.get_collection("blog_posts")
+        .aggregate(pipeline)
+        .to_list(length=1)
+    )
+    facets = result[0] if result else {}
+
+    taxonomy = {}
+    collection = database.get_collection("blog_taxonomy")
+    for kind in TAXONOMY_KINDS:
+        rows = facets.get(kind, [])
+        taxonomy[kind] = {row["_id"]: row["count"] for row in rows}
+        await collection.replace_one(
+            {"_id": kind},
+            {
+                "terms": [
+                    {"name": row["_id"], "count": row["count"]}
+                    for row in sorted(rows, key=lambda row: row["_id"])
+                ]
+            },
+            upsert=True,
+        )
+    return taxonomy
+
+
+async def get_taxonomy(kind: str) -> Dict[str, int]:
+    """분류별 게시물 수 (문서 1건 조회, 없으면 집계로 생성)"""
+    document = await database.get_collection("blog_taxonomy").find_one({"_id": kind})
+    if document is None:
+        return (await rebuild_taxonomy())[kind]
+    return {term["name"]: term["count"] for term in document.get("terms", [])}
+
+
+async def update_taxonomy(
+    old_post: Optional[Dict[str, Any]], new_post: Optional[Dict[str, Any]]
+) -> None:
+    """게시물 생성/수정/삭제에 맞춰 분류별 게시물 수 증분 갱신
+
+    Args:
+        old_post: 변경 전 게시물 (생성 시 None)
+        new_post: 변경 후 게시물 (삭제 시 None)
+    """
+    collection = database.get_collection("blog_taxonomy")
+
+    for kind in TAXONOMY_KINDS:
+        deltas: Counter = Counter()
+        deltas.update(_terms(new_post, kind))
+        deltas.subtract(_terms(old_post, kind))
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            continue
+
+        if await collection.count_documents({"_id": kind}, limit=1) == 0:
+            # 아직 생성 전이면 이번 변경까지 포함해 집계로 생성
+            await rebuild_taxonomy()
+            return
+
+        # 없는 항목을 먼저 추가한 뒤 증감하고, 0 이하가 된 항목은 제거 (왕복 1회)
+        operations = []
+        for name, delta in deltas.items():
+            operations.append(
+                UpdateOne(
+                    {"_id": kind, "terms.name": {"$ne": name}},
+                    {"$push": {"terms": {"name": name, "count": 0}}},
+                )
+            )
+            operations.append(
+                UpdateOne(
+                    {"_id": kind},
+                    {"$inc": {"terms.$[term].count": delta}},
+                    array_filters=[{"term.name": name}],
+                )
+            )
+        operations.append(
+            UpdateOne({"_id": kind}, {"$pull": {"terms": {"count": {"$lte": 0}}}})
+        )
+        await collection.bulk_write(operations, ordered=True)
+
+
+def _terms(post: Optional[Dict[str, Any]], kind: str) -> Iterable[str]:
+    if not post:
+        return ()
+    return set(post.get(kind) or [])
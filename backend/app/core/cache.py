@@ -0,0 +1,75 @@
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Hashable, Optional, Tuple
+
+from .config import settings
+
+
+class ResponseCache:
+    """비로그인 사용자 목록 응답 캐시
+
+    JSON 직렬화가 끝난 bytes를 (네임스페이스, 버전, 요청 파라미터) 키로 보관한다.
+    네임스페이스(컬렉션 이름) 단위 버전을 쓰기 시 올려 이전 항목을 한 번에 무효화하고,
+    오래된 버전 항목은 LRU로 밀려난다. 버전은 프로세스 로컬이므로 다른 워커의 쓰기는
+    TTL 이내에 반영된다.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, bytes]]" = OrderedDict()
+        self._versions: Dict[str, int] = defaultdict(int)
+        self.hits = 0
+        self.misses = 0
+
+    def bump(self, namespace: str) -> None:
+        """네임스페이스의 캐시 항목 전체 무효화"""
+        self._versions[namespace] += 1
+
+    def version(self, namespace: str) -> int:
+        """네임스페이스의 현재 버전 (파생 데이터의 갱신 여부 판단용)"""
+        return self._versions[namespace]
+
+    def _key(self, namespace: str, version: int, params: Hashable) -> Tuple:
+        return (namespace, version, params)
+
+    def get(self, namespace: str, params: Hashable) -> Optional[bytes]:
+        key = self._key(namespace, self._versions[namespace], params)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, namespace: str, params: Hashable, body: bytes, version: int) -> None:
+        """응답 저장
+
+        Args:
+            version: 응답을 만들기 전(캐시 미스 시점)에 `version()`으로 읽은 버전.
+                조회 도중 쓰기로 버전이 올랐다면 이미 오래된 응답이므로 저장하지 않는다.
+        """
+        if self.max_entries <= 0 or version != self._versions[namespace]:
+            return
+        key = self._key(namespace, version, params)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# 전역 응답 캐시 인스턴스
+response_cache = ResponseCache(
+    settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS
+)
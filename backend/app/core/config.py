@@ -31,6 +31,47 @@ class Settings(BaseSettings):
     FRONTEND_URL: str = "http://localhost:3000"
     REVALIDATION_SECRET: str = "your-secret-key"
 
+    # 연관 콘텐츠 (TF-IDF) 설정
+    RELATED_CONTENT_TOP_K: int = 5
+    RELATED_CONTENT_REFRESH_SECONDS: int = 300
+    RELATED_CONTENT_REBUILD_SECONDS: int = 86400
+    RELATED_CONTENT_DEBOUNCE_SECONDS: int = 5
+
+    # 포럼 hot 순위 설정
+    FORUM_HOT_DECAY_SECONDS: int = 45000
+    FORUM_HOT_RECOMPUTE_SECONDS: int = 3600
+    FORUM_HOT_WINDOW_DAYS: int = 7
+
+    # 포럼 실시간 업데이트 설정 (local | change_stream)
+    FORUM_EVENTS_SOURCE: str = "local"
+    FORUM_EVENTS_QUEUE_SIZE: int = 100
+    FORUM_EVENTS_COALESCE_MS: int = 100
+
+    # 포럼 카운터 정합성 작업 설정
+    FORUM_RECONCILE_INTERVAL_SECONDS: int = 60
+    FORUM_RECONCILE_SETTLE_SECONDS: int = 30
+
+    # 포럼 신고 자동 숨김 임계값 (대기 중 신고 수, 0이면 비활성화)
+    FORUM_REPORT_AUTO_HIDE_THRESHOLD: int = 5
+
+    # 비로그인 목록 응답 캐시 설정
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+
+    # 블로그 통계 스냅샷 재계산 주기
+    BLOG_STATS_MAX_AGE_SECONDS: int = 60
+
+    # 블로그 예약 발행 스케줄러가 미리 적재할 시간 범위
+    BLOG_PUBLISH_HORIZON_SECONDS: int = 3600
+
+    # 이어 올리기 업로드 세션 만료 시간 및 만료 세션 정리 주기
+    UPLOAD_SESSION_TTL_SECONDS: int = 86400
+    UPLOAD_SESSION_SWEEP_INTERVAL_SECONDS: int = 600
+
+    # 이미지 리사이즈/형식 변환 결과 디스크 캐시 크기 및 변환 프로세스 수
+    IMAGE_DERIVATIVE_CACHE_MAX_BYTES: int = 536870912
+    IMAGE_DERIVATIVE_WORKERS: int = 2
+
     # OIDC/SSO 설정
     OIDC_ENABLED: bool = False
     OIDC_CLIENT_ID: str = ""
@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import math
+import re
+from typing import Any, Dict, Optional
+
+from pymongo import UpdateOne
+
+from .database import database
+
+# 파생 필드 계산 방식 버전 (계산 방식이 바뀌면 올려서 백필로 다시 계산)
+DERIVATION_VERSION = 2  # 2: excerpt_derived 플래그 추가
+
+# 분당 읽기 속도: 공백으로 구분되는 단어 / CJK 문자
+WORDS_PER_MINUTE = 200
+CJK_CHARS_PER_MINUTE = 500
+
+EXCERPT_LENGTH = 200
+
+# 파생 필드를 저장하는 컬렉션과 작성자가 직접 입력한 요약 필드 사용 여부
+CONTENT_COLLECTIONS = {
+    "blog_posts": True,
+    "forum_posts": False,
+    "docs": False,
+}
+
+_CJK_CHAR = (
+    "\u1100-\u11ff"  # 한글 자모
+    "\u3040-\u30ff"  # 히라가나, 가타카나
+    "\u3130-\u318f"  # 한글 호환 자모
+    "\u3400-\u4dbf"  # CJK 확장 A
+    "\u4e00-\u9fff"  # CJK 통합 한자
+    "\uac00-\ud7a3"  # 한글 음절
+    "\uf900-\ufaff"  # CJK 호환 한자
+)
+_CJK_RE = re.compile(f"[{_CJK_CHAR}]")
+_WORD_RE = re.compile(r"[^\W_]+(?:['’-][^\W_]+)*")
+
+_MARKDOWN_PATTERNS = [
+    (re.compile(r"```.*?```", re.S), " "),  # 코드 블록
+    (re.compile(r"~~~.*?~~~", re.S), " "),
+    (re.compile(r"<!--.*?-->", re.S), " "),  # HTML 주석
+    (re.compile(r"^(?:import|export)\s.*$", re.M), " "),  # MDX import/export
+    (re.compile(r"!\[([^\]]*)\]\([^)]*\)"), r"\1"),  # 이미지
+    (re.compile(r"\[([^\]]+)\]\([^)]*\)"), r"\1"),  # 링크
+    (re.compile(r"\[([^\]]+)\]\[[^\]]*\]"), r"\1"),  # 참조 링크
+    (re.compile(r"^\s*\[[^\]]+\]:\s+\S+.*$", re.M), " "),  # 링크 정의
+    (re.compile(r"<[^>]+>"), " "),  # HTML/JSX 태그
+    (re.compile(r"`([^`]*)`"), r"\1"),  # 인라인 코드
+    (re.compile(r"^\s{0,3}#{1,6}\s*", re.M), ""),  # 제목
+    (re.compile(r"^\s{0,3}>\s?", re.M), ""),  # 인용
+    (re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+", re.M), ""),  # 목록
+    (re.compile(r"^\s*(?:[-*_]\s*){3,}$", re.M), " "),  # 구분선
+    (re.compile(r"^\s*\|?(?:\s*:?-+:?\s*\|)+\s*:?-*:?\s*$", re.M), " "),  # 표 구분
+    (re.compile(r"\|"), " "),
+    (re.compile(r"(\*\*|__|\*|_|~~)(?=\S)(.+?)(?<=\S)\1"), r"\2"),  # 강조
+]
+
+
+def strip_markdown(text: str) -> str:
+    """Markdown/MDX 문법을 제거한 평문 (공백은 하나로 합침)"""
+    for pattern, replacement in _MARKDOWN_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return " ".join(text.split())
+
+
+def make_excerpt(plain_text: str, length: int = EXCERPT_LENGTH) -> str:
+    """평문 앞부분 요약 (가능하면 단어 경계에서 자름)"""
+    if len(plain_text) <= length:
+        return plain_text
+    cut = plain_text[:length]
+    boundary = cut.rfind(" ")
+    if boundary > length // 2:
+        cut = cut[:boundary]
+    return cut.rstrip(" .,;:") + "..."
+
+
+def count_words(plain_text: str) -> Dict[str, int]:
+    """CJK 문자 수와 그 외 단어 수
+
+    한글은 띄어쓰기를 하지만 음절당 정보량이 많아 문자 수로 읽기 시간을 계산하고,
+    띄어쓰기가 없는 중국어/일본어도 같은 방식으로 센다.
+    """
+    tokens = plain_text.split()
+    cjk_tokens = [token for token in tokens if _CJK_RE.search(token)]
+    plain_tokens = " ".join(token for token in tokens if not _CJK_RE.search(token))
+    return {
+        "cjk_chars": len(_CJK_RE.findall(plain_text)),
+        # 읽기 시간용: CJK 토큰에 섞인 영문 단어(예: "FastAPI와")도 포함
+        "other_words": len(_WORD_RE.findall(_CJK_RE.sub(" ", plain_text))),
+        "word_count": len(cjk_tokens) + len(_WORD_RE.findall(plain_tokens)),
+    }
+
+
+def derive_content_fields(
+    content: Optional[str], excerpt: Optional[str] = None
+) -> Dict[str, Any]:
+    """본문에서 저장용 파생 필드 계산
+
+    Args:
+        content: Markdown 본문
+        excerpt: 작성자가 입력한 요약 (있으면 Markdown만 제거해 사용)
+
+    Returns:
+        word_count, reading_time(분), excerpt, excerpt_derived(본문에서 만든 요약 여부),
+        content_hash, derived_version
+    """
+    content = content or ""
+    plain_text = strip_markdown(content)
+    counts = count_words(plain_text)
+    minutes = (
+        counts["other_words"] / WORDS_PER_MINUTE
+        + counts["cjk_chars"] / CJK_CHARS_PER_MINUTE
+    )
+
+    return {
+        "word_count": counts["word_count"],
+        "reading_time": max(1, math.ceil(minutes)),
+        "excerpt": strip_markdown(excerpt) if excerpt else make_excerpt(plain_text),
+        "excerpt_derived": not excerpt,
+        "content_hash": hashlib.sha256(content.encode("utf-8")).hexdigest(),
+        "derived_version": DERIVATION_VERSION,
+    }
+
+
+def _author_excerpt(document: Dict[str, Any]) -> Optional[str]:
+    """저장된 요약 중 작성자가 직접 입력한 것만 반환
+
+    `excerpt_derived` 플래그가 없는 예전 문서는 현재 방식으로 만든 요약과 같으면
+    파생 요약으로 본다.
+    """
+    excerpt = document.get("excerpt")
+    if not excerpt or document.get("excerpt_derived"):
+        return None
+    if "excerpt_derived" not in document:
+        derived = make_excerpt(strip_markdown(document.get("content") or ""))
+        if excerpt == derived:
+            return None
+    return excerpt
+
+
+async def backfill_content_fields(batch_size: int = 200) -> Dict[str, int]:
+    """파생 필드가 없거나 이전 버전인 문서를 배치로 채우기
+
+    처리된 문서는 `derived_version`이 현재 값이 되어 조회 조건에서 빠지므로,
+    중단되어도 다시 실행하면 남은 문서부터 이어서 처리한다.
+    본문에서 만든 요약(`excerpt_derived`)은 작성자 요약으로 보지 않고 다시 계산한다.
+    """
+    updated: Dict[str, int] = {}
+    for collection_name, keeps_excerpt in CONTENT_COLLECTIONS.items():
+        collection = database.get_collection(collection_name)
+        updated[collection_name] = 0
+        skipped = set()
+
+        while True:
+            query: Dict[str, Any] = {"derived_version": {"$ne": DERIVATION_VERSION}}
+            if skipped:
+                query["_id"] = {"$nin": list(skipped)}
+            batch = await collection.find(
+                query, {"content": 1, "excerpt": 1, "excerpt_derived": 1}
+            ).to_list(length=batch_size)
+            if not batch:
+                break
+
+            operations = []
+            for document in batch:
+                try:
+                    fields = derive_content_fields(
+                        document.get("content"),
+                        _author_excerpt(document) if keeps_excerpt else None,
+                    )
+                except Exception as e:
+                    print(f"⚠️ Content derivation skipped ({document['_id']}): {e}")
+                    skipped.add(document["_id"])
+                    continue
+                operations.append(UpdateOne({"_id": document["_id"]}, {"$set": fields}))
+
+            if operations:
+                await collection.bulk_write(operations, ordered=False)
+                updated[collection_name] += len(operations)
+
+    if any(updated.values()):
+        print(f"📝 Content fields backfilled: {updated}")
+    return updated
+
+
+async def run_content_backfill() -> None:
+    """애플리케이션 시작 시 백그라운드 백필 (실패해도 다음 시작 때 이어서 진행)"""
+    try:
+        await backfill_content_fields()
+    except Exception as e:
+        print(f"❌ Content backfill error: {e}")
+
+
+async def _main() -> None:
+    await database.connect()
+    try:
+        await backfill_content_fields()
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    # 수동 실행: python -m app.core.content
+    asyncio.run(_main())
@@ -1,7 +1,75 @@
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from .config import settings
 
+# 애플리케이션 시작 시 생성할 인덱스 목록: (컬렉션, 키, 옵션)
+INDEXES = [
+    # 사용자당 대상별 투표 1건 (원자적 upsert 투표의 기반)
+    (
+        "forum_votes",
+        [("post_id", 1), ("user_id", 1), ("type", 1)],
+        {"unique": True, "name": "vote_target_user_unique"},
+    ),
+    # sort_by=hot 목록 조회 (고정 게시물 우선 + hot 점수)
+    (
+        "forum_posts",
+        [("status", 1), ("is_pinned", -1), ("hot_score", -1)],
+        {"name": "forum_hot_rank"},
+    ),
+    # 댓글 트리 범위 조회 (materialized path)
+    (
+        "forum_replies",
+        [("post_id", 1), ("path", 1)],
+        {"name": "reply_thread_path"},
+    ),
+    # 카운터 정합성 작업의 워터마크 구간 조회
+    ("forum_votes", [("updated_at", 1)], {"name": "vote_updated_at"}),
+    ("forum_replies", [("created_at", 1)], {"name": "reply_created_at"}),
+    ("forum_replies", [("updated_at", 1)], {"name": "reply_updated_at"}),
+    # 블로그 slug 조회 및 중복 방지
+    (
+        "blog_posts",
+        [("slug", 1)],
+        {"unique": True, "name": "blog_slug_unique"},
+    ),
+    # 게시된 글 최신순 목록 및 연/월 범위 조회
+    (
+        "blog_posts",
+        [("published", 1), ("created_at", -1)],
+        {"name": "blog_published_created"},
+    ),
+    # 예약 발행 대기 게시물 범위 조회
+    (
+        "blog_posts",
+        [("published", 1), ("publish_at", 1)],
+        {
+            "name": "blog_publish_schedule",
+            "partialFilterExpression": {"publish_at": {"$exists": True}},
+        },
+    ),
+    # 파생 필드 백필 대상(이전 버전) 조회
+    ("blog_posts", [("derived_version", 1)], {"name": "blog_derived_version"}),
+    ("forum_posts", [("derived_version", 1)], {"name": "forum_derived_version"}),
+    ("docs", [("derived_version", 1)], {"name": "docs_derived_version"}),
+    # 다운로드 시 저장 파일명으로 업로드 기록 조회 (캐시 미스)
+    ("uploads", [("filename", 1)], {"name": "upload_filename"}),
+    # 만료된 업로드 세션 정리
+    ("upload_sessions", [("expires_at", 1)], {"name": "upload_session_expiry"}),
+    # 사용자당 대상별 신고 1건
+    (
+        "forum_reports",
+        [("post_id", 1), ("reporter_id", 1), ("type", 1)],
+        {"unique": True, "name": "report_target_reporter_unique"},
+    ),
+    # 운영자 신고 대기열 (대기 신고 수 순)
+    (
+        "forum_report_targets",
+        [("status", 1), ("pending_count", -1), ("last_reported_at", -1)],
+        {"name": "report_queue"},
+    ),
+]
+
 
 class Database:
     client: AsyncIOMotorClient = None
@@ -19,9 +87,22 @@ class Database:
             self.client.close()
             print("Disconnected from MongoDB")
 
+    async def ensure_indexes(self):
+        """필요한 인덱스 생성 (이미 있으면 무시)"""
+        for collection_name, keys, options in INDEXES:
+            try:
+                await self.database[collection_name].create_index(keys, **options)
+            except Exception as e:
+                print(f"⚠️ Failed to create index on {collection_name}: {e}")
+
     def get_collection(self, collection_name: str):
         """컬렉션 반환"""
         return self.database[collection_name]
 
 
+def object_id_or_str(value: str):
+    """ObjectId 형식이면 ObjectId로, 아니면 문자열 `_id` 그대로 반환"""
+    return ObjectId(value) if ObjectId.is_valid(value) else value
+
+
 database = Database()
@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+
+def parse_datetime(value: Any) -> Optional[datetime]:
+    """저장된 날짜 값(datetime 또는 ISO 문자열)을 UTC aware datetime으로 변환"""
+    if value is None:
+        return None
+
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        text = str(value).strip()
+        if not text:
+            return None
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+
+    if parsed.tzinfo is None:
+        # 서버에서 저장한 naive 값은 모두 UTC 기준
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def to_timestamp(value: Any) -> Optional[float]:
+    """저장된 날짜 값을 epoch 초로 변환"""
+    parsed = parse_datetime(value)
+    return parsed.timestamp() if parsed else None
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """MongoDB 저장/비교용 UTC naive datetime (밀리초 정밀도)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    # BSON Date는 밀리초까지만 저장하므로 저장값과 같도록 맞춤
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
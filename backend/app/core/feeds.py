@@ -0,0 +1,179 @@
+import hashlib
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+from .cache import response_cache
+from .config import settings
+from .database import database
+from .dates import parse_datetime
+
+# 피드에 포함할 최근 게시물 수
+FEED_SIZE = 20
+
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+
+FEED_TITLE = "NDASH Blog"
+FEED_DESCRIPTION = "Latest blog posts from NDASH"
+
+FEED_MEDIA_TYPES = {
+    "rss": "application/rss+xml; charset=utf-8",
+    "atom": "application/atom+xml; charset=utf-8",
+}
+
+
+class RenderedFeed:
+    """직렬화가 끝난 피드와 조건부 요청용 검증자"""
+
+    def __init__(self, body: bytes, last_modified: datetime, version: int):
+        self.body = body
+        self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        self.last_modified = last_modified
+        self.version = version
+        self.expires_at = time.monotonic() + settings.RESPONSE_CACHE_TTL_SECONDS
+
+
+def _blog_url(path: str = "") -> str:
+    return f"{settings.FRONTEND_URL.rstrip('/')}/blog{path}"
+
+
+def _timestamps(post: Dict[str, Any]) -> Dict[str, datetime]:
+    epoch = datetime.fromtimestamp(0, timezone.utc)
+    created = parse_datetime(post.get("created_at")) or epoch
+    updated = parse_datetime(post.get("updated_at")) or created
+    return {"created": created, "updated": max(created, updated)}
+
+
+def render_rss(posts: List[Dict[str, Any]], last_modified: datetime) -> bytes:
+    """RSS 2.0 피드 직렬화"""
+    rss = ET.Element("rss", version="2.0")
+    channel = ET.SubElement(rss, "channel")
+    ET.SubElement(channel, "title").text = FEED_TITLE
+    ET.SubElement(channel, "description").text = FEED_DESCRIPTION
+    ET.SubElement(channel, "link").text = _blog_url()
+    ET.SubElement(channel, "lastBuildDate").text = format_datetime(
+        last_modified, usegmt=True
+    )
+
+    for post in posts:
+        link = _blog_url(f"/{post['slug']}")
+        item = ET.SubElement(channel, "item")
+        ET.SubElement(item, "title").text = post.get("title", "")
+        ET.SubElement(item, "description").text = post.get("excerpt") or ""
+        ET.SubElement(item, "link").text = link
+        ET.SubElement(item, "pubDate").text = format_datetime(
+            _timestamps(post)["created"], usegmt=True
+        )
+        ET.SubElement(item, "guid").text = link
+        for category in post.get("categories") or []:
+            ET.SubElement(item, "category").text = category
+
+    return ET.tostring(rss, encoding="utf-8", xml_declaration=True)
+
+
+def render_atom(posts: List[Dict[str, Any]], last_modified: datetime) -> bytes:
+    """Atom 1.0 피드 직렬화"""
+    feed = ET.Element("feed", xmlns=ATOM_NAMESPACE)
+    ET.SubElement(feed, "title").text = FEED_TITLE
+    ET.SubElement(feed, "subtitle").text = FEED_DESCRIPTION
+    ET.SubElement(feed, "id").text = _blog_url()
+    ET.SubElement(feed, "link", href=_blog_url())
+    ET.SubElement(feed, "updated").text = last_modified.isoformat()
+
+    for post in posts:
+        link = _blog_url(f"/{post['slug']}")
+        timestamps = _timestamps(post)
+        entry = ET.SubElement(feed, "entry")
+        ET.SubElement(entry, "title").text = post.get("title", "")
+        ET.SubElement(entry, "id").text = link
+        ET.SubElement(entry, "link", href=link)
+        ET.SubElement(entry, "published").text = timestamps["created"].isoformat()
+        ET.SubElement(entry, "updated").text = timestamps["updated"].isoformat()
+        author = ET.SubElement(entry, "author")
+        ET.SubElement(author, "name").text = post.get("author", "")
+        ET.SubElement(entry, "summary").text = post.get("excerpt") or ""
+        for category in post.get("categories") or []:
+            ET.SubElement(entry, "category", term=category)
+
+    return ET.tostring(feed, encoding="utf-8", xml_declaration=True)
+
+
+FEED_RENDERERS = {"rss": render_rss, "atom": render_atom}
+
+_feeds: Dict[str, RenderedFeed] = {}
+
+
+async def get_feed(feed_format: str) -> RenderedFeed:
+    """블로그 변경(캐시 버전) 이후 처음 요청될 때만 피드를 다시 생성
+
+    버전은 워커별이므로 다른 워커의 변경은 TTL 이내에 반영된다.
+    """
+    version = response_cache.version("blog_posts")
+    cached = _feeds.get(feed_format)
+    if (
+        cached is not None
+        and cached.version == version
+        and cached.expires_at > time.monotonic()
+    ):
+        return cached
+
+    posts = (
+        await database.get_collection("blog_posts")
+        .find(
+            {"published": True, "access_level": {"$in": ["public", None]}},
+            {
+                "title": 1,
+                "slug": 1,
+                "author": 1,
+                "excerpt": 1,
+                "categories": 1,
+                "created_at": 1,
+                "updated_at": 1,
+            },
+        )
+        .sort("created_at", -1)
+        .limit(FEED_SIZE)
+        .to_list(length=FEED_SIZE)
+    )
+
+    last_modified = max(
+        (_timestamps(post)["updated"] for post in posts),
+        default=datetime.fromtimestamp(0, timezone.utc),
+    ).replace(microsecond=0)
+
+    rendered = RenderedFeed(
+        FEED_RENDERERS[feed_format](posts, last_modified), last_modified, version
+    )
+    _feeds[feed_format] = rendered
+    return rendered
+
+
+def empty_feed(feed_format: str) -> bytes:
+    """피드 생성 실패 시 반환할 빈 피드"""
+    return FEED_RENDERERS[feed_format]([], datetime.now(timezone.utc))
+
+
+def is_not_modified(
+    feed: RenderedFeed, if_none_match: Optional[str], if_modified_since: Optional[str]
+) -> bool:
+    """조건부 요청 검증 (If-None-Match 우선, 없으면 If-Modified-Since)"""
+    if if_none_match is not None:
+        candidates = [value.strip() for value in if_none_match.split(",")]
+        return (
+            "*" in candidates
+            or feed.etag in candidates
+            or (f"W/{feed.etag}" in candidates)
+        )
+
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return feed.last_modified <= since
+
+    return False
@@ -0,0 +1,225 @@
+import asyncio
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Set, Tuple
+
+from .background import BackgroundService
+from .config import settings
+from .database import database
+
+# 게시물 목록 화면이 구독하는 토픽
+LIST_TOPIC = "forum"
+
+
+def thread_topic(post_id: str) -> str:
+    """게시물 상세(스레드) 토픽"""
+    return f"post:{post_id}"
+
+
+class Subscription:
+    """연결별 구독 큐
+
+    이벤트는 `key` 기준으로 병합되어 같은 대상의 최신 상태만 남는다(예: 투표 수).
+    대기 이벤트가 `max_pending`을 넘으면 쌓인 이벤트를 버리고 `resync` 이벤트를
+    보내 클라이언트가 다시 조회하도록 한다. 게시자는 절대 대기하지 않는다.
+    """
+
+    def __init__(self, topic: str, max_pending: int):
+        self.topic = topic
+        self.max_pending = max_pending
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._overflowed = False
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        key = event["key"]
+        if key in self._pending:
+            self._pending[key] = event
+        elif len(self._pending) >= self.max_pending:
+            self._pending.clear()
+            self._overflowed = True
+        else:
+            self._pending[key] = event
+        self._ready.set()
+
+    async def next_batch(self, coalesce_seconds: float) -> List[Dict[str, Any]]:
+        """이벤트가 도착할 때까지 기다린 뒤 짧게 모아서 반환"""
+        await self._ready.wait()
+        if coalesce_seconds > 0:
+            await asyncio.sleep(coalesce_seconds)
+
+        batch = list(self._pending.values())
+        if self._overflowed:
+            batch = [{"type": "resync", "key": "resync"}]
+            self._overflowed = False
+        self._pending.clear()
+        self._ready.clear()
+        return batch
+
+
+class ForumEventHub(BackgroundService):
+    """포럼 실시간 업데이트용 프로세스 내 pub/sub 허브
+
+    `FORUM_EVENTS_SOURCE=local`이면 라우터가 쓰기 직후 직접 게시하고,
+    `change_stream`이면 라우터 게시는 무시하고 MongoDB change stream에서 이벤트를
+    만들어 게시한다(여러 워커가 같은 이벤트를 받도록, replica set 필요).
+    """
+
+    def __init__(self):
+        self.source = settings.FORUM_EVENTS_SOURCE
+        self.max_pending = settings.FORUM_EVENTS_QUEUE_SIZE
+        self.coalesce_seconds = settings.FORUM_EVENTS_COALESCE_MS / 1000
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, topic: str) -> Subscription:
+        subscription = Subscription(topic, self.max_pending)
+        self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.topic]
+
+    def _dispatch(self, topic: str, event: Dict[str, Any]) -> None:
+        for subscription in list(self._subscribers.get(topic, ())):
+            subscription.offer(event)
+
+    def _dispatch_all(self, events: List[Tuple[str, Dict[str, Any]]]) -> None:
+        for topic, event in events:
+            self._dispatch(topic, event)
+
+    # ------------------------------------------------------------------
+    # 이벤트 구성
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _reply_created_events(reply: Dict[str, Any]) -> List[Tuple[str, Dict]]:
+        return [
+            (
+                thread_topic(reply["post_id"]),
+                {
+                    "type": "reply_created",
+                    "key": f"reply:{reply['id']}",
+                    "post_id": reply["post_id"],
+                    "reply": reply,
+                },
+            )
+        ]
+
+    @staticmethod
+    def _post_stats_events(post: Dict[str, Any]) -> List[Tuple[str, Dict]]:
+        post_id = str(post["_id"])
+        event = {
+            "type": "post_stats",
+            "key": f"post_stats:{post_id}",
+            "post_id": post_id,
+            "likes": post.get("likes", 0),
+            "dislikes": post.get("dislikes", 0),
+            "replies_count": post.get("replies_count", 0),
+        }
+        events = [(thread_topic(post_id), event)]
+        if not post.get("is_draft") and not post.get("is_private"):
+            events.append((LIST_TOPIC, event))
+        return events
+
+    @staticmethod
+    def _reply_stats_events(reply: Dict[str, Any]) -> List[Tuple[str, Dict]]:
+        reply_id = str(reply["_id"])
+        return [
+            (
+                thread_topic(reply["post_id"]),
+                {
+                    "type": "reply_stats",
+                    "key": f"reply_stats:{reply_id}",
+                    "post_id": reply["post_id"],
+                    "reply_id": reply_id,
+                    "likes": reply.get("likes", 0),
+                    "dislikes": reply.get("dislikes", 0),
+                },
+            )
+        ]
+
+    # ------------------------------------------------------------------
+    # 이벤트 게시 (라우터에서 쓰기 직후 호출, local 모드에서만 전달)
+    # ------------------------------------------------------------------
+
+    def publish_reply_created(self, reply: Dict[str, Any]) -> None:
+        if self.source == "local":
+            self._dispatch_all(self._reply_created_events(reply))
+
+    def publish_post_stats(self, post: Dict[str, Any]) -> None:
+        if self.source == "local":
+            self._dispatch_all(self._post_stats_events(post))
+
+    def publish_reply_stats(self, reply: Dict[str, Any]) -> None:
+        if self.source == "local":
+            self._dispatch_all(self._reply_stats_events(reply))
+
+    # ------------------------------------------------------------------
+    # change stream 이벤트 소스 (멀티 워커 배포용)
+    # ------------------------------------------------------------------
+
+    async def _watch(self, collection_name: str) -> None:
+        collection = database.get_collection(collection_name)
+        counter_changed = [
+            {f"updateDescription.updatedFields.{field}": {"$exists": True}}
+            for field in ("likes", "dislikes", "replies_count")
+        ]
+        pipeline = [
+            {
+                "$match": {
+                    "$or": [
+                        {"operationType": "insert", "ns.coll": "forum_replies"},
+                        {"operationType": "update", "$or": counter_changed},
+                    ]
+                }
+            }
+        ]
+        resume_token = None
+
+        while True:
+            try:
+                async with collection.watch(
+                    pipeline,
+                    full_document="updateLookup",
+                    resume_after=resume_token,
+                ) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self._handle_change(collection_name, change)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Forum change stream error ({collection_name}): {e}")
+                await asyncio.sleep(5)
+
+    def _handle_change(self, collection_name: str, change: Dict[str, Any]) -> None:
+        document = change.get("fullDocument")
+        if not document:
+            return
+
+        if collection_name == "forum_posts":
+            self._dispatch_all(self._post_stats_events(document))
+        elif change["operationType"] == "insert":
+            reply = {
+                key: value
+                for key, value in document.items()
+                if key not in ("_id", "created_ts")
+            }
+            reply["id"] = str(document["_id"])
+            self._dispatch_all(self._reply_created_events(reply))
+        else:
+            self._dispatch_all(self._reply_stats_events(document))
+
+    def start(self) -> None:
+        if self.source == "change_stream":
+            super().start()
+
+    async def _run(self) -> None:
+        await asyncio.gather(self._watch("forum_posts"), self._watch("forum_replies"))
+
+
+# 전역 포럼 이벤트 허브 인스턴스
+forum_events = ForumEventHub()
@@ -0,0 +1,204 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+
+from .cache import response_cache
+from .config import settings
+from .database import database, object_id_or_str
+from .forum_ranking import hot_score_stage
+
+# 신고 대상 종류별 컬렉션
+TARGET_COLLECTIONS = {"post": "forum_posts", "reply": "forum_replies"}
+
+
+def report_target_id(target_type: str, target_id: str) -> str:
+    """`forum_report_targets` 문서 ID"""
+    return f"{target_type}:{target_id}"
+
+
+async def _adjust_replies_count(post_id: str, delta: int) -> None:
+    """댓글 숨김/복원에 맞춰 게시물 댓글 수와 hot 점수 갱신"""
+    await database.get_collection("forum_posts").update_one(
+        {"_id": object_id_or_str(post_id)},
+        [
+            {
+                "$set": {
+                    "replies_count": {
+                        "$max": [
+                            {"$add": [{"$ifNull": ["$replies_count", 0]}, delta]},
+                            0,
+                        ]
+                    }
+                }
+            },
+            hot_score_stage(),
+        ],
+    )
+
+
+async def set_target_hidden(
+    target_type: str,
+    target_id: str,
+    hidden: bool,
+    auto: bool = False,
+    only_auto_hidden: bool = False,
+) -> bool:
+    """신고 대상 숨김/복원 (상태 조건부 업데이트라 중복 실행되어도 한 번만 적용)
+
+    Returns:
+        실제로 상태가 바뀌었는지 여부
+    """
+    collection = database.get_collection(TARGET_COLLECTIONS[target_type])
+    now = datetime.utcnow().isoformat()
+
+    if hidden:
+        query = {"_id": object_id_or_str(target_id), "status": "active"}
+        update = {"$set": {"status": "hidden", "auto_hidden": auto, "hidden_at": now}}
+    else:
+        query = {"_id": object_id_or_str(target_id), "status": "hidden"}
+        if only_auto_hidden:
+            query["auto_hidden"] = True
+        update = {
+            "$set": {"status": "active"},
+            "$unset": {"auto_hidden": "", "hidden_at": ""},
+        }
+    # 카운터 정합성 작업이 변경을 감지하도록 updated_at 갱신
+    update["$set"]["updated_at"] = now
+
+    document = await collection.find_one_and_update(
+        query, update, projection={"post_id": 1}
+    )
+    if document is None:
+        return False
+
+    response_cache.bump("forum_posts")
+    if target_type == "reply":
+        await _adjust_replies_count(document["post_id"], -1 if hidden else 1)
+    return True
+
+
+async def record_report(
+    target_type: str, target_id: str, post_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """신고 1건을 대상별 집계에 반영하고, 임계값에 도달하면 자동 숨김
+
+    Args:
+        target_type: "post" 또는 "reply"
+        target_id: 신고 대상 ID
+        post_id: 대상이 속한 게시물 ID (댓글인 경우)
+
+    Returns:
+        갱신된 집계 문서 (`auto_hidden`: 이번 신고로 숨겨졌는지)
+    """
+    now = datetime.utcnow().isoformat()
+    target = await database.get_collection("forum_report_targets").find_one_and_update(
+        {"_id": report_target_id(target_type, target_id)},
+        {
+            "$inc": {"pending_count": 1, "total_count": 1},
+            "$set": {"status": "pending", "last_reported_at": now},
+            "$setOnInsert": {
+                "type": target_type,
+                "target_id": target_id,
+                "post_id": post_id or target_id,
+                "first_reported_at": now,
+            },
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+
+    threshold = settings.FORUM_REPORT_AUTO_HIDE_THRESHOLD
+    target["auto_hidden"] = False
+    if threshold > 0 and target["pending_count"] >= threshold:
+        target["auto_hidden"] = await set_target_hidden(
+            target_type, target_id, hidden=True, auto=True
+        )
+        if target["auto_hidden"]:
+            print(
+                f"🚩 Forum {target_type} {target_id} auto-hidden "
+                f"({target['pending_count']} pending reports)"
+            )
+    return target
+
+
+async def close_reports(
+    targets: List[Dict[str, str]], action: str, moderator_id: str
+) -> Dict[str, int]:
+    """신고 대상 일괄 처리
+
+    - resolve: 대기 중 신고를 처리 완료로 바꾸고 대상을 숨김 상태로 유지
+    - dismiss: 대기 중 신고를 기각하고 자동 숨김된 대상을 복원
+
+    Args:
+        targets: [{"type": "post" | "reply", "id": 대상 ID}, ...]
+        action: "resolve" 또는 "dismiss"
+        moderator_id: 처리한 운영자 ID
+    """
+    now = datetime.utcnow().isoformat()
+    report_status = "resolved" if action == "resolve" else "dismissed"
+
+    # 대상별로 실제 닫은 신고 수만큼만 대기 수를 줄여, 그 사이 들어온 신고는 대기로 남김
+    reports_collection = database.get_collection("forum_reports")
+    target_updates = []
+    reports_updated = 0
+    for target in targets:
+        result = await reports_collection.update_many(
+            {"status": "pending", "type": target["type"], "post_id": target["id"]},
+            {
+                "$set": {
+                    "status": report_status,
+                    "resolved_by": moderator_id,
+                    "resolved_at": now,
+                }
+            },
+        )
+        reports_updated += result.modified_count
+        remaining = {"$subtract": ["$pending_count", result.modified_count]}
+        target_updates.append(
+            UpdateOne(
+                {"_id": report_target_id(target["type"], target["id"])},
+                [
+                    {
+                        "$set": {
+                            "pending_count": remaining,
+                            "status": {
+                                "$cond": [
+                                    {"$gt": [remaining, 0]},
+                                    "pending",
+                                    report_status,
+                                ]
+                            },
+                            "resolved_by": moderator_id,
+                            "resolved_at": now,
+                        }
+                    }
+                ],
+            )
+        )
+    if target_updates:
+        await database.get_collection("forum_report_targets").bulk_write(
+            target_updates, ordered=False
+        )
+
+    changed = 0
+    for target in targets:
+        if action == "resolve":
+            changed += await set_target_hidden(target["type"], target["id"], True)
+            # 자동 숨김이었다면 운영자 확정 숨김으로 바꿔 이후 기각 시 복원되지 않도록
+            await database.get_collection(
+                TARGET_COLLECTIONS[target["type"]]
+            ).update_one(
+                {"_id": object_id_or_str(target["id"]), "auto_hidden": True},
+                {"$set": {"auto_hidden": False}},
+            )
+        else:
+            changed += await set_target_hidden(
+                target["type"], target["id"], False, only_auto_hidden=True
+            )
+
+    return {
+        "reports_updated": reports_updated,
+        "targets_updated": len(targets),
+        "content_changed": changed,
+    }
@@ -0,0 +1,182 @@
+import asyncio
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from pymongo import UpdateOne
+
+from .background import BackgroundService
+from .cache import response_cache
+from .config import settings
+from .database import database
+from .dates import to_timestamp
+
+# hot 점수 시간 항의 기준 시각 (2024-01-01T00:00:00Z)
+HOT_EPOCH = 1704067200
+
+# 댓글 1개를 추천 몇 개로 볼지
+REPLY_WEIGHT = 2
+
+
+def compute_hot_score(
+    likes: int, dislikes: int, replies_count: int, created_ts: Optional[float]
+) -> float:
+    """hot 점수 계산
+
+    점수 = sign(s) * log10(max(|s|, 1)) + (작성 시각 - 기준 시각) / 감쇠 주기
+    (s = 추천 - 비추천 + 댓글 가중치)
+
+    시간 항이 작성 시각에만 의존하므로 오래된 글은 새 글보다 자연히 낮은 점수를
+    받고, 투표/댓글이 없는 문서는 다시 쓰지 않아도 순위가 유지된다.
+    """
+    score = likes - dislikes + REPLY_WEIGHT * replies_count
+    sign = (score > 0) - (score < 0)
+    order = math.log10(max(abs(score), 1))
+    age_term = (
+        (created_ts or HOT_EPOCH) - HOT_EPOCH
+    ) / settings.FORUM_HOT_DECAY_SECONDS
+    return round(sign * order + age_term, 7)
+
+
+def hot_score_expression() -> Dict[str, Any]:
+    """`compute_hot_score`와 동일한 계산의 MongoDB 집계 표현식 (파이프라인 업데이트용)"""
+    return {
+        "$let": {
+            "vars": {
+                "score": {
+                    "$subtract": [
+                        {
+                            "$add": [
+                                {"$ifNull": ["$likes", 0]},
+                                {
+                                    "$multiply": [
+                                        REPLY_WEIGHT,
+                                        {"$ifNull": ["$replies_count", 0]},
+                                    ]
+                                },
+                            ]
+                        },
+                        {"$ifNull": ["$dislikes", 0]},
+                    ]
+                }
+            },
+            "in": {
+                "$round": [
+                    {
+                        "$add": [
+                            {
+                                "$multiply": [
+                                    {"$cmp": ["$$score", 0]},
+                                    {"$log10": {"$max": [{"$abs": "$$score"}, 1]}},
+                                ]
+                            },
+                            {
+                                "$divide": [
+                                    {
+                                        "$subtract": [
+                                            {"$ifNull": ["$created_ts", HOT_EPOCH]},
+                                            HOT_EPOCH,
+                                        ]
+                                    },
+                                    settings.FORUM_HOT_DECAY_SECONDS,
+                                ]
+                            },
+                        ]
+                    },
+                    7,
+                ]
+            },
+        }
+    }
+
+
+def hot_score_stage() -> Dict[str, Any]:
+    """카운터 변경 뒤에 붙이는 hot 점수 재계산 파이프라인 단계"""
+    return {"$set": {"hot_score": hot_score_expression()}}
+
+
+class HotScoreMaintainer(BackgroundService):
+    """hot 점수 일괄 재계산 작업
+
+    투표/댓글 경로에서 점수를 증분 갱신하므로, 이 작업은 그 경로를 거치지 않은
+    변경(기존 데이터, 직접 수정된 카운터, 감쇠 주기 설정 변경)을 주기적으로 반영한다.
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(self):
+        self.interval = settings.FORUM_HOT_RECOMPUTE_SECONDS
+        self.window = timedelta(days=settings.FORUM_HOT_WINDOW_DAYS)
+
+    async def backfill(self) -> int:
+        """created_ts가 없는 기존 게시물에 작성 시각과 hot 점수 채우기"""
+        collection = database.get_collection("forum_posts")
+        updated = 0
+
+        while True:
+            batch = await collection.find(
+                {"created_ts": {"$exists": False}}, {"created_at": 1}
+            ).to_list(length=self.BATCH_SIZE)
+            if not batch:
+                break
+
+            operations = [
+                UpdateOne(
+                    {"_id": post["_id"]},
+                    [
+                        {
+                            "$set": {
+                                "created_ts": to_timestamp(post.get("created_at"))
+                                or HOT_EPOCH
+                            }
+                        },
+                        hot_score_stage(),
+                    ],
+                )
+                for post in batch
+            ]
+            await collection.bulk_write(operations, ordered=False)
+            updated += len(operations)
+
+        return updated
+
+    async def recompute(self) -> int:
+        """최근 게시물과 점수가 없는 게시물의 hot 점수를 서버 측에서 일괄 재계산"""
+        collection = database.get_collection("forum_posts")
+        cutoff = (datetime.now(timezone.utc) - self.window).timestamp()
+
+        result = await collection.update_many(
+            {
+                "$or": [
+                    {"created_ts": {"$gte": cutoff}},
+                    {"hot_score": {"$exists": False}},
+                ]
+            },
+            [hot_score_stage()],
+        )
+        return result.modified_count
+
+    async def run_once(self) -> Dict[str, int]:
+        backfilled = await self.backfill()
+        recomputed = await self.recompute()
+        if backfilled or recomputed:
+            response_cache.bump("forum_posts")
+            print(
+                f"🔥 Forum hot scores updated: backfilled={backfilled}, "
+                f"recomputed={recomputed}"
+            )
+        return {"backfilled": backfilled, "recomputed": recomputed}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Forum hot score job error: {e}")
+            await asyncio.sleep(self.interval)
+
+
+# 전역 hot 점수 작업 인스턴스
+hot_score_maintainer = HotScoreMaintainer()
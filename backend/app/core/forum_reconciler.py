@@ -0,0 +1,313 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from pymongo import UpdateOne
+
+from .background import BackgroundService
+from .cache import response_cache
+from .config import settings
+from .database import database, object_id_or_str
+from .forum_ranking import hot_score_stage
+
+STATE_ID = "forum_counter_reconciler"
+
+
+class ForumCounterReconciler(BackgroundService):
+    """포럼 비정규화 카운터(likes, dislikes, replies_count) 정합성 복구 작업
+
+    워터마크 이후 변경된 투표/댓글의 대상만 골라 `forum_votes`, `forum_replies`
+    집계로 실제 값을 다시 계산하고, 차이가 있는 문서만 `bulk_write`로 고친다.
+
+    - 최근 `settle` 초 이내에 투표/댓글이 바뀐 대상은 다음 주기로 미뤄, 투표
+      upsert와 카운터 증감 사이에 있는 요청을 잘못 보정하지 않는다.
+    - 보정 업데이트는 읽어 둔 카운터 값을 조건으로 걸어, 그 사이 들어온 증감을
+      덮어쓰지 않는다(조건 불일치 시 다음 주기에 다시 확인).
+    - 워터마크가 없으면(최초 실행) 전체 게시물/댓글을 배치로 훑는다.
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(self):
+        self.interval = settings.FORUM_RECONCILE_INTERVAL_SECONDS
+        self.settle = timedelta(seconds=settings.FORUM_RECONCILE_SETTLE_SECONDS)
+        self.stats: Dict[str, Any] = {
+            "runs": 0,
+            "checked_posts": 0,
+            "checked_replies": 0,
+            "drifted_posts": 0,
+            "drifted_replies": 0,
+            "total_abs_drift": 0,
+            "last_run_at": None,
+            "last_duration_ms": None,
+            "last_run": None,
+            "watermark": None,
+        }
+        self._lock = asyncio.Lock()
+
+    # ------------------------------------------------------------------
+    # 변경 대상 수집
+    # ------------------------------------------------------------------
+
+    async def _load_watermark(self) -> Optional[str]:
+        state = await database.get_collection("system_state").find_one(
+            {"_id": STATE_ID}
+        )
+        return state.get("watermark") if state else None
+
+    async def _save_watermark(self, watermark: str) -> None:
+        await database.get_collection("system_state").update_one(
+            {"_id": STATE_ID},
+            {"$set": {"watermark": watermark, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    async def _changed_targets(self, since: str, until: str) -> Dict[str, Set[str]]:
+        """워터마크 구간에 변경된 게시물/댓글 ID"""
+        window = {"$gt": since, "$lte": until}
+        posts: Set[str] = set()
+        replies: Set[str] = set()
+
+        votes_cursor = database.get_collection("forum_votes").find(
+            {"updated_at": window}, {"post_id": 1, "type": 1}
+        )
+        async for vote in votes_cursor:
+            (posts if vote.get("type") == "post" else replies).add(vote["post_id"])
+
+        # 댓글 작성/상태 변경은 게시물의 replies_count에 영향
+        replies_cursor = database.get_collection("forum_replies").find(
+            {"$or": [{"created_at": window}, {"updated_at": window}]},
+            {"post_id": 1},
+        )
+        async for reply in replies_cursor:
+            posts.add(reply["post_id"])
+
+        return {"posts": posts, "replies": replies}
+
+    async def _all_ids(self, collection_name: str):
+        """전체 ID를 `_id` 순 배치로 순회 (최초 전체 점검용)"""
+        collection = database.get_collection(collection_name)
+        last_id = None
+        while True:
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            batch = (
+                await collection.find(query, {"_id": 1})
+                .sort("_id", 1)
+                .to_list(length=self.BATCH_SIZE)
+            )
+            if not batch:
+                return
+            last_id = batch[-1]["_id"]
+            yield [str(item["_id"]) for item in batch]
+
+    # ------------------------------------------------------------------
+    # 집계 및 보정
+    # ------------------------------------------------------------------
+
+    async def _vote_counts(
+        self, vote_kind: str, ids: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """대상별 추천/비추천 수와 마지막 투표 변경 시각 (취소된 투표 포함)"""
+        pipeline = [
+            {"$match": {"type": vote_kind, "post_id": {"$in": ids}}},
+            {
+                "$group": {
+                    "_id": "$post_id",
+                    "likes": {
+                        "$sum": {"$cond": [{"$eq": ["$vote_type", "like"]}, 1, 0]}
+                    },
+                    "dislikes": {
+                        "$sum": {"$cond": [{"$eq": ["$vote_type", "dislike"]}, 1, 0]}
+                    },
+                    "last_changed": {"$max": "$updated_at"},
+                }
+            },
+        ]
+        cursor = database.get_collection("forum_votes").aggregate(pipeline)
+        return {row["_id"]: row async for row in cursor}
+
+    async def _reply_counts(self, post_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """게시물별 활성 댓글 수와 마지막 댓글 작성/상태 변경 시각"""
+        pipeline = [
+            {"$match": {"post_id": {"$in": post_ids}}},
+            {
+                "$group": {
+                    "_id": "$post_id",
+                    "count": {
+                        "$sum": {"$cond": [{"$eq": ["$status", "active"]}, 1, 0]}
+                    },
+                    "last_changed": {
+                        "$max": {
+                            "$max": [
+                                "$created_at",
+                                {"$ifNull": ["$updated_at", "$created_at"]},
+                            ]
+                        }
+                    },
+                }
+            },
+        ]
+        cursor = database.get_collection("forum_replies").aggregate(pipeline)
+        return {row["_id"]: row async for row in cursor}
+
+    async def _reconcile_batch(
+        self, collection_name: str, ids: List[str], until: str
+    ) -> Dict:
+        """배치 보정
+
+        투표 upsert와 카운터 증감은 별도 쓰기이므로, `until` 이후 변경된 투표/댓글이
+        있는 대상은 증감이 아직 반영되지 않았을 수 있어 건너뛴다(워터마크 이후
+        변경이므로 다음 주기에 다시 확인). 나머지 대상은 읽어 둔 카운터 값을 조건으로
+        보정해 그 사이 들어온 증감을 덮어쓰지 않는다.
+        """
+        is_post = collection_name == "forum_posts"
+        fields = ["likes", "dislikes"] + (["replies_count"] if is_post else [])
+        collection = database.get_collection(collection_name)
+
+        current = await collection.find(
+            {"_id": {"$in": [object_id_or_str(value) for value in ids]}},
+            {field: 1 for field in fields},
+        ).to_list(length=None)
+
+        vote_counts = await self._vote_counts("post" if is_post else "reply", ids)
+        reply_counts = await self._reply_counts(ids) if is_post else {}
+
+        operations = []
+        abs_drift = 0
+        checked = 0
+        for document in current:
+            target_id = str(document["_id"])
+            votes = vote_counts.get(target_id, {})
+            replies = reply_counts.get(target_id, {})
+            if any(
+                str(row.get("last_changed") or "") > until for row in (votes, replies)
+            ):
+                continue
+            checked += 1
+
+            expected = {
+                "likes": votes.get("likes", 0),
+                "dislikes": votes.get("dislikes", 0),
+            }
+            if is_post:
+                expected["replies_count"] = replies.get("count", 0)
+
+            observed = {field: document.get(field, 0) for field in fields}
+            if observed == expected:
+                continue
+
+            abs_drift += sum(abs(expected[field] - observed[field]) for field in fields)
+            update: List[Dict[str, Any]] = [{"$set": expected}]
+            if is_post:
+                update.append(hot_score_stage())
+            operations.append(
+                UpdateOne(
+                    {"_id": document["_id"], **document_filter(document, fields)},
+                    update,
+                )
+            )
+
+        patched = 0
+        if operations:
+            result = await collection.bulk_write(operations, ordered=False)
+            patched = result.modified_count
+
+        return {"checked": checked, "drifted": patched, "abs_drift": abs_drift}
+
+    async def _reconcile(
+        self, collection_name: str, ids: List[str], until: str
+    ) -> Dict:
+        totals = {"checked": 0, "drifted": 0, "abs_drift": 0}
+        for start in range(0, len(ids), self.BATCH_SIZE):
+            result = await self._reconcile_batch(
+                collection_name, ids[start : start + self.BATCH_SIZE], until
+            )
+            for key in totals:
+                totals[key] += result[key]
+        return totals
+
+    # ------------------------------------------------------------------
+    # 실행
+    # ------------------------------------------------------------------
+
+    async def run_once(self, full: bool = False) -> Dict[str, Any]:
+        async with self._lock:
+            started = time.monotonic()
+            since = None if full else await self._load_watermark()
+            until = (datetime.utcnow() - self.settle).isoformat()
+
+            posts = {"checked": 0, "drifted": 0, "abs_drift": 0}
+            replies = {"checked": 0, "drifted": 0, "abs_drift": 0}
+
+            if since is None:
+                async for ids in self._all_ids("forum_posts"):
+                    for key, value in (
+                        await self._reconcile("forum_posts", ids, until)
+                    ).items():
+                        posts[key] += value
+                async for ids in self._all_ids("forum_replies"):
+                    result = await self._reconcile("forum_replies", ids, until)
+                    for key, value in result.items():
+                        replies[key] += value
+            elif since < until:
+                targets = await self._changed_targets(since, until)
+                posts = await self._reconcile(
+                    "forum_posts", sorted(targets["posts"]), until
+                )
+                replies = await self._reconcile(
+                    "forum_replies", sorted(targets["replies"]), until
+                )
+
+            if since is None or since < until:
+                await self._save_watermark(until)
+
+            duration_ms = int((time.monotonic() - started) * 1000)
+            run = {
+                "mode": "full" if since is None else "incremental",
+                "posts": posts,
+                "replies": replies,
+                "duration_ms": duration_ms,
+            }
+
+            self.stats["runs"] += 1
+            self.stats["checked_posts"] += posts["checked"]
+            self.stats["checked_replies"] += replies["checked"]
+            self.stats["drifted_posts"] += posts["drifted"]
+            self.stats["drifted_replies"] += replies["drifted"]
+            self.stats["total_abs_drift"] += posts["abs_drift"] + replies["abs_drift"]
+            self.stats["last_run_at"] = datetime.utcnow().isoformat()
+            self.stats["last_duration_ms"] = duration_ms
+            self.stats["last_run"] = run
+            self.stats["watermark"] = until
+
+            if posts["drifted"]:
+                response_cache.bump("forum_posts")
+            if posts["drifted"] or replies["drifted"]:
+                print(f"🧮 Forum counters reconciled: {run}")
+            return run
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Forum counter reconcile error: {e}")
+            await asyncio.sleep(self.interval)
+
+
+def document_filter(document: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """읽어 둔 카운터 값과 같을 때만 갱신하기 위한 조건"""
+    condition = {}
+    for field in fields:
+        if field in document:
+            condition[field] = document[field]
+        else:
+            condition[field] = {"$exists": False}
+    return condition
+
+
+# 전역 포럼 카운터 정합성 작업 인스턴스
+forum_reconciler = ForumCounterReconciler()
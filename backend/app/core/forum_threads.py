@@ -0,0 +1,111 @@
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from .database import database, object_id_or_str
+
+# materialized path 구분자 ("/"는 16진수 문자보다 앞서므로 사전순 = 전위 순회 순서)
+PATH_SEPARATOR = "/"
+
+
+def child_path(parent_path: Optional[str], reply_id: str) -> str:
+    """부모 경로 뒤에 댓글 ID를 붙인 경로"""
+    if not parent_path:
+        return reply_id
+    return f"{parent_path}{PATH_SEPARATOR}{reply_id}"
+
+
+def subtree_range(path: str) -> Dict[str, str]:
+    """`path`의 모든 하위 댓글을 포함하는 문자열 범위 조건"""
+    # 하위 경로는 모두 "path/"로 시작하고, "0"은 "/" 바로 다음 문자
+    return {"$gte": path + PATH_SEPARATOR, "$lt": path + "0"}
+
+
+def build_reply_tree(replies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """경로순(전위 순회) 댓글 목록을 중첩 구조로 변환
+
+    부모가 결과에 없으면(이전 페이지, 숨김 처리 등) 가장 가까운 상위 댓글에,
+    그마저 없으면 최상위에 붙인다.
+    """
+    nodes: Dict[str, Dict[str, Any]] = {}
+    roots: List[Dict[str, Any]] = []
+
+    for reply in replies:
+        node = {**reply, "children": []}
+        path = reply.get("path") or reply["id"]
+        nodes[path] = node
+
+        parent = None
+        ancestor = path
+        while PATH_SEPARATOR in ancestor:
+            ancestor = ancestor.rsplit(PATH_SEPARATOR, 1)[0]
+            parent = nodes.get(ancestor)
+            if parent is not None:
+                break
+
+        if parent is not None:
+            parent["children"].append(node)
+        else:
+            roots.append(node)
+
+    return roots
+
+
+async def backfill_reply_paths(batch_size: int = 500) -> int:
+    """path가 없는 기존 댓글에 materialized path/depth 채우기
+
+    작성 순서대로 처리하므로 부모 댓글의 경로가 항상 먼저 계산된다.
+    """
+    updated = 0
+    try:
+        collection = database.get_collection("forum_replies")
+        known_paths: Dict[str, str] = {}
+
+        while True:
+            batch = (
+                await collection.find(
+                    {"path": {"$exists": False}}, {"parent_id": 1, "created_at": 1}
+                )
+                .sort("created_at", 1)
+                .to_list(length=batch_size)
+            )
+            if not batch:
+                break
+
+            operations = []
+            for reply in batch:
+                reply_id = str(reply["_id"])
+                parent_id = reply.get("parent_id")
+                parent_path = None
+
+                if parent_id:
+                    parent_path = known_paths.get(parent_id)
+                    if parent_path is None:
+                        parent = await collection.find_one(
+                            {"_id": object_id_or_str(parent_id)}, {"path": 1}
+                        )
+                        if parent:
+                            parent_path = parent.get("path") or str(parent["_id"])
+
+                path = child_path(parent_path, reply_id)
+                known_paths[reply_id] = path
+                operations.append(
+                    UpdateOne(
+                        {"_id": reply["_id"]},
+                        {
+                            "$set": {
+                                "path": path,
+                                "depth": path.count(PATH_SEPARATOR),
+                            }
+                        },
+                    )
+                )
+
+            await collection.bulk_write(operations, ordered=False)
+            updated += len(operations)
+    except Exception as e:
+        print(f"❌ Forum reply path backfill error: {e}")
+
+    if updated:
+        print(f"🧵 Forum reply paths backfilled: {updated}")
+    return updated
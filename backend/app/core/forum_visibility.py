@@ -0,0 +1,13 @@
+from typing import Any, Dict
+
+
+def public_post_filter() -> Dict[str, Any]:
+    """누구나 볼 수 있는 포럼 게시물 조건 (검색/연관 콘텐츠 공통)
+
+    초안/비공개 필드가 없는 예전 게시물도 공개로 본다.
+    """
+    return {
+        "status": "active",
+        "is_draft": {"$ne": True},
+        "is_private": {"$ne": True},
+    }
@@ -0,0 +1,242 @@
+import asyncio
+import importlib.util
+import multiprocessing
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Optional
+
+from .config import settings
+
+# 허용 너비 (캐시 항목 수를 제한하기 위해 요청 너비는 이 중 하나로 올림)
+DERIVATIVE_WIDTHS = (160, 320, 640, 960, 1280, 1920)
+
+# 출력 형식 → MIME 타입
+DERIVATIVE_FORMATS = {
+    "webp": "image/webp",
+    "avif": "image/avif",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+}
+
+# 원본 확장자 → 기본 출력 형식 (fmt 미지정 시)
+SOURCE_FORMATS = {".jpg": "jpeg", ".jpeg": "jpeg", ".png": "png", ".webp": "webp"}
+
+DERIVATIVE_QUALITY = 80
+
+# 변환 실패(지원하지 않는 형식, 인코더 없음 등)를 기억해 재시도하지 않는 시간
+DERIVATIVE_FAILURE_TTL_SECONDS = 300
+MAX_REMEMBERED_FAILURES = 1024
+
+# 최근 내준 파생 이미지는 응답이 파일을 열기 전에 지워지지 않도록 이 시간 동안 유지
+EVICTION_GRACE_SECONDS = 10
+
+
+def snap_width(width: int) -> int:
+    """요청 너비 이상인 가장 작은 허용 너비 (최대값으로 제한)"""
+    for allowed in DERIVATIVE_WIDTHS:
+        if width <= allowed:
+            return allowed
+    return DERIVATIVE_WIDTHS[-1]
+
+
+def render_derivative(source: str, destination: str, width: int, fmt: str) -> int:
+    """원본 이미지를 `width` 이하로 줄여 `fmt`로 저장 (프로세스 풀에서 실행)
+
+    Returns:
+        저장한 파일 크기
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        # 확대는 하지 않고 비율 유지
+        image.thumbnail((width, width * 10), Image.Resampling.LANCZOS)
+        if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        temp_path = f"{destination}.{uuid.uuid4().hex}.tmp"
+        try:
+            image.save(temp_path, format=fmt.upper(), quality=DERIVATIVE_QUALITY)
+            os.replace(temp_path, destination)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+    return os.path.getsize(destination)
+
+
+class ImageDerivativeCache:
+    """리사이즈/형식 변환 이미지 디스크 캐시
+
+    변환은 프로세스 풀에서 실행해 이벤트 루프를 막지 않고, 같은 파생 이미지를
+    동시에 요청하면 변환 한 번의 결과를 함께 기다린다(single-flight). 결과 파일은
+    전체 크기 제한이 있는 LRU로 관리한다. 파일명에 원본 내용 해시(또는 수정
+    시각)가 들어가므로 원본이 바뀌어도 오래된 파생 이미지를 내보내지 않는다.
+
+    프로세스 풀은 애플리케이션 시작 시 spawn 방식으로 만든다(이벤트 루프와 스레드를
+    가진 서버 프로세스를 fork하지 않음). 변환에 실패한 파생 이미지는 잠시 기억해
+    요청마다 다시 변환하지 않는다. Pillow가 설치되어 있지 않거나 풀을 시작하기
+    전에는 파생 이미지를 만들지 않고 원본을 그대로 쓴다.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.max_bytes = settings.IMAGE_DERIVATIVE_CACHE_MAX_BYTES
+        self.max_workers = settings.IMAGE_DERIVATIVE_WORKERS
+        self.available = True
+
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._total_bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._failures: Dict[str, float] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _load_entries(self) -> None:
+        """기존 캐시 파일을 최근 사용 순으로 적재"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        files = []
+        for path in self.cache_dir.iterdir():
+            if path.suffix == ".tmp":
+                path.unlink(missing_ok=True)
+                continue
+            stat_result = path.stat()
+            files.append((stat_result.st_atime, path.name, stat_result.st_size))
+
+        self._entries.clear()
+        self._last_used.clear()
+        self._total_bytes = 0
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        grace_cutoff = time.monotonic() - EVICTION_GRACE_SECONDS
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            # 가장 오래된 항목도 방금 쓰였다면 잠시 한도를 넘겨 둠
+            oldest = next(iter(self._entries))
+            if self._last_used.get(oldest, 0) > grace_cutoff:
+                break
+            name, size = self._entries.popitem(last=False)
+            self._last_used.pop(name, None)
+            self._total_bytes -= size
+            (self.cache_dir / name).unlink(missing_ok=True)
+
+    def _add(self, name: str, size: int) -> None:
+        self._total_bytes += size - self._entries.pop(name, 0)
+        self._entries[name] = size
+        self._last_used[name] = time.monotonic()
+        self._evict()
+
+    @staticmethod
+    def derivative_name(
+        source: Path, source_hash: Optional[str], width: int, fmt: str
+    ) -> str:
+        version = source_hash or f"{source.stem}-{source.stat().st_mtime_ns}"
+        return f"{version}-w{width}.{fmt}"
+
+    async def get(
+        self, source: Path, source_hash: Optional[str], width: int, fmt: str
+    ) -> Optional[Path]:
+        """파생 이미지 경로 (없으면 생성, 생성할 수 없으면 None)"""
+        if not self.available or self._pool is None:
+            return None
+
+        name = self.derivative_name(source, source_hash, width, fmt)
+        path = self.cache_dir / name
+        if name in self._entries and path.exists():
+            self._entries.move_to_end(name)
+            self._last_used[name] = time.monotonic()
+            return path
+
+        failed_until = self._failures.get(name)
+        if failed_until is not None:
+            if failed_until > time.monotonic():
+                return None
+            del self._failures[name]
+
+        future = self._inflight.get(name)
+        if future is None:
+            future = asyncio.ensure_future(self._render(source, path, width, fmt))
+            self._inflight[name] = future
+            future.add_done_callback(lambda _: self._inflight.pop(name, None))
+        # 기다리던 요청이 취소되어도 다른 요청을 위해 변환은 계속 진행
+        return await asyncio.shield(future)
+
+    async def _render(
+        self, source: Path, path: Path, width: int, fmt: str
+    ) -> Optional[Path]:
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            size = await loop.run_in_executor(
+                pool, render_derivative, str(source), str(path), width, fmt
+            )
+        except ImportError:
+            self.available = False
+            print("⚠️ Pillow is not installed: serving original images only")
+            return None
+        except BrokenProcessPool:
+            print(f"❌ Image derivative worker crashed ({source.name} w={width} {fmt})")
+            # 풀을 다시 만들고(같은 풀에서 실패한 다른 요청이 이미 만들었으면 그대로)
+            # 해당 변환은 실패로 기억
+            if pool is not None and self._pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._create_pool()
+            self._remember_failure(path.name)
+            return None
+        except Exception as e:
+            print(f"❌ Image derivative error ({source.name} w={width} {fmt}): {e}")
+            self._remember_failure(path.name)
+            return None
+
+        self._add(path.name, size)
+        return path
+
+    def _remember_failure(self, name: str) -> None:
+        now = time.monotonic()
+        if len(self._failures) >= MAX_REMEMBERED_FAILURES:
+            self._failures = {
+                key: until for key, until in self._failures.items() if until > now
+            }
+        self._failures[name] = now + DERIVATIVE_FAILURE_TTL_SECONDS
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "inflight": len(self._inflight),
+            "failures": len(self._failures),
+        }
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def start(self) -> None:
+        """캐시 항목 적재 및 변환 프로세스 풀 시작"""
+        if self._pool is not None:
+            return
+        if importlib.util.find_spec("PIL") is None:
+            self.available = False
+            print("⚠️ Pillow is not installed: serving original images only")
+            return
+        self._load_entries()
+        self._pool = self._create_pool()
+
+    async def stop(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# 전역 파생 이미지 캐시 인스턴스 (업로드 디렉토리 아래)
+image_derivatives = ImageDerivativeCache(Path("uploads") / "derivatives")
@@ -0,0 +1,439 @@
+import asyncio
+import math
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import DeleteOne, ReplaceOne
+
+from .background import BackgroundService
+from .config import settings
+from .database import database, object_id_or_str
+from .forum_visibility import public_post_filter
+
+# 토큰 추출: 영문/숫자 단어와 한글 음절 묶음
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+|[가-힣]+")
+
+# 불용어 (영문 위주, 한글은 bigram으로 처리하므로 별도 목록 없음)
+STOPWORDS = {
+    "a",
+    "an",
+    "and",
+    "are",
+    "as",
+    "at",
+    "be",
+    "by",
+    "for",
+    "from",
+    "in",
+    "is",
+    "it",
+    "of",
+    "on",
+    "or",
+    "that",
+    "the",
+    "this",
+    "to",
+    "with",
+}
+
+# 문서당 유지할 최대 term 수 (가중치 상위 term만 유사도 계산에 사용)
+MAX_TERMS_PER_ITEM = 64
+
+# 제목 term 가중치 (본문 대비)
+TITLE_WEIGHT = 3
+
+SparseVector = Dict[str, float]
+
+
+def tokenize(text: str) -> List[str]:
+    """텍스트를 term 목록으로 변환 (한글은 음절 bigram)"""
+    tokens = []
+    for match in TOKEN_PATTERN.findall(text.lower()):
+        if "가" <= match[0] <= "힣":
+            if len(match) == 1:
+                tokens.append(match)
+            else:
+                tokens.extend(match[i : i + 2] for i in range(len(match) - 1))
+        elif len(match) > 1 and match not in STOPWORDS:
+            tokens.append(match)
+    return tokens
+
+
+def term_frequencies(title: str, body: str) -> Dict[str, float]:
+    """sublinear TF (1 + log tf) 계산"""
+    counts: Dict[str, int] = defaultdict(int)
+    for token in tokenize(title):
+        counts[token] += TITLE_WEIGHT
+    for token in tokenize(body):
+        counts[token] += 1
+    return {term: 1.0 + math.log(count) for term, count in counts.items()}
+
+
+def build_vector(tf: Dict[str, float], idf: Dict[str, float]) -> SparseVector:
+    """TF-IDF 희소 벡터 생성 (상위 term만 유지, L2 정규화)"""
+    weights = [(term, value * idf.get(term, 0.0)) for term, value in tf.items()]
+    weights = [item for item in weights if item[1] > 0]
+    weights.sort(key=lambda item: item[1], reverse=True)
+    weights = weights[:MAX_TERMS_PER_ITEM]
+
+    norm = math.sqrt(sum(weight * weight for _, weight in weights))
+    if norm == 0:
+        return {}
+    return {term: weight / norm for term, weight in weights}
+
+
+class RelatedContentIndex(BackgroundService):
+    """문서/블로그/포럼 TF-IDF 연관 콘텐츠 인덱스
+
+    모든 항목의 희소 TF-IDF 벡터와 term별 posting list(역색인)를 메모리에 유지하고,
+    항목별 상위 k개 이웃을 `related_content` 컬렉션에 저장한다.
+    요청 경로에서는 `_id` 조회 한 번으로 이웃 목록을 반환한다.
+    """
+
+    def __init__(self):
+        self.top_k = settings.RELATED_CONTENT_TOP_K
+        # 삭제/변경으로 이웃이 빠졌을 때 보충할 수 있도록 여유분을 함께 유지
+        self.keep = self.top_k * 2
+        self.refresh_interval = settings.RELATED_CONTENT_REFRESH_SECONDS
+        self.rebuild_interval = settings.RELATED_CONTENT_REBUILD_SECONDS
+        self.debounce = settings.RELATED_CONTENT_DEBOUNCE_SECONDS
+
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        self._stamps: Dict[str, str] = {}
+        self._tf: Dict[str, Dict[str, float]] = {}
+        self._vectors: Dict[str, SparseVector] = {}
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._idf: Dict[str, float] = {}
+        self._neighbors: Dict[str, List[Tuple[float, str]]] = {}
+        self._last_rebuild: Optional[datetime] = None
+
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+
+    def get_collection(self):
+        return database.get_collection("related_content")
+
+    # ------------------------------------------------------------------
+    # 소스 로딩
+    # ------------------------------------------------------------------
+
+    async def _load_stamps(self) -> Dict[str, str]:
+        """전체 항목의 변경 스탬프만 가벼운 projection으로 조회"""
+        stamps: Dict[str, str] = {}
+
+        docs_cursor = database.get_collection("docs").find(
+            {}, {"slug": 1, "updated_at": 1, "created_at": 1}
+        )
+        async for doc in docs_cursor:
+            if doc.get("slug"):
+                stamps[f"docs:{doc['slug']}"] = self._stamp(doc)
+
+        blog_cursor = database.get_collection("blog_posts").find(
+            {"published": True}, {"updated_at": 1, "created_at": 1}
+        )
+        async for post in blog_cursor:
+            stamps[f"blog:{post['_id']}"] = self._stamp(post)
+
+        forum_cursor = database.get_collection("forum_posts").find(
+            public_post_filter(), {"updated_at": 1, "created_at": 1}
+        )
+        async for post in forum_cursor:
+            stamps[f"forum:{post['_id']}"] = self._stamp(post)
+
+        return stamps
+
+    @staticmethod
+    def _stamp(item: Dict[str, Any]) -> str:
+        return str(item.get("updated_at") or item.get("created_at") or "")
+
+    async def _load_items(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """변경된 항목의 본문을 컬렉션별 `$in` 조회로 가져오기"""
+        by_source: Dict[str, List[str]] = defaultdict(list)
+        for key in keys:
+            source, _, ident = key.partition(":")
+            by_source[source].append(ident)
+
+        items: Dict[str, Dict[str, Any]] = {}
+
+        if by_source.get("docs"):
+            cursor = database.get_collection("docs").find(
+                {"slug": {"$in": by_source["docs"]}}
+            )
+            async for doc in cursor:
+                items[f"docs:{doc['slug']}"] = {
+                    "type": "docs",
+                    "id": doc["slug"],
+                    "title": doc.get("title", ""),
+                    "body": doc.get("content", ""),
+                    "url": (
+                        f"/docs/{doc['version']}/{doc.get('language', 'ko')}"
+                        f"/{doc['slug']}"
+                        if doc.get("version")
+                        else f"/docs/{doc['slug']}"
+                    ),
+                    "access_level": doc.get("access_level", "public"),
+                }
+
+        for source, collection_name in (
+            ("blog", "blog_posts"),
+            ("forum", "forum_posts"),
+        ):
+            if not by_source.get(source):
+                continue
+            id_values = [object_id_or_str(value) for value in by_source[source]]
+            cursor = database.get_collection(collection_name).find(
+                {"_id": {"$in": id_values}}
+            )
+            async for post in cursor:
+                post_id = str(post["_id"])
+                url = (
+                    f"/blog/{post.get('slug') or post_id}"
+                    if source == "blog"
+                    else f"/forum/{post_id}"
+                )
+                items[f"{source}:{post_id}"] = {
+                    "type": source,
+                    "id": post_id,
+                    "title": post.get("title", ""),
+                    "body": " ".join(
+                        [post.get("content", "")] + list(post.get("tags", []))
+                    ),
+                    "url": url,
+                    "access_level": post.get("access_level", "public"),
+                }
+
+        return items
+
+    # ------------------------------------------------------------------
+    # 벡터/유사도 계산 (CPU 작업, 스레드에서 실행)
+    # ------------------------------------------------------------------
+
+    def _compute_idf(self) -> None:
+        df: Dict[str, int] = defaultdict(int)
+        for tf in self._tf.values():
+            for term in tf:
+                df[term] += 1
+        total = len(self._tf)
+        self._idf = {
+            term: math.log((1 + total) / (1 + count)) + 1.0
+            for term, count in df.items()
+            # 절반 이상의 항목에 등장하는 term은 구분력이 없으므로 제외
+            if total < 4 or count <= total / 2
+        }
+
+    def _set_vector(self, key: str, vector: SparseVector) -> None:
+        self._drop_vector(key)
+        self._vectors[key] = vector
+        for term, weight in vector.items():
+            self._postings[term][key] = weight
+
+    def _drop_vector(self, key: str) -> None:
+        for term in self._vectors.pop(key, {}):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+
+    def _scores(self, key: str) -> Dict[str, float]:
+        """희소 벡터와 역색인의 곱으로 코사인 유사도 계산"""
+        scores: Dict[str, float] = defaultdict(float)
+        for term, weight in self._vectors.get(key, {}).items():
+            for other, other_weight in self._postings[term].items():
+                if other != key:
+                    scores[other] += weight * other_weight
+        return scores
+
+    def _top(self, scores: Dict[str, float]) -> List[Tuple[float, str]]:
+        ranked = sorted(
+            ((score, other) for other, score in scores.items() if score > 0),
+            reverse=True,
+        )
+        return ranked[: self.keep]
+
+    def _rebuild(self) -> set:
+        """전체 IDF 재계산 후 모든 항목의 이웃 재계산"""
+        self._compute_idf()
+        self._vectors.clear()
+        self._postings.clear()
+        for key, tf in self._tf.items():
+            self._set_vector(key, build_vector(tf, self._idf))
+
+        self._neighbors = {key: self._top(self._scores(key)) for key in self._tf}
+        return set(self._neighbors)
+
+    def _apply_changes(self, changed: List[str], removed: List[str]) -> set:
+        """변경/삭제된 항목과 그 영향을 받는 행만 갱신 (IDF는 유지)"""
+        dirty = set()
+
+        for key in removed:
+            self._drop_vector(key)
+            self._neighbors.pop(key, None)
+
+        for key in changed:
+            self._set_vector(key, build_vector(self._tf[key], self._idf))
+
+        gone = set(removed) | set(changed)
+        for key, neighbors in self._neighbors.items():
+            if any(other in gone for _, other in neighbors):
+                self._neighbors[key] = [
+                    item for item in neighbors if item[1] not in gone
+                ]
+                dirty.add(key)
+
+        for key in changed:
+            scores = self._scores(key)
+            self._neighbors[key] = self._top(scores)
+            dirty.add(key)
+
+            # 변경된 항목이 다른 항목의 상위 k에 들어가는 경우만 해당 행 갱신
+            for other, score in scores.items():
+                neighbors = self._neighbors.get(other)
+                if neighbors is None:
+                    continue
+                if len(neighbors) < self.keep or score > neighbors[-1][0]:
+                    neighbors.append((score, key))
+                    neighbors.sort(reverse=True)
+                    del neighbors[self.keep :]
+                    dirty.add(other)
+
+        return dirty
+
+    # ------------------------------------------------------------------
+    # 갱신 작업
+    # ------------------------------------------------------------------
+
+    async def refresh(self, full: bool = False) -> Dict[str, int]:
+        """변경된 항목만 반영하여 이웃 목록 갱신 (full=True면 전체 재구축)"""
+        async with self._lock:
+            now = datetime.utcnow()
+            if (
+                self._last_rebuild is None
+                or (now - self._last_rebuild).total_seconds() >= self.rebuild_interval
+            ):
+                full = True
+
+            stamps = await self._load_stamps()
+            removed = [key for key in self._stamps if key not in stamps]
+            changed = [
+                key
+                for key, stamp in stamps.items()
+                if full or self._stamps.get(key) != stamp
+            ]
+            for key in removed:
+                self._meta.pop(key, None)
+                self._tf.pop(key, None)
+                self._stamps.pop(key, None)
+
+            items = await self._load_items(changed) if changed else {}
+            for key in changed:
+                item = items.get(key)
+                if item is None:
+                    continue
+                self._meta[key] = {
+                    "type": item["type"],
+                    "id": item["id"],
+                    "title": item["title"],
+                    "url": item["url"],
+                    "access_level": item["access_level"],
+                }
+                self._tf[key] = term_frequencies(item["title"], item["body"])
+                self._stamps[key] = stamps[key]
+            changed = [key for key in changed if key in items]
+
+            if full:
+                dirty = await asyncio.to_thread(self._rebuild)
+                self._last_rebuild = now
+            elif changed or removed:
+                dirty = await asyncio.to_thread(self._apply_changes, changed, removed)
+            else:
+                dirty = set()
+
+            await self._persist(dirty, removed, full)
+
+            result = {
+                "items": len(self._tf),
+                "changed": len(changed),
+                "removed": len(removed),
+                "rows_written": len(dirty),
+            }
+            if dirty or removed:
+                print(f"🔗 Related content refreshed: {result}")
+            return result
+
+    async def _persist(self, dirty: set, removed: List[str], full: bool) -> None:
+        collection = self.get_collection()
+        operations = []
+        now = datetime.utcnow()
+
+        for key in dirty:
+            meta = self._meta.get(key)
+            if meta is None:
+                continue
+            related = []
+            for score, other in self._neighbors.get(key, [])[: self.keep]:
+                other_meta = self._meta.get(other)
+                if other_meta:
+                    related.append({**other_meta, "score": round(score, 4)})
+            operations.append(
+                ReplaceOne(
+                    {"_id": key},
+                    {
+                        "_id": key,
+                        "type": meta["type"],
+                        "access_level": meta["access_level"],
+                        "related": related,
+                        "updated_at": now,
+                    },
+                    upsert=True,
+                )
+            )
+
+        operations.extend(DeleteOne({"_id": key}) for key in removed)
+
+        for start in range(0, len(operations), 500):
+            await collection.bulk_write(operations[start : start + 500], ordered=False)
+
+        if full:
+            # 전체 재구축 시 더 이상 존재하지 않는 행 정리
+            await collection.delete_many({"_id": {"$nin": list(self._meta)}})
+
+    async def get_related(self, key: str) -> Optional[Dict[str, Any]]:
+        """저장된 이웃 목록 조회 (`_id` 단건 조회)"""
+        return await self.get_collection().find_one({"_id": key})
+
+    # ------------------------------------------------------------------
+    # 백그라운드 실행
+    # ------------------------------------------------------------------
+
+    def request_refresh(self) -> None:
+        """콘텐츠 변경 시 다음 주기를 기다리지 않고 갱신 요청
+
+        요청은 `debounce` 동안 모아서 한 번의 스탬프 조회로 처리한다.
+        """
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Related content refresh error: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.refresh_interval)
+                # 연속된 쓰기의 갱신 요청을 한 번으로 합침
+                await asyncio.sleep(self.debounce)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+# 전역 연관 콘텐츠 인덱스 인스턴스
+related_index = RelatedContentIndex()
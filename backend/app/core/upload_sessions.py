@@ -0,0 +1,256 @@
+import asyncio
+import hashlib
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import aiofiles
+from fastapi import HTTPException, status
+
+from .background import BackgroundService
+from .config import settings
+from .database import database
+from .uploads import UPLOAD_CHUNK_SIZE, StagedUpload
+
+# 청크 쓰기 중인 세션의 점유 시간 (요청이 비정상 종료되어도 이후 재개 가능)
+WRITE_LEASE_SECONDS = 300
+
+
+def get_collection():
+    return database.get_collection("upload_sessions")
+
+
+def session_expiry() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=settings.UPLOAD_SESSION_TTL_SECONDS)
+
+
+async def create_session(
+    temp_dir: Path,
+    filename: str,
+    content_type: str,
+    length: int,
+    current_user: Dict[str, Any],
+) -> Dict[str, Any]:
+    """업로드 세션 생성 (빈 임시 파일 준비)"""
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    session_id = uuid.uuid4().hex
+    temp_path = temp_dir / f"{session_id}.part"
+    temp_path.touch()
+
+    session = {
+        "_id": session_id,
+        "filename": filename,
+        "content_type": content_type,
+        "length": length,
+        "offset": 0,
+        "temp_path": str(temp_path),
+        "uploader_id": current_user["user_id"],
+        "uploader_name": current_user["username"],
+        "lease_id": None,
+        "lease_until": None,
+        "created_at": datetime.utcnow(),
+        "expires_at": session_expiry(),
+    }
+    try:
+        await get_collection().insert_one(session)
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return session
+
+
+async def get_session(session_id: str, current_user: Dict[str, Any]) -> Dict[str, Any]:
+    """본인 세션 조회
+
+    Raises:
+        HTTPException: 404 - 없거나 만료되었거나 다른 사용자의 세션
+    """
+    session = await get_collection().find_one(
+        {
+            "_id": session_id,
+            "uploader_id": current_user["user_id"],
+            "expires_at": {"$gt": datetime.utcnow()},
+        }
+    )
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="업로드 세션을 찾을 수 없습니다.",
+        )
+    return session
+
+
+async def _renew_lease(session_id: str, lease_id: str) -> None:
+    """쓰기 점유 연장 (그 사이 점유가 만료되어 다른 요청이 가져갔으면 409)"""
+    result = await get_collection().update_one(
+        {"_id": session_id, "lease_id": lease_id},
+        {
+            "$set": {
+                "lease_until": datetime.utcnow()
+                + timedelta(seconds=WRITE_LEASE_SECONDS)
+            }
+        },
+    )
+    if result.matched_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="쓰기 점유가 만료되어 다른 요청이 처리 중입니다.",
+        )
+
+
+async def append_chunk(
+    session: Dict[str, Any], offset: int, chunks: AsyncIterator[bytes]
+) -> int:
+    """`offset`부터 청크를 임시 파일에 이어 쓰기
+
+    같은 세션에 대한 동시 쓰기를 막기 위해 오프셋이 일치하고 점유 중이 아닐
+    때만 점유(lease)를 얻는다. 쓰는 동안 점유를 주기적으로 연장하고, 연장에
+    실패하면(점유 만료 후 다른 요청이 가져감) 더 쓰지 않는다. 오프셋은 점유
+    토큰이 그대로일 때만 저장한다. 연결이 끊겨도 실제로 쓴 만큼 오프셋을
+    저장하므로 클라이언트는 HEAD로 확인한 위치부터 이어서 보낼 수 있다.
+
+    Returns:
+        새 오프셋
+
+    Raises:
+        HTTPException: 409 - 오프셋 불일치/다른 요청이 쓰는 중, 413 - 선언한 크기 초과
+    """
+    now = datetime.utcnow()
+    lease_id = uuid.uuid4().hex
+    claimed = await get_collection().find_one_and_update(
+        {
+            "_id": session["_id"],
+            "offset": offset,
+            "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}],
+        },
+        {
+            "$set": {
+                "lease_id": lease_id,
+                "lease_until": now + timedelta(seconds=WRITE_LEASE_SECONDS),
+            }
+        },
+    )
+    if claimed is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="업로드 오프셋이 일치하지 않거나 다른 요청이 처리 중입니다.",
+        )
+
+    remaining = claimed["length"] - offset
+    written = 0
+    # 점유 시간의 1/3마다 연장 (청크 사이에 오래 멈춰도 만료 전에 알아챔)
+    renew_interval = timedelta(seconds=WRITE_LEASE_SECONDS / 3)
+    renew_at = now + renew_interval
+    try:
+        # 점유를 잃은 뒤 버퍼에 남은 데이터가 닫을 때 기록되지 않도록 버퍼 없이 씀
+        async with aiofiles.open(claimed["temp_path"], "r+b", buffering=0) as out:
+            # 이전 요청이 오프셋 저장 전에 남긴 꼬리 데이터는 버림
+            await out.seek(offset)
+            await out.truncate()
+            async for chunk in chunks:
+                if written + len(chunk) > remaining:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="선언한 파일 크기를 초과했습니다.",
+                    )
+                if datetime.utcnow() >= renew_at:
+                    await _renew_lease(claimed["_id"], lease_id)
+                    renew_at = datetime.utcnow() + renew_interval
+                await out.write(chunk)
+                written += len(chunk)
+            await out.flush()
+    finally:
+        # 점유를 잃었다면 오프셋은 현재 점유한 요청이 기록함
+        await get_collection().update_one(
+            {"_id": claimed["_id"], "lease_id": lease_id},
+            {
+                "$set": {
+                    "offset": offset + written,
+                    "lease_id": None,
+                    "lease_until": None,
+                    "expires_at": session_expiry(),
+                }
+            },
+        )
+    return offset + written
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def claim_completed(
+    session_id: str, user_id: str
+) -> Optional[Tuple[Dict[str, Any], StagedUpload]]:
+    """전송이 끝난 세션을 삭제하고 임시 파일을 저장 대기 업로드로 넘김
+
+    세션 삭제가 성공한 요청만 완료 처리하므로 완료 요청이 겹쳐도 한 번만 등록된다.
+    """
+    session = await get_collection().find_one_and_delete(
+        {
+            "_id": session_id,
+            "uploader_id": user_id,
+            "lease_until": None,
+            "$expr": {"$eq": ["$offset", "$length"]},
+        }
+    )
+    if session is None:
+        return None
+
+    path = Path(session["temp_path"])
+    try:
+        sha256 = await asyncio.to_thread(_hash_file, path)
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+    return session, StagedUpload(path, session["length"], sha256)
+
+
+async def delete_session(session: Dict[str, Any]) -> bool:
+    result = await get_collection().delete_one({"_id": session["_id"]})
+    Path(session["temp_path"]).unlink(missing_ok=True)
+    return result.deleted_count > 0
+
+
+class UploadSessionSweeper(BackgroundService):
+    """만료된 업로드 세션과 임시 파일 정리"""
+
+    def __init__(self):
+        self.interval = settings.UPLOAD_SESSION_SWEEP_INTERVAL_SECONDS
+
+    async def sweep(self) -> int:
+        collection = get_collection()
+        cursor = collection.find(
+            {"expires_at": {"$lte": datetime.utcnow()}}, {"temp_path": 1}
+        )
+        removed = 0
+        async for session in cursor:
+            # 그 사이 연장된 세션은 삭제 조건에서 빠짐
+            result = await collection.delete_one(
+                {"_id": session["_id"], "expires_at": {"$lte": datetime.utcnow()}}
+            )
+            if result.deleted_count:
+                Path(session["temp_path"]).unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            print(f"🧹 Expired upload sessions removed: {removed}")
+        return removed
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Upload session sweep error: {e}")
+            await asyncio.sleep(self.interval)
+
+
+# 전역 업로드 세션 정리 인스턴스
+upload_session_sweeper = UploadSessionSweeper()
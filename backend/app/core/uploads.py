@@ -0,0 +1,449 @@
+import asyncio
+import hashlib
+import os
+import re
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import aiofiles
+from fastapi import HTTPException, UploadFile, status
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from starlette.requests import ClientDisconnect
+from starlette.responses import FileResponse, JSONResponse, Response
+
+from .database import database
+
+# 한 번에 읽고 쓰는 크기 (업로드당 최대 메모리 사용량)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# multipart 경계/헤더 등 파일 외 요청 본문 여유분
+MULTIPART_OVERHEAD = 1024 * 1024
+
+# 내용 주소 파일명 (<SHA-256><확장자>): 내용이 바뀌지 않으므로 영구 캐시 가능
+CONTENT_ADDRESSED_NAME = re.compile(r"^([0-9a-f]{64})(\.\w+)?$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MUTABLE_CACHE_CONTROL = "public, max-age=3600"
+
+# 파일 삭제 중인 blob(refcount 0)을 기다리는 간격과, 삭제가 중단된 것으로 보는 시간
+BLOB_RETRY_DELAY = 0.05
+BLOB_TOMBSTONE_SECONDS = 60
+
+
+class StagedUpload:
+    """임시 파일에 저장이 끝난 업로드 (크기와 SHA-256 포함)"""
+
+    def __init__(self, path: Path, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    def commit(self, destination: Path) -> None:
+        """최종 위치로 원자적 이동 (같은 파일시스템 내 rename)"""
+        os.replace(self.path, destination)
+
+    def discard(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class UploadMetadataCache:
+    """업로드 ID → 다운로드용 메타데이터(저장 파일명, 원본 파일명, MIME 타입) LRU
+
+    같은 내용의 업로드는 저장 파일(blob)을 공유하므로 저장 파일명이 아닌 업로드
+    ID로 구분한다. 업로드 시 채우고 삭제 시 비워서, 다운로드 때마다 `uploads`를
+    조회하지 않는다.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+
+    def get(self, upload_id: str) -> Optional[Dict[str, str]]:
+        metadata = self._entries.get(upload_id)
+        if metadata is not None:
+            self._entries.move_to_end(upload_id)
+        return metadata
+
+    def set(
+        self, upload_id: str, filename: str, original_filename: str, content_type: str
+    ) -> None:
+        self._entries[upload_id] = {
+            "filename": filename,
+            "original_filename": original_filename,
+            "content_type": content_type,
+        }
+        self._entries.move_to_end(upload_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, upload_id: str) -> None:
+        self._entries.pop(upload_id, None)
+
+
+# 전역 업로드 메타데이터 캐시 인스턴스
+upload_metadata_cache = UploadMetadataCache()
+
+
+def download_name(name: str) -> str:
+    """다운로드 파일명 정리 (경로/제어 문자 제거)"""
+    name = Path(name.replace("\\", "/")).name
+    return "".join(char for char in name if char.isprintable()).strip()
+
+
+def too_large_error(label: str, max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"{label} 크기가 너무 큽니다. 최대 크기: {max_size // (1024*1024)}MB",
+    )
+
+
+async def stream_upload(
+    file: UploadFile, temp_dir: Path, max_size: int, label: str = "파일"
+) -> StagedUpload:
+    """업로드를 청크 단위로 임시 파일에 저장하며 크기 제한과 SHA-256을 함께 처리
+
+    전체 내용을 메모리에 올리지 않으며, 제한을 넘는 순간 중단하고 임시 파일을
+    지운다. 임시 파일은 최종 디렉토리와 같은 파일시스템에 두어 `commit()`이
+    rename 한 번으로 끝나게 한다.
+
+    Raises:
+        HTTPException: 413 - 크기 제한 초과
+    """
+    # 파싱 단계에서 크기가 이미 알려진 경우 읽기 전에 거절
+    if file.size is not None and file.size > max_size:
+        raise too_large_error(label, max_size)
+
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    temp_path = temp_dir / f"{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        async with aiofiles.open(temp_path, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise too_large_error(label, max_size)
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    return StagedUpload(temp_path, size, digest.hexdigest())
+
+
+def blob_filename(sha256: str, original_filename: str) -> str:
+    """내용 해시 기반 저장 파일명 (MIME 추정을 위해 확장자는 유지)"""
+    return f"{sha256}{Path(original_filename or '').suffix.lower()}"
+
+
+async def acquire_blob(
+    staged: StagedUpload, directory: Path, filename: str, content_type: str
+) -> str:
+    """내용 주소 blob 참조 추가 (같은 내용이 이미 있으면 임시 파일은 버림)
+
+    `upload_blobs` 문서(`_id`: "<디렉토리>/<파일명>")의 refcount를 원자적으로 늘린다.
+    refcount가 0인 문서는 `release_blob`이 파일을 지우는 중인 삭제 표시이므로
+    늘리지 않고, 문서가 지워진 뒤 새 blob으로 다시 만든다. 새 blob이거나 파일이
+    없을 때만 임시 파일을 옮기고, 그 외에는 기존 파일을 그대로 공유한다.
+
+    Returns:
+        blob ID
+    """
+    blob_id = f"{directory.name}/{filename}"
+    path = directory / filename
+    collection = database.get_collection("upload_blobs")
+
+    while True:
+        shared = await collection.find_one_and_update(
+            {"_id": blob_id, "refcount": {"$gt": 0}},
+            {"$inc": {"refcount": 1}},
+            projection={"_id": 1},
+        )
+        if shared is not None:
+            # 먼저 만든 요청이 아직 파일을 옮기기 전일 수 있음 (내용은 같음)
+            if path.exists():
+                staged.discard()
+            else:
+                staged.commit(path)
+            return blob_id
+
+        try:
+            await collection.insert_one(
+                {
+                    "_id": blob_id,
+                    "refcount": 1,
+                    "sha256": staged.sha256,
+                    "size": staged.size,
+                    "content_type": content_type,
+                    "file_path": str(path),
+                    "created_at": datetime.utcnow(),
+                }
+            )
+        except DuplicateKeyError:
+            # 동시에 만들어졌거나(다음 시도에서 공유) 삭제 중인 blob. 삭제하던
+            # 프로세스가 중단되어 오래 남은 삭제 표시는 여기서 치움
+            await collection.delete_one(
+                {
+                    "_id": blob_id,
+                    "refcount": {"$lte": 0},
+                    "$or": [
+                        {"released_at": None},
+                        {
+                            "released_at": {
+                                "$lt": datetime.utcnow()
+                                - timedelta(seconds=BLOB_TOMBSTONE_SECONDS)
+                            }
+                        },
+                    ],
+                }
+            )
+            await asyncio.sleep(BLOB_RETRY_DELAY)
+            continue
+
+        staged.commit(path)
+        return blob_id
+
+
+async def release_blob(blob_id: str) -> bool:
+    """blob 참조 제거 (마지막 참조가 사라질 때만 실제 파일 삭제)
+
+    refcount가 0이 된 문서는 `acquire_blob`이 늘리지 않으므로, 파일을 먼저 지우고
+    문서를 삭제해도 그 사이 새로 저장된 파일을 지우는 일이 없다.
+
+    Returns:
+        실제 파일 삭제 여부
+    """
+    collection = database.get_collection("upload_blobs")
+    blob = await collection.find_one_and_update(
+        {"_id": blob_id, "refcount": {"$gt": 0}},
+        {"$inc": {"refcount": -1}, "$set": {"released_at": datetime.utcnow()}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if blob is None or blob["refcount"] > 0:
+        return False
+
+    Path(blob["file_path"]).unlink(missing_ok=True)
+    await collection.delete_one({"_id": blob_id, "refcount": {"$lte": 0}})
+    return True
+
+
+async def dedup_stats() -> Dict[str, Any]:
+    """중복 제거 효과: 업로드 기준 논리 용량 대비 실제 저장 용량"""
+    uploads = (
+        await database.get_collection("uploads")
+        .aggregate(
+            [
+                {"$match": {"status": "active"}},
+                {
+                    "$group": {
+                        "_id": {"$gt": ["$blob_id", None]},
+                        "count": {"$sum": 1},
+                        "bytes": {"$sum": "$file_size"},
+                    }
+                },
+            ]
+        )
+        .to_list(length=None)
+    )
+    blobs = (
+        await database.get_collection("upload_blobs")
+        .aggregate(
+            [
+                {"$match": {"refcount": {"$gt": 0}}},
+                {
+                    "$group": {
+                        "_id": None,
+                        "count": {"$sum": 1},
+                        "bytes": {"$sum": "$size"},
+                    }
+                },
+            ]
+        )
+        .to_list(length=1)
+    )
+
+    by_kind = {row["_id"]: row for row in uploads}
+    deduplicated = by_kind.get(True, {"count": 0, "bytes": 0})
+    legacy = by_kind.get(False, {"count": 0, "bytes": 0})
+    blob_totals = blobs[0] if blobs else {"count": 0, "bytes": 0}
+
+    logical_bytes = deduplicated["bytes"] + legacy["bytes"]
+    stored_bytes = blob_totals["bytes"] + legacy["bytes"]
+    return {
+        "uploads": deduplicated["count"] + legacy["count"],
+        "legacy_uploads": legacy["count"],
+        "blobs": blob_totals["count"],
+        "logical_bytes": logical_bytes,
+        "stored_bytes": stored_bytes,
+        "saved_bytes": logical_bytes - stored_bytes,
+        "dedup_ratio": (
+            round(logical_bytes / stored_bytes, 2) if stored_bytes else 1.0
+        ),
+    }
+
+
+def content_hash(filename: str) -> Optional[str]:
+    """내용 주소 파일명이면 내용 해시"""
+    match = CONTENT_ADDRESSED_NAME.match(filename)
+    return match.group(1) if match else None
+
+
+def file_etag(path: Path, stat_result: os.stat_result) -> str:
+    """강한 ETag: 내용 주소 파일은 내용 해시, 이전 파일은 수정 시각/크기 기반"""
+    sha256 = content_hash(path.name)
+    if sha256:
+        return f'"{sha256}"'
+    # Starlette FileResponse 기본 ETag와 같은 방식
+    etag_base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+    return f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 비교 (약한 비교, 여러 값과 `*` 지원)"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+class UploadFileResponse(FileResponse):
+    """FileResponse의 여러 구간 응답 헤더 보정
+
+    Starlette(0.47)는 여러 구간 요청의 `multipart/byteranges` 경계를 Content-Type이
+    아닌 Content-Range 헤더에 넣으므로, 응답 시작 메시지에서 바로잡는다.
+    """
+
+    async def __call__(self, scope, receive, send):
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] == 206:
+                headers = [
+                    (name, value)
+                    for name, value in message["headers"]
+                    if name not in (b"content-type", b"content-range")
+                ]
+                for name, value in message["headers"]:
+                    if name == b"content-range" and value.startswith(b"multipart/"):
+                        headers.append((b"content-type", value))
+                        break
+                else:
+                    headers = message["headers"]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await super().__call__(scope, receive, send_wrapper)
+
+
+def serve_upload_file(
+    path: Path,
+    media_type: str,
+    if_none_match: Optional[str],
+    filename: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    etag: Optional[str] = None,
+    immutable: Optional[bool] = None,
+) -> Response:
+    """업로드 파일 응답 (ETag/304, 내용 주소 파일은 immutable 캐시)
+
+    Range/If-Range(206, 여러 구간 multipart/byteranges)는 FileResponse가 처리하며,
+    서버가 `http.response.pathsend` 확장을 지원하면 파일 경로만 넘겨 커널
+    sendfile로 전송된다.
+    """
+    stat_result = path.stat()
+    if immutable is None:
+        immutable = CONTENT_ADDRESSED_NAME.match(path.name) is not None
+    response_headers = {
+        "ETag": etag or file_etag(path, stat_result),
+        "Cache-Control": (
+            IMMUTABLE_CACHE_CONTROL if immutable else MUTABLE_CACHE_CONTROL
+        ),
+        **(headers or {}),
+    }
+
+    if etag_matches(if_none_match, response_headers["ETag"]):
+        return Response(status_code=304, headers=response_headers)
+
+    return UploadFileResponse(
+        path=path,
+        media_type=media_type,
+        filename=filename,
+        headers=response_headers,
+        stat_result=stat_result,
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """업로드 경로의 요청 본문 크기 제한 (ASGI 미들웨어)
+
+    FastAPI는 핸들러 실행 전에 multipart 본문을 모두 받아 두므로, Content-Length가
+    제한을 넘는 요청은 본문을 받기 전에 여기서 413으로 거절한다. Content-Length가
+    없는 요청(chunked 전송)은 받은 바이트 수를 세다가 제한을 넘는 순간 413을 보내고,
+    앱에는 연결이 끊긴 것으로 알려 더 읽지 않게 한다.
+    """
+
+    def __init__(self, app, path_prefix: str, max_body_size: int):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.max_body_size = max_body_size
+
+    def _too_large(self) -> JSONResponse:
+        return JSONResponse(
+            {"detail": "요청 본문이 너무 큽니다."},
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    length = int(value)
+                except ValueError:
+                    length = 0
+                if length > self.max_body_size:
+                    await self._too_large()(scope, receive, send)
+                    return
+                break
+
+        received = 0
+        response_started = False
+        rejected = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if rejected:
+                # 413을 이미 보냈으므로 앱의 응답은 버림
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        async def receive_wrapper():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    if not response_started:
+                        await self._too_large()(scope, receive, send)
+                    rejected = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except ClientDisconnect:
+            # 제한 초과로 끊은 경우 이미 413을 보냈으므로 정상 종료
+            if not rejected:
+                raise
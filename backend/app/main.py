@@ -1,7 +1,8 @@
+import asyncio
 import json
 import os
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Set
 
 from fastapi import Depends, FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,8 +10,19 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel
 
 from .core.auth import get_current_user
+from .core.blog_related import blog_related_index
+from .core.blog_scheduler import publish_scheduler
 from .core.config import settings
+from .core.content import run_content_backfill
 from .core.database import database
+from .core.forum_events import forum_events
+from .core.forum_ranking import hot_score_maintainer
+from .core.forum_reconciler import forum_reconciler
+from .core.forum_threads import backfill_reply_paths
+from .core.image_derivatives import image_derivatives
+from .core.related import related_index
+from .core.upload_sessions import upload_session_sweeper
+from .core.uploads import MULTIPART_OVERHEAD, UploadSizeLimitMiddleware
 from .routers import (
     analytics,
     auth,
@@ -40,6 +52,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 업로드 요청 본문 크기 제한 (본문을 받기 전에 거절)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    path_prefix="/api/upload",
+    max_body_size=upload.MAX_FILE_SIZE + MULTIPART_OVERHEAD,
+)
+
 # 라우터 등록
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(docs.router, prefix="/api/docs", tags=["docs"])
@@ -57,16 +76,59 @@ if settings.ENVIRONMENT == "development":
     app.include_router(dummy_oidc.router, prefix="/dummy-oidc", tags=["dummy-oidc"])
 
 
+# 시작 시 띄운 일회성 백그라운드 작업 (참조를 유지해 GC로 사라지지 않게 함)
+background_tasks: Set[asyncio.Task] = set()
+
+
+def _on_background_task_done(task: asyncio.Task) -> None:
+    background_tasks.discard(task)
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        print(f"❌ Background task {task.get_name()} failed: {error!r}")
+
+
+def start_background_task(coro, name: str) -> asyncio.Task:
+    """일회성 백그라운드 작업 시작 (실패는 로그로 남기고 종료 시 취소)"""
+    task = asyncio.create_task(coro, name=name)
+    background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+    return task
+
+
 @app.on_event("startup")
 async def startup_event():
     """애플리케이션 시작 시 실행"""
     await database.connect()
     print("Connected to database")
+    await database.ensure_indexes()
+    related_index.start()
+    blog_related_index.start()
+    publish_scheduler.start()
+    hot_score_maintainer.start()
+    forum_events.start()
+    forum_reconciler.start()
+    upload_session_sweeper.start()
+    image_derivatives.start()
+    start_background_task(backfill_reply_paths(), "backfill_reply_paths")
+    start_background_task(run_content_backfill(), "run_content_backfill")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """애플리케이션 종료 시 실행"""
+    for task in list(background_tasks):
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await related_index.stop()
+    await blog_related_index.stop()
+    await publish_scheduler.stop()
+    await hot_score_maintainer.stop()
+    await forum_events.stop()
+    await forum_reconciler.stop()
+    await upload_session_sweeper.stop()
+    await image_derivatives.stop()
     await database.disconnect()
     print("Disconnected from database")
 
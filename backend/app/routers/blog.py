@@ -1,14 +1,30 @@
-import xml.etree.ElementTree as ET
 from datetime import datetime
+from email.utils import format_datetime
 from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import PlainTextResponse, Response
-from pydantic import BaseModel
-
-from ..core.auth import get_current_user, get_current_user_optional
-from ..core.database import database
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+from pymongo.errors import DuplicateKeyError
+
+from ..core.auth import (
+    ROLE_ACCESS_LEVELS,
+    get_current_user,
+    get_current_user_optional,
+)
+from ..core.blog_archive import created_at_range, get_archive, update_archive
+from ..core.blog_related import blog_related_index
+from ..core.blog_scheduler import publish_scheduler
+from ..core.blog_slugs import next_available_slug, slugify
+from ..core.blog_stats import blog_stats
+from ..core.blog_taxonomy import get_taxonomy, update_taxonomy
+from ..core.cache import response_cache
+from ..core.content import derive_content_fields
+from ..core.database import database, object_id_or_str
+from ..core.dates import to_utc_naive
+from ..core.feeds import FEED_MEDIA_TYPES, empty_feed, get_feed, is_not_modified
+from ..core.related import related_index
 
 router = APIRouter()
 
@@ -27,6 +43,14 @@ class BlogPost(BaseModel):
     excerpt: Optional[str] = None
     reading_time: Optional[int] = None
     views: int = 0
+    publish_at: Optional[datetime] = None
+
+
+# slug 충돌 시 재시도 횟수
+MAX_SLUG_ATTEMPTS = 5
+
+# 비로그인 목록 캐시용 직렬화기
+BLOG_POST_LIST = TypeAdapter(List[BlogPost])
 
 
 class BlogPostCreate(BaseModel):
@@ -37,6 +61,7 @@ class BlogPostCreate(BaseModel):
     published: bool = True
     slug: Optional[str] = None
     excerpt: Optional[str] = None
+    publish_at: Optional[datetime] = None  # 지정 시 해당 시각에 예약 발행
 
 
 @router.get("/posts", response_model=List[BlogPost])
@@ -46,6 +71,10 @@ async def get_blog_posts(
     published: Optional[bool] = None,
     tag: Optional[str] = Query(None, description="태그로 필터링"),
     category: Optional[str] = Query(None, description="카테고리로 필터링"),
+    year: Optional[int] = Query(None, ge=1, le=9999, description="작성 연도로 필터링"),
+    month: Optional[int] = Query(
+        None, ge=1, le=12, description="작성 월로 필터링 (year와 함께 사용)"
+    ),
     sort_by: str = Query(
         "created_at", description="정렬 기준: created_at, views, title"
     ),
@@ -53,9 +82,31 @@ async def get_blog_posts(
     include_private: bool = Query(False, description="비공개 글 포함 여부"),
     current_user: Optional[Dict[str, Any]] = Depends(get_current_user_optional),
 ):
-    """블로그 포스트 목록 조회 (태그/카테고리 필터링 및 정렬 지원, 권한별 접근 제어)"""
+    """블로그 포스트 목록 조회 (태그/카테고리/연월 필터링 및 정렬 지원, 권한별 접근 제어)"""
+
+    if month is not None and year is None:
+        raise HTTPException(status_code=400, detail="month requires year")
 
     try:
+        # 비로그인 목록은 필터/페이지 단위로 직렬화된 응답을 캐시
+        cache_params = (
+            skip,
+            limit,
+            published,
+            tag,
+            category,
+            year,
+            month,
+            sort_by,
+            order,
+        )
+        # 조회 전 버전을 읽어 두어 조회 중 쓰기가 있으면 결과를 저장하지 않음
+        cache_version = response_cache.version("blog_posts")
+        if not current_user:
+            cached = response_cache.get("blog_posts", cache_params)
+            if cached is not None:
+                return Response(content=cached, media_type="application/json")
+
         collection = database.get_collection("blog_posts")
 
         # 권한별 필터링을 위한 쿼리 조건 구성
@@ -91,6 +142,10 @@ async def get_blog_posts(
         if category:
             query_filter["categories"] = {"$in": [category]}
 
+        # 연/월 필터링 (created_at 인덱스 범위 조회)
+        if year is not None:
+            query_filter.update(created_at_range(year, month))
+
         # 정렬 설정
         sort_order = 1 if order.lower() == "asc" else -1
         sort_criteria = [(sort_by, sort_order)]
@@ -114,13 +169,96 @@ async def get_blog_posts(
         )
         print(f"📰 Blog posts access: {len(posts)} posts by {user_info}")
 
-        return [BlogPost(**post) for post in posts]
+        blog_posts = [BlogPost(**post) for post in posts]
+        if not current_user:
+            body = BLOG_POST_LIST.dump_json(blog_posts)
+            response_cache.set("blog_posts", cache_params, body, cache_version)
+            return Response(content=body, media_type="application/json")
+
+        return blog_posts
 
     except Exception as e:
         print(f"❌ [Blog] Error fetching blog posts: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch blog posts")
 
 
+def check_blog_post_access(
+    post: Dict[str, Any], current_user: Optional[Dict[str, Any]]
+) -> None:
+    """게시물 권한별 접근 제어 (접근 불가 시 HTTPException)"""
+    access_level = post.get("access_level", "public")
+    user_role = current_user.get("role", "guest") if current_user else "guest"
+
+    # 접근 권한 체크
+    if access_level == "user" and not current_user:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다")
+    elif access_level == "moderator" and user_role not in ["admin", "moderator"]:
+        raise HTTPException(status_code=403, detail="운영자 권한이 필요합니다")
+    elif access_level == "admin" and user_role != "admin":
+        raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다")
+
+    # 비공개 글 접근 제어
+    if not post.get("published", True):
+        if not current_user:
+            raise HTTPException(
+                status_code=404, detail="블로그 포스트를 찾을 수 없습니다"
+            )
+        # 작성자나 관리자만 비공개 글 접근 가능
+        if post.get("author_id") != current_user.get("user_id") and user_role not in [
+            "admin",
+            "moderator",
+        ]:
+            raise HTTPException(
+                status_code=404, detail="블로그 포스트를 찾을 수 없습니다"
+            )
+
+
+def blog_post_response(
+    post: Dict[str, Any], current_user: Optional[Dict[str, Any]]
+) -> BlogPost:
+    """접근 권한 확인 후 응답 모델로 변환"""
+    check_blog_post_access(post, current_user)
+
+    # _id를 id로 변환
+    post["_id"] = str(post["_id"])
+    post["id"] = post["_id"]
+
+    # 로그 기록
+    user_role = current_user.get("role", "guest") if current_user else "guest"
+    user_info = (
+        f"user: {current_user.get('username')} ({user_role})"
+        if current_user
+        else "public"
+    )
+    print(f"📖 Blog post access: {post['title']} by {user_info}")
+
+    return BlogPost(**post)
+
+
+@router.get("/posts/by-slug/{slug}", response_model=BlogPost)
+async def get_blog_post_by_slug(
+    slug: str,
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user_optional),
+):
+    """slug로 블로그 포스트 조회 - 권한별 접근 제어 (유니크 slug 인덱스 조회 1회)"""
+    try:
+        collection = database.get_collection("blog_posts")
+
+        post = await collection.find_one({"slug": slug})
+        if post is None:
+            raise HTTPException(
+                status_code=404, detail="블로그 포스트를 찾을 수 없습니다"
+            )
+
+        return blog_post_response(post, current_user)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ [Blog] Error fetching blog post by slug {slug}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch blog post")
+
+
 @router.get("/posts/{post_id}", response_model=BlogPost)
 async def get_blog_post(
     post_id: str,
@@ -146,51 +284,47 @@ async def get_blog_post(
                 status_code=404, detail="블로그 포스트를 찾을 수 없습니다"
             )
 
-        # 권한별 접근 제어
-        access_level = post.get("access_level", "public")
-        user_role = current_user.get("role", "guest") if current_user else "guest"
+        return blog_post_response(post, current_user)
 
-        # 접근 권한 체크
-        if access_level == "user" and not current_user:
-            raise HTTPException(status_code=401, detail="로그인이 필요합니다")
-        elif access_level == "moderator" and user_role not in ["admin", "moderator"]:
-            raise HTTPException(status_code=403, detail="운영자 권한이 필요합니다")
-        elif access_level == "admin" and user_role != "admin":
-            raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다")
-
-        # 비공개 글 접근 제어
-        if not post.get("published", True):
-            if not current_user:
-                raise HTTPException(
-                    status_code=404, detail="블로그 포스트를 찾을 수 없습니다"
-                )
-            # 작성자나 관리자만 비공개 글 접근 가능
-            if post.get("author_id") != current_user.get(
-                "user_id"
-            ) and user_role not in ["admin", "moderator"]:
-                raise HTTPException(
-                    status_code=404, detail="블로그 포스트를 찾을 수 없습니다"
-                )
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ [Blog] Error fetching blog post {post_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch blog post")
 
-        # _id를 id로 변환
-        post["_id"] = str(post["_id"])
-        post["id"] = post["_id"]
 
-        # 로그 기록
-        user_info = (
-            f"user: {current_user.get('username')} ({user_role})"
-            if current_user
-            else "public"
-        )
-        print(f"📖 Blog post access: {post['title']} by {user_info}")
+@router.get("/posts/{post_id}/related")
+async def get_related_blog_posts(
+    post_id: str,
+    limit: int = Query(5, ge=1, le=20),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user_optional),
+):
+    """연관 게시물 조회 (사전 계산된 태그/카테고리 가중 Jaccard 이웃 목록)"""
+    try:
+        entry = await blog_related_index.get_related(post_id)
+        if not entry:
+            return {"post_id": post_id, "related": []}
+
+        user_role = current_user.get("role", "guest") if current_user else "guest"
+        allowed = ROLE_ACCESS_LEVELS.get(user_role, ROLE_ACCESS_LEVELS["guest"])
+
+        # 원본 게시물에 접근할 수 없으면 연관 목록도 노출하지 않음
+        if entry.get("access_level", "public") not in allowed:
+            raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
 
-        return BlogPost(**post)
+        related = [
+            item
+            for item in entry.get("related", [])
+            if item.get("access_level", "public") in allowed
+        ][:limit]
+
+        return {"post_id": post_id, "related": related}
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ [Blog] Error fetching blog post {post_id}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to fetch blog post")
+        print(f"❌ [Blog] Error fetching related posts {post_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch related posts")
 
 
 @router.post("/posts", response_model=BlogPost)
@@ -199,6 +333,13 @@ async def create_blog_post(post: BlogPostCreate):
     try:
         collection = database.get_collection("blog_posts")
 
+        # 예약 발행: 미래 시각이면 비공개로 저장하고 스케줄러에 등록
+        publish_at = None
+        if post.publish_at is not None:
+            publish_at = to_utc_naive(post.publish_at)
+            if publish_at <= datetime.utcnow():
+                publish_at = None
+
         # 새 포스트 데이터 생성
         new_post = {
             "title": post.title,
@@ -208,19 +349,39 @@ async def create_blog_post(post: BlogPostCreate):
             "updated_at": datetime.now().isoformat() + "Z",
             "tags": post.tags,
             "categories": post.categories,
-            "published": post.published,
-            "slug": post.slug or post.title.lower().replace(" ", "-"),
-            "excerpt": post.excerpt,
-            "reading_time": 5,  # TODO: 실제 계산
+            "published": post.published and publish_at is None,
+            **derive_content_fields(post.content, post.excerpt),
             "views": 0,
             "access_level": "public",
         }
 
-        # 데이터베이스에 삽입
-        result = await collection.insert_one(new_post)
+        if publish_at is not None:
+            new_post["publish_at"] = publish_at
+
+        # 데이터베이스에 삽입 (slug 충돌 시 `-2`, `-3` … 접미사, 동시 생성은 유니크 인덱스로 재시도)
+        base_slug = slugify(post.slug or post.title)
+        for attempt in range(MAX_SLUG_ATTEMPTS):
+            new_post["slug"] = await next_available_slug(base_slug)
+            try:
+                result = await collection.insert_one(new_post)
+                break
+            except DuplicateKeyError:
+                new_post.pop("_id", None)
+                if attempt == MAX_SLUG_ATTEMPTS - 1:
+                    raise
         new_post["_id"] = str(result.inserted_id)
+
+        if publish_at is not None:
+            publish_scheduler.schedule(new_post["_id"], publish_at)
         new_post["id"] = new_post["_id"]
 
+        await update_taxonomy(None, new_post)
+        if new_post["published"]:
+            await update_archive(new_post["created_at"], 1)
+        related_index.request_refresh()
+        blog_related_index.request_update(new_post["_id"])
+        response_cache.bump("blog_posts")
+
         return BlogPost(**new_post)
 
     except Exception as e:
@@ -228,25 +389,29 @@ async def create_blog_post(post: BlogPostCreate):
         raise HTTPException(status_code=500, detail="Failed to create blog post")
 
 
-@router.get("/tags")
-async def get_all_tags():
-    """모든 태그 목록 조회"""
+@router.get("/archive")
+async def get_blog_archive():
+    """연/월별 게시물 수 조회 (`blog_archive` 요약 컬렉션, 게시된 글 기준)"""
     try:
-        collection = database.get_collection("blog_posts")
+        buckets = await get_archive()
+        return {
+            "archive": [
+                {key: bucket[key] for key in ("year", "month", "label", "count")}
+                for bucket in buckets
+            ]
+        }
 
-        # 모든 게시물의 태그를 가져와서 중복 제거
-        posts = await collection.find({}, {"tags": 1}).to_list(length=None)
-        all_tags = set()
-        for post in posts:
-            all_tags.update(post.get("tags", []))
+    except Exception as e:
+        print(f"❌ [Blog] Error fetching archive: {e}")
+        return {"archive": []}
 
-        # 태그별 게시물 수 계산
-        tag_counts = {}
-        for tag in all_tags:
-            count = await collection.count_documents({"tags": {"$in": [tag]}})
-            tag_counts[tag] = count
 
-        return {"tags": sorted(list(all_tags)), "tag_counts": tag_counts}
+@router.get("/tags")
+async def get_all_tags():
+    """모든 태그 목록 조회 (`blog_taxonomy` 문서 1건 조회)"""
+    try:
+        tag_counts = await get_taxonomy("tags")
+        return {"tags": sorted(tag_counts), "tag_counts": tag_counts}
 
     except Exception as e:
         print(f"❌ [Blog] Error fetching tags: {e}")
@@ -255,26 +420,11 @@ async def get_all_tags():
 
 @router.get("/categories")
 async def get_all_categories():
-    """모든 카테고리 목록 조회"""
+    """모든 카테고리 목록 조회 (`blog_taxonomy` 문서 1건 조회)"""
     try:
-        collection = database.get_collection("blog_posts")
-
-        # 모든 게시물의 카테고리를 가져와서 중복 제거
-        posts = await collection.find({}, {"categories": 1}).to_list(length=None)
-        all_categories = set()
-        for post in posts:
-            all_categories.update(post.get("categories", []))
-
-        # 카테고리별 게시물 수 계산
-        category_counts = {}
-        for category in all_categories:
-            count = await collection.count_documents(
-                {"categories": {"$in": [category]}}
-            )
-            category_counts[category] = count
-
+        category_counts = await get_taxonomy("categories")
         return {
-            "categories": sorted(list(all_categories)),
+            "categories": sorted(category_counts),
             "category_counts": category_counts,
         }
 
@@ -283,100 +433,50 @@ async def get_all_categories():
         return {"categories": [], "category_counts": {}}
 
 
-@router.get("/rss", response_class=PlainTextResponse)
-async def get_blog_rss():
-    """블로그 RSS 피드 생성"""
+async def feed_response(
+    feed_format: str, if_none_match: Optional[str], if_modified_since: Optional[str]
+) -> Response:
+    """캐시된 피드를 조건부 요청 헤더에 맞춰 200 또는 304로 반환"""
+    media_type = FEED_MEDIA_TYPES[feed_format]
     try:
-        collection = database.get_collection("blog_posts")
-        recent_posts_cursor = collection.find(
-            {"published": True}, sort=[("created_at", -1)]
-        ).limit(10)
-        recent_posts = await recent_posts_cursor.to_list(length=10)
-
-        # RSS XML 생성
-        rss_items = []
-        for post in recent_posts:
-            rss_items.append(
-                f"""
-        <item>
-            <title>{post['title']}</title>
-            <description>{post.get('content', '')[:200]}...</description>
-            <link>http://localhost:3000/blog/{post['slug']}</link>
-            <pubDate>{post['created_at'].strftime(
-                '%a, %d %b %Y %H:%M:%S GMT'
-            )}</pubDate>
-            <guid>http://localhost:3000/blog/{post['slug']}</guid>
-        </item>"""
-            )
-
-        rss_xml = f"""<?xml version="1.0" encoding="UTF-8"?>
-<rss version="2.0">
-    <channel>
-        <title>NDASH Blog</title>
-        <description>Latest blog posts from NDASH</description>
-        <link>http://localhost:3000/blog</link>
-        {''.join(rss_items)}
-    </channel>
-</rss>"""
+        feed = await get_feed(feed_format)
+    except Exception as e:
+        print(f"❌ [Blog] Error generating {feed_format} feed: {e}")
+        return Response(content=empty_feed(feed_format), media_type=media_type)
+
+    headers = {
+        "ETag": feed.etag,
+        "Last-Modified": format_datetime(feed.last_modified, usegmt=True),
+        "Cache-Control": "public, max-age=60",
+    }
+    if is_not_modified(feed, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+    return Response(content=feed.body, media_type=media_type, headers=headers)
+
+
+@router.get("/rss")
+async def get_blog_rss(
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+):
+    """블로그 RSS 2.0 피드 (블로그 변경 시에만 다시 생성, ETag/Last-Modified 지원)"""
+    return await feed_response("rss", if_none_match, if_modified_since)
 
-        return rss_xml
 
-    except Exception as e:
-        print(f"❌ [Blog] Error generating RSS feed: {e}")
-        return """<?xml version="1.0" encoding="UTF-8"?>
-<rss version="2.0">
-    <channel>
-        <title>NDASH Blog</title>
-        <description>Latest blog posts from NDASH</description>
-        <link>http://localhost:3000/blog</link>
-    </channel>
-</rss>"""
+@router.get("/atom")
+async def get_blog_atom(
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+):
+    """블로그 Atom 1.0 피드 (블로그 변경 시에만 다시 생성, ETag/Last-Modified 지원)"""
+    return await feed_response("atom", if_none_match, if_modified_since)
 
 
 @router.get("/stats")
 async def get_blog_stats(current_user: dict = Depends(get_current_user_optional)):
-    """블로그 통계 정보 조회"""
+    """블로그 통계 정보 조회 (`$facet` 집계 스냅샷, stale-while-revalidate)"""
     try:
-        collection = database.get_collection("blog_posts")
-
-        # 기본 통계 계산
-        total_posts = await collection.count_documents({})
-        published_posts = await collection.count_documents({"published": True})
-        draft_posts = total_posts - published_posts
-
-        # 카테고리별 통계
-        category_stats = {}
-        posts_cursor = collection.find({}, {"categories": 1})
-        async for post in posts_cursor:
-            for category in post.get("categories", []):
-                category_stats[category] = category_stats.get(category, 0) + 1
-
-        # 최근 게시물 (5개)
-        recent_posts_cursor = collection.find(
-            {"published": True},
-            {"title": 1, "slug": 1, "created_at": 1},
-            sort=[("created_at", -1)],
-        ).limit(5)
-        recent_posts = await recent_posts_cursor.to_list(length=5)
-
-        # ObjectId를 문자열로 변환
-        for post in recent_posts:
-            post["id"] = str(post.pop("_id"))
-
-        # 총 조회수 계산 (views 필드가 있는 경우)
-        total_views = 0
-        views_cursor = collection.find({}, {"views": 1})
-        async for post in views_cursor:
-            total_views += post.get("views", 0)
-
-        return {
-            "total_posts": total_posts,
-            "published_posts": published_posts,
-            "draft_posts": draft_posts,
-            "total_views": total_views,
-            "category_stats": category_stats,
-            "recent_posts": recent_posts,
-        }
+        return await blog_stats.get()
 
     except Exception as e:
         print(f"❌ [Blog] Error fetching blog stats: {e}")
@@ -4,8 +4,14 @@ from typing import Any, Dict, List, Optional
 from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from ..core.auth import get_current_user, get_current_user_optional
+from ..core.auth import (
+    ROLE_ACCESS_LEVELS,
+    get_current_user,
+    get_current_user_optional,
+)
+from ..core.content import derive_content_fields
 from ..core.database import database
+from ..core.related import related_index
 from ..core.revalidation import revalidation_service
 
 router = APIRouter()
@@ -130,6 +136,47 @@ async def get_navigation():
         )
 
 
+@router.get("/related/{slug:path}")
+async def get_related_documents(
+    slug: str,
+    limit: int = 5,
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user_optional),
+):
+    """연관 콘텐츠 조회 (사전 계산된 TF-IDF 이웃 목록)
+
+    `/related/` 접두어를 써서 `related`로 끝나는 문서 slug와 겹치지 않게 한다.
+    """
+    try:
+        entry = await related_index.get_related(f"docs:{slug}")
+        if not entry:
+            return {"slug": slug, "related": []}
+
+        user_role = current_user.get("role", "guest") if current_user else "guest"
+        allowed = ROLE_ACCESS_LEVELS.get(user_role, ROLE_ACCESS_LEVELS["guest"])
+
+        # 원본 문서에 접근할 수 없으면 연관 목록도 노출하지 않음
+        if entry.get("access_level", "public") not in allowed:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="접근 권한이 없습니다"
+            )
+
+        related = [
+            item
+            for item in entry.get("related", [])
+            if item.get("access_level", "public") in allowed
+        ][:limit]
+
+        return {"slug": slug, "related": related}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"연관 문서 조회 중 오류가 발생했습니다: {str(e)}",
+        )
+
+
 @router.get("/{version}/{lang}/{slug:path}")
 async def get_document_versioned(version: str, lang: str, slug: str):
     """버전별/언어별 문서 조회"""
@@ -248,6 +295,7 @@ async def create_document(document_data: dict):
         document_data["created_at"] = datetime.utcnow()
         document_data["updated_at"] = datetime.utcnow()
         document_data["views"] = 0
+        document_data.update(derive_content_fields(document_data.get("content")))
 
         # 문서 삽입
         result = await collection.insert_one(document_data)
@@ -260,6 +308,7 @@ async def create_document(document_data: dict):
         revalidation_service.trigger_revalidation_background(
             "document-created", created_document.get("slug")
         )
+        related_index.request_refresh()
 
         return created_document
 
@@ -288,6 +337,8 @@ async def update_document(slug: str, document_data: dict):
 
         # 업데이트 시간 추가
         document_data["updated_at"] = datetime.utcnow()
+        if "content" in document_data:
+            document_data.update(derive_content_fields(document_data["content"]))
 
         # slug가 변경되는 경우 중복 확인
         if "slug" in document_data and document_data["slug"] != slug:
@@ -323,6 +374,7 @@ async def update_document(slug: str, document_data: dict):
             revalidation_service.trigger_revalidation_background(
                 "document-updated", slug
             )
+        related_index.request_refresh()
 
         return updated_document
 
@@ -360,6 +412,7 @@ async def delete_document(slug: str):
 
         # Next.js 캐시 무효화 트리거
         revalidation_service.trigger_revalidation_background("document-deleted", slug)
+        related_index.request_refresh()
 
         return {"message": f"문서가 성공적으로 삭제되었습니다: {slug}"}
 
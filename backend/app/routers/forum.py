@@ -1,12 +1,46 @@
-from datetime import datetime
-from typing import List, Optional
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from pydantic import BaseModel
-
-from ..core.auth import get_current_user, get_current_user_optional
-from ..core.database import database
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from pydantic import BaseModel, TypeAdapter
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from ..core.auth import (
+    get_current_user,
+    get_current_user_optional,
+    require_admin,
+    require_moderator,
+)
+from ..core.cache import response_cache
+from ..core.content import derive_content_fields
+from ..core.database import database, object_id_or_str
+from ..core.forum_events import LIST_TOPIC, forum_events, thread_topic
+from ..core.forum_moderation import (
+    TARGET_COLLECTIONS,
+    close_reports,
+    record_report,
+)
+from ..core.forum_ranking import compute_hot_score, hot_score_stage
+from ..core.forum_reconciler import forum_reconciler
+from ..core.forum_threads import (
+    PATH_SEPARATOR,
+    build_reply_tree,
+    child_path,
+    subtree_range,
+)
+from ..core.related import related_index
 
 router = APIRouter()
 
@@ -30,6 +64,11 @@ class ForumPost(BaseModel):
     is_locked: bool = False
     is_draft: bool = False
     is_private: bool = False
+    hot_score: float = 0.0
+    excerpt: Optional[str] = None
+    reading_time: Optional[int] = None
+    word_count: Optional[int] = None
+    my_vote: Optional[str] = None  # include_my_votes 요청 시 현재 사용자의 투표
 
 
 class CreateForumPost(BaseModel):
@@ -60,6 +99,31 @@ class ForumReply(BaseModel):
     dislikes: int = 0
     parent_id: Optional[str] = None  # 대댓글용
     status: str = "active"
+    path: Optional[str] = None  # materialized path (조상 ID들을 "/"로 연결)
+    depth: int = 0
+
+
+class ForumReplyNode(ForumReply):
+    children: List["ForumReplyNode"] = []
+
+
+class ForumReplyTree(BaseModel):
+    post_id: str
+    replies: List[ForumReplyNode]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+
+class ForumThreadViewer(BaseModel):
+    post_vote: Optional[str] = None
+    reply_votes: Dict[str, str] = {}
+
+
+class ForumThread(BaseModel):
+    post: ForumPost
+    replies: List[ForumReply]
+    has_more_replies: bool = False
+    viewer: Optional[ForumThreadViewer] = None
 
 
 class CreateForumReply(BaseModel):
@@ -71,11 +135,102 @@ class VoteRequest(BaseModel):
     type: str  # "like" or "dislike"
 
 
+class MyVotesRequest(BaseModel):
+    post_ids: List[str] = []
+    reply_ids: List[str] = []
+
+
+class MyVotesResponse(BaseModel):
+    posts: Dict[str, str] = {}
+    replies: Dict[str, str] = {}
+
+
 class ReportRequest(BaseModel):
     reason: str
     description: Optional[str] = None
 
 
+class ReportTarget(BaseModel):
+    type: str  # "post" | "reply"
+    id: str
+
+
+class ReportQueueItem(BaseModel):
+    type: str
+    target_id: str
+    post_id: str
+    pending_count: int
+    total_count: int
+    status: str
+    first_reported_at: str
+    last_reported_at: str
+    target_status: Optional[str] = None
+    auto_hidden: bool = False
+    title: Optional[str] = None
+    excerpt: Optional[str] = None
+
+
+class ModerationActionRequest(BaseModel):
+    targets: List[ReportTarget]
+    action: str  # "resolve" | "dismiss"
+
+
+# 비로그인 목록 캐시용 직렬화기
+FORUM_POST_LIST = TypeAdapter(List[ForumPost])
+
+# 투표 상태 일괄 조회 시 최대 ID 수
+MAX_VOTE_LOOKUP_IDS = 200
+
+# 신고 일괄 처리 시 최대 대상 수
+MAX_MODERATION_TARGETS = 100
+
+
+def is_moderator(current_user: Optional[dict]) -> bool:
+    return bool(current_user) and current_user.get("role") in ["admin", "moderator"]
+
+
+def moderation_filter(current_user: Optional[dict]) -> dict:
+    """신고로 숨겨진 게시물/댓글 접근 조건 (운영자만 볼 수 있음)"""
+    if is_moderator(current_user):
+        return {}
+    return {"status": {"$ne": "hidden"}}
+
+
+def post_visibility_filter(current_user: Optional[dict]) -> dict:
+    """초안/비공개 게시물 접근 조건"""
+    if not current_user:
+        # 로그인하지 않은 사용자는 공개된 게시물만 볼 수 있음
+        return {"is_draft": False, "is_private": False}
+
+    # 로그인한 사용자는 자신의 초안과 비공개 게시물은 볼 수 있음
+    return {
+        "$or": [
+            {"is_draft": False, "is_private": False},  # 공개 게시물
+            {"author_id": current_user["user_id"]},  # 본인 게시물
+        ]
+    }
+
+
+async def get_user_votes(
+    user_id: str, vote_kind: str, target_ids: List[str]
+) -> Dict[str, str]:
+    """대상 ID 목록에 대한 사용자의 투표 상태 (`$in` 조회 한 번)"""
+    if not target_ids:
+        return {}
+
+    votes_collection = database.get_collection("forum_votes")
+    cursor = votes_collection.find(
+        {
+            "post_id": {"$in": target_ids},
+            "user_id": user_id,
+            "type": vote_kind,
+            "vote_type": {"$ne": None},
+        },
+        {"post_id": 1, "vote_type": 1},
+    )
+    return {vote["post_id"]: vote["vote_type"] async for vote in cursor}
+
+
 @router.get("/", response_model=List[ForumPost])
 async def get_forum_posts(
     skip: int = 0,
@@ -83,15 +238,29 @@ async def get_forum_posts(
     category: Optional[str] = Query(None, description="카테고리 필터"),
     tag: Optional[str] = Query(None, description="태그 필터"),
     sort_by: str = Query(
-        "created_at", description="정렬 기준: created_at, likes, views, replies_count"
+        "created_at",
+        description="정렬 기준: created_at, likes, views, replies_count, hot",
     ),
     order: str = Query("desc", description="정렬 순서: asc, desc"),
     status: str = Query("active", description="상태 필터: active, all"),
+    include_my_votes: bool = Query(False, description="현재 사용자의 투표 상태 포함"),
     current_user: Optional[dict] = Depends(get_current_user_optional),
 ):
     """게시판 포스트 목록 가져오기 (필터링 및 정렬 지원)"""
 
+    if status == "hidden" and not is_moderator(current_user):
+        raise HTTPException(status_code=403, detail="Moderator access required")
+
     try:
+        # 비로그인 목록은 필터/페이지 단위로 직렬화된 응답을 캐시
+        cache_params = (skip, limit, category, tag, sort_by, order, status)
+        # 조회 전 버전을 읽어 두어 조회 중 쓰기가 있으면 결과를 저장하지 않음
+        cache_version = response_cache.version("forum_posts")
+        if not current_user:
+            cached = response_cache.get("forum_posts", cache_params)
+            if cached is not None:
+                return Response(content=cached, media_type="application/json")
+
         collection = database.get_collection("forum_posts")
         cursor = collection.find().sort("date", -1).skip(skip).limit(limit)
 
@@ -99,32 +268,26 @@ async def get_forum_posts(
         filter_query = {}
         if status != "all":
             filter_query["status"] = status
+        else:
+            filter_query.update(moderation_filter(current_user))
         if category:
             filter_query["category"] = category
         if tag:
             filter_query["tags"] = {"$in": [tag]}
 
         # 초안 및 비공개 게시물 필터링 (소유자가 아닌 경우 제외)
+        visibility_filter = post_visibility_filter(current_user)
         if not current_user:
-            # 로그인하지 않은 사용자는 공개된 게시물만 볼 수 있음
-            filter_query["is_draft"] = False
-            filter_query["is_private"] = False
+            filter_query.update(visibility_filter)
+        elif filter_query:
+            filter_query = {"$and": [filter_query, visibility_filter]}
         else:
-            # 로그인한 사용자는 자신의 초안과 비공개 게시물은 볼 수 있음
-            user_posts_filter = {
-                "$or": [
-                    {"is_draft": False, "is_private": False},  # 공개 게시물
-                    {"author_id": current_user["user_id"]},  # 본인 게시물
-                ]
-            }
-            if filter_query:
-                filter_query = {"$and": [filter_query, user_posts_filter]}
-            else:
-                filter_query = user_posts_filter
+            filter_query = visibility_filter
 
         # 정렬 조건
         sort_direction = 1 if order == "asc" else -1
-        sort_field = sort_by
+        # hot: 저장된 hot_score 인덱스로 정렬
+        sort_field = "hot_score" if sort_by == "hot" else sort_by
 
         # 고정 게시물 우선 정렬
         cursor = (
@@ -140,6 +303,19 @@ async def get_forum_posts(
             post["id"] = post["_id"]
             posts.append(ForumPost(**post))
 
+        # 페이지 전체의 투표 상태를 한 번의 `$in` 조회로 붙이기
+        if include_my_votes and current_user and posts:
+            my_votes = await get_user_votes(
+                current_user["user_id"], "post", [post.id for post in posts]
+            )
+            for post in posts:
+                post.my_vote = my_votes.get(post.id)
+
+        if not current_user:
+            body = FORUM_POST_LIST.dump_json(posts)
+            response_cache.set("forum_posts", cache_params, body, cache_version)
+            return Response(content=body, media_type="application/json")
+
         return posts
 
     except Exception as e:
@@ -150,6 +326,170 @@ async def get_forum_posts(
         )
 
 
+@router.post("/votes/mine", response_model=MyVotesResponse)
+async def get_my_votes(
+    request: MyVotesRequest, current_user: dict = Depends(get_current_user)
+):
+    """여러 게시물/댓글에 대한 현재 사용자의 투표 상태 일괄 조회 (쿼리 1회)"""
+    if len(request.post_ids) + len(request.reply_ids) > MAX_VOTE_LOOKUP_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many ids (max {MAX_VOTE_LOOKUP_IDS})",
+        )
+
+    try:
+        targets = []
+        if request.post_ids:
+            targets.append({"type": "post", "post_id": {"$in": request.post_ids}})
+        if request.reply_ids:
+            targets.append({"type": "reply", "post_id": {"$in": request.reply_ids}})
+        if not targets:
+            return MyVotesResponse()
+
+        votes_collection = database.get_collection("forum_votes")
+        cursor = votes_collection.find(
+            {
+                "user_id": current_user["user_id"],
+                "vote_type": {"$ne": None},
+                "$or": targets,
+            },
+            {"post_id": 1, "type": 1, "vote_type": 1},
+        )
+
+        response = MyVotesResponse()
+        async for vote in cursor:
+            votes = response.posts if vote["type"] == "post" else response.replies
+            votes[vote["post_id"]] = vote["vote_type"]
+
+        return response
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch votes: {str(e)}",
+        )
+
+
+@router.get("/admin/reconcile")
+async def get_reconcile_stats(current_user: dict = Depends(require_admin)):
+    """카운터 정합성 작업의 누적 보정(drift) 지표 조회 (관리자 전용)"""
+    return forum_reconciler.stats
+
+
+@router.post("/admin/reconcile")
+async def run_reconcile(
+    full: bool = Query(False, description="워터마크를 무시하고 전체 점검"),
+    current_user: dict = Depends(require_admin),
+):
+    """카운터 정합성 작업 즉시 실행 (관리자 전용)"""
+    try:
+        return await forum_reconciler.run_once(full=full)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to reconcile forum counters: {str(e)}",
+        )
+
+
+@router.get("/moderation/queue", response_model=List[ReportQueueItem])
+async def get_moderation_queue(
+    target_type: Optional[str] = Query(
+        None, alias="type", description="post 또는 reply"
+    ),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(require_moderator),
+):
+    """신고 대기열 (대기 신고 수 많은 순, 운영자 전용)"""
+    try:
+        query = {"status": "pending", "pending_count": {"$gt": 0}}
+        if target_type:
+            query["type"] = target_type
+
+        targets = (
+            await database.get_collection("forum_report_targets")
+            .find(query)
+            .sort([("pending_count", -1), ("last_reported_at", -1)])
+            .skip(skip)
+            .limit(limit)
+            .to_list(length=limit)
+        )
+
+        # 대상 내용은 종류별 `$in` 조회 한 번으로 붙이기
+        contents = {}
+        for target_type, collection_name in TARGET_COLLECTIONS.items():
+            ids = [t["target_id"] for t in targets if t["type"] == target_type]
+            if not ids:
+                continue
+            cursor = database.get_collection(collection_name).find(
+                {"_id": {"$in": [object_id_or_str(value) for value in ids]}},
+                {"title": 1, "excerpt": 1, "status": 1, "auto_hidden": 1},
+            )
+            async for document in cursor:
+                contents[(target_type, str(document["_id"]))] = document
+
+        queue = []
+        for target in targets:
+            content = contents.get((target["type"], target["target_id"]), {})
+            queue.append(
+                ReportQueueItem(
+                    **{key: value for key, value in target.items() if key != "_id"},
+                    target_status=content.get("status"),
+                    auto_hidden=content.get("auto_hidden", False),
+                    title=content.get("title"),
+                    excerpt=content.get("excerpt"),
+                )
+            )
+        return queue
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch moderation queue: {str(e)}",
+        )
+
+
+@router.post("/moderation/resolve")
+async def resolve_reports(
+    request: ModerationActionRequest,
+    current_user: dict = Depends(require_moderator),
+):
+    """신고 일괄 처리 (resolve: 숨김 확정, dismiss: 기각 및 자동 숨김 복원)"""
+    if request.action not in ("resolve", "dismiss"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Action must be 'resolve' or 'dismiss'",
+        )
+    if not request.targets:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="No targets given"
+        )
+    if len(request.targets) > MAX_MODERATION_TARGETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many targets (max {MAX_MODERATION_TARGETS})",
+        )
+    if any(target.type not in TARGET_COLLECTIONS for target in request.targets):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Target type must be 'post' or 'reply'",
+        )
+
+    try:
+        result = await close_reports(
+            [target.model_dump() for target in request.targets],
+            request.action,
+            current_user["user_id"],
+        )
+        return {"message": f"Reports {request.action}d", **result}
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update reports: {str(e)}",
+        )
+
+
 @router.get("/drafts", response_model=List[ForumPost])
 async def get_user_drafts(
     skip: int = 0, limit: int = 20, current_user: dict = Depends(get_current_user)
@@ -185,8 +525,10 @@ async def get_user_drafts(
 
 
 @router.get("/{post_id}")
-async def get_forum_post(post_id: str):
-    """특정 게시판 포스트 가져오기"""
+async def get_forum_post(
+    post_id: str, current_user: Optional[dict] = Depends(get_current_user_optional)
+):
+    """특정 게시판 포스트 가져오기 (숨김 게시물은 운영자만)"""
 
     print(f"🔍 [Forum] Searching for post with ID: {post_id}")
 
@@ -210,6 +552,9 @@ async def get_forum_post(post_id: str):
             post = await collection.find_one({"_id": post_id})
             print(f"🔍 [Forum] Searched with string: {post_id}")
 
+        if post and post.get("status") == "hidden" and not is_moderator(current_user):
+            post = None
+
         if not post:
             print(f"❌ [Forum] Post not found with ID: {post_id}")
             raise HTTPException(
@@ -242,6 +587,94 @@ async def get_forum_post(post_id: str):
         )
 
 
+@router.get("/{post_id}/thread", response_model=ForumThread)
+async def get_forum_thread(
+    post_id: str,
+    reply_limit: int = Query(50, ge=1, le=200, description="첫 댓글 페이지 크기"),
+    current_user: Optional[dict] = Depends(get_current_user_optional),
+):
+    """게시물, 첫 댓글 페이지, 현재 사용자의 투표 상태를 한 번에 조회
+
+    게시물 조회(조회수 증가 포함), 댓글 조회, 투표 조회를 동시에 실행한다.
+    게시물 접근 조건은 목록 조회와 같은 초안/비공개 규칙을 따른다.
+    """
+    try:
+        posts_collection = database.get_collection("forum_posts")
+        replies_collection = database.get_collection("forum_replies")
+
+        async def load_post():
+            return await posts_collection.find_one_and_update(
+                {
+                    "_id": object_id_or_str(post_id),
+                    **post_visibility_filter(current_user),
+                    **moderation_filter(current_user),
+                },
+                {"$inc": {"views": 1}},
+                return_document=ReturnDocument.AFTER,
+            )
+
+        async def load_replies():
+            replies = (
+                await replies_collection.find({"post_id": post_id, "status": "active"})
+                .sort("created_at", 1)
+                .limit(reply_limit + 1)
+                .to_list(length=reply_limit + 1)
+            )
+            reply_votes = {}
+            if current_user and replies:
+                reply_votes = await get_user_votes(
+                    current_user["user_id"],
+                    "reply",
+                    [str(reply["_id"]) for reply in replies[:reply_limit]],
+                )
+            return replies, reply_votes
+
+        async def load_post_vote():
+            if not current_user:
+                return {}
+            return await get_user_votes(current_user["user_id"], "post", [post_id])
+
+        post, (replies, reply_votes), post_votes = await asyncio.gather(
+            load_post(), load_replies(), load_post_vote()
+        )
+
+        if not post:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Forum post not found"
+            )
+
+        post["_id"] = str(post["_id"])
+        post["id"] = post["_id"]
+
+        reply_models = []
+        for reply in replies[:reply_limit]:
+            reply["_id"] = str(reply["_id"])
+            reply["id"] = reply["_id"]
+            reply_models.append(ForumReply(**reply))
+
+        viewer = None
+        if current_user:
+            viewer = ForumThreadViewer(
+                post_vote=post_votes.get(post_id), reply_votes=reply_votes
+            )
+
+        return ForumThread(
+            post=ForumPost(**post),
+            replies=reply_models,
+            has_more_replies=len(replies) > reply_limit,
+            viewer=viewer,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ [Forum] Error fetching forum thread {post_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch forum thread",
+        )
+
+
 @router.post("/", response_model=ForumPost)
 async def create_forum_post(
     post_data: CreateForumPost, current_user: dict = Depends(get_current_user_optional)
@@ -251,12 +684,15 @@ async def create_forum_post(
     try:
         collection = database.get_collection("forum_posts")
 
+        now = datetime.now(timezone.utc)
         new_post = {
             "title": post_data.title,
             "content": post_data.content,
             "author": "hello",  # current_user["username"],
             "author_id": "world",  # current_user["user_id"],
-            "created_at": datetime.utcnow().isoformat(),
+            "created_at": now.replace(tzinfo=None).isoformat(),
+            "created_ts": now.timestamp(),
+            "hot_score": compute_hot_score(0, 0, 0, now.timestamp()),
             "replies_count": 0,
             "views": 0,
             "likes": 0,
@@ -268,6 +704,7 @@ async def create_forum_post(
             "is_locked": False,
             "is_draft": post_data.is_draft,
             "is_private": post_data.is_private,
+            **derive_content_fields(post_data.content),
         }
 
         result = await collection.insert_one(new_post)
@@ -275,6 +712,9 @@ async def create_forum_post(
         new_post["_id"] = str(result.inserted_id)
         new_post["id"] = new_post["_id"]
 
+        related_index.request_refresh()
+        response_cache.bump("forum_posts")
+
         return ForumPost(**new_post)
 
     except Exception:  # noqa: F841
@@ -317,6 +757,7 @@ async def update_forum_post(
             update_data["title"] = post_data.title
         if post_data.content is not None:
             update_data["content"] = post_data.content
+            update_data.update(derive_content_fields(post_data.content))
         if post_data.tags is not None:
             update_data["tags"] = post_data.tags
         if post_data.category is not None:
@@ -330,6 +771,9 @@ async def update_forum_post(
         updated_post["_id"] = str(updated_post["_id"])
         updated_post["id"] = updated_post["_id"]
 
+        related_index.request_refresh()
+        response_cache.bump("forum_posts")
+
         return ForumPost(**updated_post)
 
     except HTTPException:
@@ -376,6 +820,7 @@ async def delete_forum_post(
                 }
             },
         )
+        response_cache.bump("forum_posts")
 
         return {"message": "Forum post deleted successfully"}
 
@@ -418,6 +863,74 @@ async def get_forum_replies(post_id: str, skip: int = 0, limit: int = 50):
         )
 
 
+@router.get("/{post_id}/replies/tree", response_model=ForumReplyTree)
+async def get_forum_reply_tree(
+    post_id: str,
+    root_id: Optional[str] = Query(None, description="하위 트리의 기준 댓글 ID"),
+    max_depth: int = Query(3, ge=0, le=20, description="첫 단계로부터의 최대 깊이"),
+    limit: int = Query(100, ge=1, le=500, description="페이지당 댓글 수"),
+    after: Optional[str] = Query(None, description="이전 페이지의 next_cursor"),
+):
+    """댓글 트리 조회 (materialized path 범위 조회 한 번으로 깊이 제한 하위 트리 반환)
+
+    결과는 경로순(전위 순회)으로 잘리므로, 다음 페이지의 첫 댓글은 부모가 이전 페이지에
+    있을 수 있다. 이 경우 해당 댓글은 최상위에 놓이며 `parent_id`로 연결할 수 있다.
+    """
+    try:
+        collection = database.get_collection("forum_replies")
+
+        query = {"post_id": post_id, "status": "active"}
+        path_range = {}
+        base_depth = 0
+
+        if root_id:
+            root = await collection.find_one(
+                {
+                    "_id": object_id_or_str(root_id),
+                    "post_id": post_id,
+                    "status": "active",
+                },
+                {"path": 1, "depth": 1},
+            )
+            if not root or not root.get("path"):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Reply not found"
+                )
+            path_range = subtree_range(root["path"])
+            base_depth = root.get("depth", 0) + 1
+        if after:
+            path_range["$gt"] = after
+        if path_range:
+            query["path"] = path_range
+        query["depth"] = {"$lte": base_depth + max_depth}
+
+        cursor = collection.find(query).sort("path", 1).limit(limit + 1)
+        replies = []
+        async for reply in cursor:
+            reply["_id"] = str(reply["_id"])
+            reply["id"] = reply["_id"]
+            replies.append(ForumReply(**reply).model_dump())
+
+        has_more = len(replies) > limit
+        replies = replies[:limit]
+
+        return ForumReplyTree(
+            post_id=post_id,
+            replies=build_reply_tree(replies),
+            next_cursor=replies[-1]["path"] if has_more else None,
+            has_more=has_more,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ [Forum] Error fetching reply tree for post {post_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch reply tree",
+        )
+
+
 @router.post("/{post_id}/replies", response_model=ForumReply)
 async def create_forum_reply(
     post_id: str,
@@ -443,7 +956,24 @@ async def create_forum_reply(
 
         replies_collection = database.get_collection("forum_replies")
 
+        # 대댓글이면 부모 경로 뒤에 새 댓글 ID를 붙여 materialized path 구성
+        reply_id = ObjectId()
+        parent_path = None
+        if reply_data.parent_id:
+            parent = await replies_collection.find_one(
+                {"_id": object_id_or_str(reply_data.parent_id), "post_id": post_id},
+                {"path": 1},
+            )
+            if not parent:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Parent reply not found",
+                )
+            parent_path = parent.get("path") or str(parent["_id"])
+        path = child_path(parent_path, str(reply_id))
+
         new_reply = {
+            "_id": reply_id,
             "post_id": post_id,
             "content": reply_data.content,
             "author": current_user["username"],
@@ -453,19 +983,40 @@ async def create_forum_reply(
             "dislikes": 0,
             "parent_id": reply_data.parent_id,
             "status": "active",
+            "path": path,
+            "depth": path.count(PATH_SEPARATOR),
         }
 
         result = await replies_collection.insert_one(new_reply)
 
-        # 게시물 댓글 수 증가
-        await posts_collection.update_one(
-            {"_id": ObjectId(post_id)}, {"$inc": {"replies_count": 1}}
+        # 게시물 댓글 수 증가 및 hot 점수 재계산
+        updated_post = await posts_collection.find_one_and_update(
+            {"_id": ObjectId(post_id)},
+            [
+                {
+                    "$set": {
+                        "replies_count": {
+                            "$add": [{"$ifNull": ["$replies_count", 0]}, 1]
+                        }
+                    }
+                },
+                hot_score_stage(),
+            ],
+            projection=EVENT_PROJECTION,
+            return_document=ReturnDocument.AFTER,
         )
 
         new_reply["_id"] = str(result.inserted_id)
         new_reply["id"] = new_reply["_id"]
+        reply = ForumReply(**new_reply)
+        response_cache.bump("forum_posts")
 
-        return ForumReply(**new_reply)
+        # 실시간 구독자에게 새 댓글과 댓글 수 알림
+        forum_events.publish_reply_created(reply.model_dump())
+        if updated_post:
+            forum_events.publish_post_stats(updated_post)
+
+        return reply
 
     except HTTPException:
         raise
@@ -477,84 +1028,139 @@ async def create_forum_reply(
 
 
 # 투표 기능
-@router.post("/{post_id}/vote")
-async def vote_forum_post(
-    post_id: str, vote_data: VoteRequest, current_user: dict = Depends(get_current_user)
-):
-    """게시물 추천/비추천"""
-    try:
-        posts_collection = database.get_collection("forum_posts")
-        votes_collection = database.get_collection("forum_votes")
-
-        # 게시물 존재 확인
-        post = await posts_collection.find_one({"_id": ObjectId(post_id)})
-        if not post:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Forum post not found"
-            )
-
-        # 기존 투표 확인
-        existing_vote = await votes_collection.find_one(
-            {"post_id": post_id, "user_id": current_user["user_id"], "type": "post"}
+VOTE_FIELDS = {"like": "likes", "dislike": "dislikes"}
+
+# 실시간 이벤트 구성에 필요한 필드
+EVENT_PROJECTION = {
+    "post_id": 1,
+    "likes": 1,
+    "dislikes": 1,
+    "replies_count": 1,
+    "is_draft": 1,
+    "is_private": 1,
+}
+
+
+async def apply_vote(
+    target_collection_name: str,
+    target_id: str,
+    vote_kind: str,
+    vote_type: str,
+    user_id: str,
+    not_found_detail: str,
+) -> dict:
+    """투표 토글 및 카운터 반영 (최대 2회 왕복)
+
+    1. `(post_id, user_id, type)` 고유 인덱스 기반 upsert로 투표 상태를 원자적으로 토글하고
+       이전 상태를 돌려받는다.
+    2. 이전/새 상태의 차이만큼 대상 문서 카운터를 증감하고(게시물은 hot 점수도 함께
+       재계산) 갱신된 문서를 돌려받는다.
+    대상이 없거나 삭제된 드문 경우에만 이번 토글을 되돌리는 보상 쓰기를 한 번 더 한다.
+    투표 문서의 `vote_type`이 null이면 취소된 투표를 의미한다.
+    """
+    if vote_type not in VOTE_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Vote type must be 'like' or 'dislike'",
         )
 
-        if existing_vote:
-            # 기존 투표와 다르면 업데이트
-            if existing_vote["vote_type"] != vote_data.type:
-                # 이전 투표 취소 및 새 투표 적용
-                old_field = (
-                    "likes" if existing_vote["vote_type"] == "like" else "dislikes"
-                )
-                new_field = "likes" if vote_data.type == "like" else "dislikes"
+    votes_collection = database.get_collection("forum_votes")
+    target_collection = database.get_collection(target_collection_name)
+
+    now = datetime.utcnow().isoformat()
+    vote_key = {"post_id": target_id, "user_id": user_id, "type": vote_kind}
+    toggle = [
+        {
+            "$set": {
+                "vote_type": {
+                    "$cond": [{"$eq": ["$vote_type", vote_type]}, None, vote_type]
+                },
+                "created_at": {"$ifNull": ["$created_at", now]},
+                "updated_at": now,
+            }
+        }
+    ]
 
-                await posts_collection.update_one(
-                    {"_id": ObjectId(post_id)}, {"$inc": {old_field: -1, new_field: 1}}
-                )
+    try:
+        previous = await votes_collection.find_one_and_update(
+            vote_key, toggle, upsert=True, return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        # 동시 첫 투표로 upsert가 경합한 경우 생성된 문서를 대상으로 재시도
+        previous = await votes_collection.find_one_and_update(
+            vote_key, toggle, upsert=True, return_document=ReturnDocument.BEFORE
+        )
 
-                await votes_collection.update_one(
-                    {"_id": existing_vote["_id"]},
-                    {
-                        "$set": {
-                            "vote_type": vote_data.type,
-                            "updated_at": datetime.utcnow().isoformat(),
-                        }
-                    },
-                )
-            else:
-                # 같은 투표면 취소
-                field = "likes" if vote_data.type == "like" else "dislikes"
-                await posts_collection.update_one(
-                    {"_id": ObjectId(post_id)}, {"$inc": {field: -1}}
-                )
+    old_vote = previous.get("vote_type") if previous else None
+    new_vote = None if old_vote == vote_type else vote_type
 
-                await votes_collection.delete_one({"_id": existing_vote["_id"]})
-                return {"message": "Vote removed"}
-        else:
-            # 새 투표
-            field = "likes" if vote_data.type == "like" else "dislikes"
+    increments = {}
+    if old_vote in VOTE_FIELDS:
+        increments[VOTE_FIELDS[old_vote]] = -1
+    if new_vote:
+        increments[VOTE_FIELDS[new_vote]] = increments.get(VOTE_FIELDS[new_vote], 0) + 1
 
-            await posts_collection.update_one(
-                {"_id": ObjectId(post_id)}, {"$inc": {field: 1}}
+    counter_update = [
+        {
+            "$set": {
+                field: {"$add": [{"$ifNull": [f"${field}", 0]}, delta]}
+                for field, delta in increments.items()
+            }
+        }
+    ]
+    if target_collection_name == "forum_posts":
+        counter_update.append(hot_score_stage())
+
+    target = await target_collection.find_one_and_update(
+        {"_id": object_id_or_str(target_id), "status": {"$ne": "deleted"}},
+        counter_update,
+        projection=EVENT_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+
+    if not target:
+        # 대상이 없으면 이번 토글 원복 (그 사이 같은 사용자의 다른 투표가 있었다면
+        # updated_at이 달라 건드리지 않음)
+        applied = {**vote_key, "vote_type": new_vote, "updated_at": now}
+        if previous:
+            await votes_collection.update_one(
+                applied, {"$set": {"vote_type": old_vote}}
             )
+        else:
+            await votes_collection.delete_one(applied)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=not_found_detail
+        )
 
-            new_vote = {
-                "post_id": post_id,
-                "user_id": current_user["user_id"],
-                "type": "post",
-                "vote_type": vote_data.type,
-                "created_at": datetime.utcnow().isoformat(),
-            }
+    # 실시간 구독자에게 갱신된 투표 수 알림
+    if vote_kind == "post":
+        response_cache.bump("forum_posts")
+        forum_events.publish_post_stats(target)
+    else:
+        forum_events.publish_reply_stats(target)
 
-            await votes_collection.insert_one(new_vote)
+    return {
+        "message": "Vote updated" if new_vote else "Vote removed",
+        "vote": new_vote,
+        "likes": target.get("likes", 0),
+        "dislikes": target.get("dislikes", 0),
+    }
 
-        # 업데이트된 게시물 정보 반환
-        updated_post = await posts_collection.find_one({"_id": ObjectId(post_id)})
 
-        return {
-            "message": "Vote updated",
-            "likes": updated_post["likes"],
-            "dislikes": updated_post["dislikes"],
-        }
+@router.post("/{post_id}/vote")
+async def vote_forum_post(
+    post_id: str, vote_data: VoteRequest, current_user: dict = Depends(get_current_user)
+):
+    """게시물 추천/비추천"""
+    try:
+        return await apply_vote(
+            "forum_posts",
+            post_id,
+            "post",
+            vote_data.type,
+            current_user["user_id"],
+            "Forum post not found",
+        )
 
     except HTTPException:
         raise
@@ -573,78 +1179,16 @@ async def vote_forum_reply(
 ):
     """댓글 추천/비추천"""
     try:
-        replies_collection = database.get_collection("forum_replies")
-        votes_collection = database.get_collection("forum_votes")
-
-        # 댓글 존재 확인
-        reply = await replies_collection.find_one({"_id": ObjectId(reply_id)})
-        if not reply:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Reply not found"
-            )
-
-        # 투표 로직은 게시물과 동일
-        existing_vote = await votes_collection.find_one(
-            {
-                "post_id": reply_id,  # reply_id를 post_id로 사용
-                "user_id": current_user["user_id"],
-                "type": "reply",
-            }
+        # reply_id를 post_id로 사용
+        return await apply_vote(
+            "forum_replies",
+            reply_id,
+            "reply",
+            vote_data.type,
+            current_user["user_id"],
+            "Reply not found",
         )
 
-        if existing_vote:
-            if existing_vote["vote_type"] != vote_data.type:
-                old_field = (
-                    "likes" if existing_vote["vote_type"] == "like" else "dislikes"
-                )
-                new_field = "likes" if vote_data.type == "like" else "dislikes"
-
-                await replies_collection.update_one(
-                    {"_id": ObjectId(reply_id)}, {"$inc": {old_field: -1, new_field: 1}}
-                )
-
-                await votes_collection.update_one(
-                    {"_id": existing_vote["_id"]},
-                    {
-                        "$set": {
-                            "vote_type": vote_data.type,
-                            "updated_at": datetime.utcnow().isoformat(),
-                        }
-                    },
-                )
-            else:
-                field = "likes" if vote_data.type == "like" else "dislikes"
-                await replies_collection.update_one(
-                    {"_id": ObjectId(reply_id)}, {"$inc": {field: -1}}
-                )
-
-                await votes_collection.delete_one({"_id": existing_vote["_id"]})
-                return {"message": "Vote removed"}
-        else:
-            field = "likes" if vote_data.type == "like" else "dislikes"
-
-            await replies_collection.update_one(
-                {"_id": ObjectId(reply_id)}, {"$inc": {field: 1}}
-            )
-
-            new_vote = {
-                "post_id": reply_id,
-                "user_id": current_user["user_id"],
-                "type": "reply",
-                "vote_type": vote_data.type,
-                "created_at": datetime.utcnow().isoformat(),
-            }
-
-            await votes_collection.insert_one(new_vote)
-
-        updated_reply = await replies_collection.find_one({"_id": ObjectId(reply_id)})
-
-        return {
-            "message": "Vote updated",
-            "likes": updated_reply["likes"],
-            "dislikes": updated_reply["dislikes"],
-        }
-
     except HTTPException:
         raise
     except Exception as e:
@@ -673,11 +1217,10 @@ async def report_forum_post(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Forum post not found"
             )
 
-        # 중복 신고 방지
+        # 중복 신고 방지 (동시 요청은 유니크 인덱스로 보장)
         existing_report = await reports_collection.find_one(
             {"post_id": post_id, "reporter_id": current_user["user_id"], "type": "post"}
         )
-
         if existing_report:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -695,7 +1238,16 @@ async def report_forum_post(
             "created_at": datetime.utcnow().isoformat(),
         }
 
-        await reports_collection.insert_one(new_report)
+        try:
+            await reports_collection.insert_one(new_report)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="You have already reported this post",
+            )
+
+        # 대상별 신고 집계 및 자동 숨김
+        await record_report("post", post_id)
 
         return {"message": "Report submitted successfully"}
 
@@ -726,7 +1278,7 @@ async def report_forum_reply(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Reply not found"
             )
 
-        # 중복 신고 방지
+        # 중복 신고 방지 (동시 요청은 유니크 인덱스로 보장)
         existing_report = await reports_collection.find_one(
             {
                 "post_id": reply_id,  # reply_id를 post_id로 사용
@@ -734,7 +1286,6 @@ async def report_forum_reply(
                 "type": "reply",
             }
         )
-
         if existing_report:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -743,7 +1294,7 @@ async def report_forum_reply(
 
         # 신고 내역 저장
         new_report = {
-            "post_id": reply_id,
+            "post_id": reply_id,  # reply_id를 post_id로 사용
             "type": "reply",
             "reporter_id": current_user["user_id"],
             "reason": report_data.reason,
@@ -752,7 +1303,16 @@ async def report_forum_reply(
             "created_at": datetime.utcnow().isoformat(),
         }
 
-        await reports_collection.insert_one(new_report)
+        try:
+            await reports_collection.insert_one(new_report)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="You have already reported this reply",
+            )
+
+        # 대상별 신고 집계 및 자동 숨김
+        await record_report("reply", reply_id, reply["post_id"])
 
         return {"message": "Report submitted successfully"}
 
@@ -763,3 +1323,56 @@ async def report_forum_reply(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to submit report: {str(e)}",
         )
+
+
+# 실시간 업데이트
+async def stream_forum_events(websocket: WebSocket, topic: str) -> None:
+    """구독 토픽의 병합된 이벤트를 배치로 전송"""
+    subscription = forum_events.subscribe(topic)
+
+    async def drain_client():
+        # 클라이언트 메시지는 사용하지 않고 연결 종료 감지에만 사용
+        while True:
+            await websocket.receive_text()
+
+    receiver = asyncio.create_task(drain_client())
+    try:
+        while True:
+            batch_task = asyncio.create_task(
+                subscription.next_batch(forum_events.coalesce_seconds)
+            )
+            done, _ = await asyncio.wait(
+                {receiver, batch_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if receiver in done:
+                batch_task.cancel()
+                break
+            await websocket.send_json({"type": "batch", "events": batch_task.result()})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        forum_events.unsubscribe(subscription)
+
+
+@router.websocket("/ws")
+async def forum_list_websocket(websocket: WebSocket):
+    """게시물 목록 실시간 업데이트 (공개 게시물의 투표/댓글 수)"""
+    await websocket.accept()
+    await stream_forum_events(websocket, LIST_TOPIC)
+
+
+@router.websocket("/{post_id}/ws")
+async def forum_thread_websocket(websocket: WebSocket, post_id: str):
+    """게시물 스레드 실시간 업데이트 (새 댓글, 게시물/댓글 투표 수)"""
+    posts_collection = database.get_collection("forum_posts")
+    post = await posts_collection.find_one(
+        {"_id": object_id_or_str(post_id), **post_visibility_filter(None)},
+        {"_id": 1},
+    )
+    if not post:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    await stream_forum_events(websocket, thread_topic(post_id))
@@ -1,13 +1,21 @@
+import asyncio
+import json
+import re
 from datetime import datetime
-from typing import List, Optional, Union
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 
-from ..routers import blog, docs, forum
+from ..core.database import database
+from ..core.forum_visibility import public_post_filter
+from ..routers import docs
 
 router = APIRouter()
 
+# 검색 결과 수 상한 (HTTP/WebSocket 공통)
+MAX_SEARCH_LIMIT = 100
+
 
 class SearchResult(BaseModel):
     id: str
@@ -30,11 +38,180 @@ class SearchResponse(BaseModel):
     took_ms: int
 
 
+def calculate_score(result: SearchResult, q: str) -> float:
+    """관련도 점수 계산 (제목 매치가 높은 점수)"""
+    score = 0.0
+    q_lower = q.lower()
+
+    # 제목에서 정확한 매치
+    if q_lower == result.title.lower():
+        score += 100.0
+    elif q_lower in result.title.lower():
+        score += 50.0
+
+    # 태그 매치
+    if result.tags:
+        for tag in result.tags:
+            if q_lower in tag.lower():
+                score += 20.0
+
+    # 콘텐츠 매치
+    if q_lower in result.content.lower():
+        score += 10.0
+
+    # 타입별 가중치
+    if result.type == "docs":
+        score *= 1.2
+    elif result.type == "blog":
+        score *= 1.1
+
+    return score
+
+
+def _text_query(q: str, fields: List[str]) -> dict:
+    pattern = {"$regex": re.escape(q), "$options": "i"}
+    return {"$or": [{field: pattern} for field in fields]}
+
+
+async def search_docs_source(
+    q: str,
+    limit: int,
+    version: Optional[str] = None,
+    language: Optional[str] = None,
+) -> List[SearchResult]:
+    """문서 검색"""
+    docs_collection = await docs.get_docs_collection()
+    docs_query = _text_query(q, ["title", "content", "metadata.tags"])
+
+    if version:
+        docs_query["version"] = version
+    if language:
+        docs_query["language"] = language
+
+    results = []
+    async for doc in docs_collection.find(docs_query).limit(limit):
+        results.append(
+            SearchResult(
+                id=f"docs-{doc['_id']}",
+                type="docs",
+                title=doc.get("title", ""),
+                content=doc.get("content", ""),
+                url=(
+                    f"/docs/{doc.get('version', 'v1')}/{doc.get('language', 'ko')}/"
+                    f"{doc.get('slug', '')}"
+                ),
+                excerpt=doc.get("metadata", {}).get("description")
+                or doc.get("excerpt"),
+                tags=doc.get("tags", []),
+                category=doc.get("metadata", {}).get("category"),
+                created_at=_as_str(doc.get("created_at")),
+            )
+        )
+    return results
+
+
+async def search_blog_source(q: str, limit: int, **_) -> List[SearchResult]:
+    """블로그 검색 (공개 게시물만)"""
+    collection = database.get_collection("blog_posts")
+    query = {
+        **_text_query(q, ["title", "content", "tags"]),
+        "published": True,
+        "access_level": "public",
+    }
+
+    results = []
+    async for post in collection.find(query).limit(limit):
+        post_id = str(post["_id"])
+        results.append(
+            SearchResult(
+                id=f"blog-{post_id}",
+                type="blog",
+                title=post.get("title", ""),
+                content=post.get("content", ""),
+                url=f"/blog/{post.get('slug') or post_id}",
+                excerpt=post.get("excerpt"),
+                tags=post.get("tags", []),
+                author=post.get("author"),
+                created_at=_as_str(post.get("created_at")),
+            )
+        )
+    return results
+
+
+async def search_forum_source(q: str, limit: int, **_) -> List[SearchResult]:
+    """포럼 검색 (공개 게시물만)"""
+    collection = database.get_collection("forum_posts")
+    query = {
+        **_text_query(q, ["title", "content", "tags"]),
+        **public_post_filter(),
+    }
+
+    results = []
+    async for post in collection.find(query).limit(limit):
+        post_id = str(post["_id"])
+        results.append(
+            SearchResult(
+                id=f"forum-{post_id}",
+                type="forum",
+                title=post.get("title", ""),
+                content=post.get("content", ""),
+                url=f"/forum/{post_id}",
+                excerpt=post.get("excerpt"),
+                tags=post.get("tags", []),
+                category=post.get("category"),
+                author=post.get("author"),
+                created_at=_as_str(post.get("created_at")),
+            )
+        )
+    return results
+
+
+SEARCH_SOURCES: Dict[str, Callable[..., Awaitable[List[SearchResult]]]] = {
+    "docs": search_docs_source,
+    "blog": search_blog_source,
+    "forum": search_forum_source,
+}
+
+
+def _as_str(value) -> Optional[str]:
+    if value is None:
+        return None
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _parse_types(types: Optional[str]) -> List[str]:
+    if not types:
+        return list(SEARCH_SOURCES)
+    return [t.strip() for t in types.split(",") if t.strip() in SEARCH_SOURCES]
+
+
+async def _run_source(
+    source: str,
+    q: str,
+    limit: int,
+    version: Optional[str],
+    language: Optional[str],
+) -> Tuple[str, List[SearchResult]]:
+    try:
+        results = await SEARCH_SOURCES[source](
+            q, limit, version=version, language=language
+        )
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"Error searching {source}: {e}")
+        results = []
+
+    for result in results:
+        result.match_score = calculate_score(result, q)
+    return source, results
+
+
 @router.get("/", response_model=SearchResponse)
 async def unified_search(
     q: str = Query(..., description="검색어"),
     types: Optional[str] = Query(None, description="검색 타입 (docs,blog,forum)"),
-    limit: int = Query(20, description="결과 수 제한"),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_LIMIT, description="결과 수 제한"),
     version: Optional[str] = Query(None, description="문서 버전"),
     language: Optional[str] = Query(None, description="문서 언어"),
 ):
@@ -42,144 +219,19 @@ async def unified_search(
     start_time = datetime.now()
 
     try:
-        results = []
-        search_types = types.split(",") if types else ["docs", "blog", "forum"]
-
-        # 문서 검색
-        if "docs" in search_types:
-            try:
-                docs_collection = await docs.get_docs_collection()
-                docs_query = {
-                    "$or": [
-                        {"title": {"$regex": q, "$options": "i"}},
-                        {"content": {"$regex": q, "$options": "i"}},
-                        {"metadata.tags": {"$in": [{"$regex": q, "$options": "i"}]}},
-                    ]
-                }
-
-                if version:
-                    docs_query["version"] = version
-                if language:
-                    docs_query["language"] = language
-
-                docs_cursor = docs_collection.find(docs_query).limit(
-                    limit // len(search_types)
-                )
-                async for doc in docs_cursor:
-                    result = SearchResult(
-                        id=f"docs-{doc['_id']}",
-                        type="docs",
-                        title=doc.get("title", ""),
-                        content=doc.get("content", ""),
-                        url=f"/docs/{doc.get('version', 'v1')}/{doc.get('language', 'ko')}/{doc.get('slug', '')}",
-                        excerpt=doc.get("metadata", {}).get("description")
-                        or doc.get("excerpt"),
-                        tags=doc.get("tags", []),
-                        category=doc.get("metadata", {}).get("category"),
-                        created_at=doc.get("created_at"),
-                    )
-                    results.append(result)
-            except Exception as e:
-                print(f"Error searching docs: {e}")
-
-        # 블로그 검색
-        if "blog" in search_types:
-            try:
-                # Mock data에서 검색 (실제로는 DB 검색)
-                from .blog import mock_blog_posts
-
-                for post in mock_blog_posts:
-                    if (
-                        q.lower() in post["title"].lower()
-                        or q.lower() in post["content"].lower()
-                        or any(q.lower() in tag.lower() for tag in post.get("tags", []))
-                    ):
-
-                        result = SearchResult(
-                            id=f"blog-{post['id']}",
-                            type="blog",
-                            title=post["title"],
-                            content=post["content"],
-                            url=f"/blog/{post.get('slug', post['id'])}",
-                            excerpt=post.get("excerpt"),
-                            tags=post.get("tags", []),
-                            author=post.get("author"),
-                            created_at=post.get("created_at"),
-                        )
-                        results.append(result)
-
-                        if len(
-                            [r for r in results if r.type == "blog"]
-                        ) >= limit // len(search_types):
-                            break
-            except Exception as e:
-                print(f"Error searching blog: {e}")
-
-        # 포럼 검색
-        if "forum" in search_types:
-            try:
-                from .forum import mock_forum_posts
-
-                for post in mock_forum_posts:
-                    if (
-                        q.lower() in post["title"].lower()
-                        or q.lower() in post["content"].lower()
-                        or any(q.lower() in tag.lower() for tag in post.get("tags", []))
-                    ):
-
-                        result = SearchResult(
-                            id=f"forum-{post['id']}",
-                            type="forum",
-                            title=post["title"],
-                            content=post["content"],
-                            url=f"/forum/{post['id']}",
-                            excerpt=post.get("excerpt"),
-                            tags=post.get("tags", []),
-                            author=post.get("author"),
-                            created_at=post.get("created_at"),
-                        )
-                        results.append(result)
-
-                        if len(
-                            [r for r in results if r.type == "forum"]
-                        ) >= limit // len(search_types):
-                            break
-            except Exception as e:
-                print(f"Error searching forum: {e}")
-
-        # 관련도 순으로 정렬 (제목 매치가 높은 점수)
-        def calculate_score(result: SearchResult) -> float:
-            score = 0.0
-            q_lower = q.lower()
-
-            # 제목에서 정확한 매치
-            if q_lower == result.title.lower():
-                score += 100.0
-            elif q_lower in result.title.lower():
-                score += 50.0
-
-            # 태그 매치
-            if result.tags:
-                for tag in result.tags:
-                    if q_lower in tag.lower():
-                        score += 20.0
-
-            # 콘텐츠 매치
-            if q_lower in result.content.lower():
-                score += 10.0
-
-            # 타입별 가중치
-            if result.type == "docs":
-                score *= 1.2
-            elif result.type == "blog":
-                score *= 1.1
-
-            return score
-
-        # 점수 계산 및 정렬
-        for result in results:
-            result.match_score = calculate_score(result)
+        search_types = _parse_types(types)
+        per_source = max(1, limit // max(1, len(search_types)))
+
+        # 소스별 검색을 동시에 실행
+        source_results = await asyncio.gather(
+            *(
+                _run_source(source, q, per_source, version, language)
+                for source in search_types
+            )
+        )
+        results = [result for _, items in source_results for result in items]
 
+        # 점수순 정렬
         results.sort(key=lambda x: x.match_score or 0, reverse=True)
         results = results[:limit]
 
@@ -196,6 +248,128 @@ async def unified_search(
         )
 
 
+async def _stream_search(websocket: WebSocket, query_id: int, request: dict) -> None:
+    """소스별 검색이 끝나는 순서대로 결과 전송"""
+    start_time = datetime.now()
+    q = request["q"]
+    search_types = _parse_types(request.get("types"))
+    limit = request["limit"]
+    per_source = max(1, limit // max(1, len(search_types)))
+
+    tasks = [
+        asyncio.create_task(
+            _run_source(
+                source,
+                q,
+                per_source,
+                request.get("version"),
+                request.get("language"),
+            )
+        )
+        for source in search_types
+    ]
+
+    try:
+        total = 0
+        for next_done in asyncio.as_completed(tasks):
+            source, results = await next_done
+            results.sort(key=lambda x: x.match_score or 0, reverse=True)
+            total += len(results)
+            await websocket.send_json(
+                {
+                    "type": "results",
+                    "query_id": query_id,
+                    "query": q,
+                    "source": source,
+                    "results": [result.model_dump() for result in results],
+                }
+            )
+
+        took_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+        await websocket.send_json(
+            {
+                "type": "done",
+                "query_id": query_id,
+                "query": q,
+                "total": total,
+                "took_ms": took_ms,
+            }
+        )
+    except (asyncio.CancelledError, WebSocketDisconnect):
+        raise
+    except Exception as e:
+        # 백그라운드 작업의 오류도 클라이언트에 알림
+        await websocket.send_json(
+            {
+                "type": "error",
+                "query_id": query_id,
+                "query": q,
+                "detail": f"검색 중 오류가 발생했습니다: {str(e)}",
+            }
+        )
+    finally:
+        # 새 검색어로 취소된 경우 진행 중인 소스 검색도 함께 중단
+        for task in tasks:
+            task.cancel()
+
+
+@router.websocket("/ws")
+async def search_websocket(websocket: WebSocket):
+    """입력 중 검색 스트리밍 (새 검색어가 오면 이전 검색은 취소)
+
+    클라이언트 메시지: {"q": "검색어", "types": "docs,blog", "limit": 20,
+    "version": "v1", "language": "ko"} 또는 검색어 문자열
+    """
+    await websocket.accept()
+
+    current: Optional[asyncio.Task] = None
+    query_id = 0
+
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                request = json.loads(message)
+                if not isinstance(request, dict):
+                    request = {"q": str(request)}
+            except ValueError:
+                request = {"q": message}
+
+            if current is not None and not current.done():
+                current.cancel()
+
+            q = str(request.get("q") or "").strip()
+            if not q:
+                current = None
+                continue
+
+            query_id += 1
+            request["q"] = q
+
+            # HTTP 검색의 limit 검증(1 ~ MAX_SEARCH_LIMIT)과 같은 범위로 제한
+            try:
+                limit = int(request.get("limit") or 20)
+            except (TypeError, ValueError):
+                current = None
+                await websocket.send_json(
+                    {
+                        "type": "error",
+                        "query_id": query_id,
+                        "query": q,
+                        "detail": "limit은 정수여야 합니다.",
+                    }
+                )
+                continue
+            request["limit"] = min(max(limit, 1), MAX_SEARCH_LIMIT)
+            current = asyncio.create_task(_stream_search(websocket, query_id, request))
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if current is not None and not current.done():
+            current.cancel()
+
+
 @router.get("/suggestions")
 async def get_search_suggestions(
     q: str = Query(..., description="검색어"),
@@ -1,15 +1,55 @@
 import mimetypes
 import os
-import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
-
-import aiofiles
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
-
-from ..core.auth import get_current_user
-from ..core.database import database
+from typing import Dict, List, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    status,
+)
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
+from starlette.requests import ClientDisconnect
+
+from ..core.auth import get_current_user, require_admin
+from ..core.database import database, object_id_or_str
+from ..core.image_derivatives import (
+    DERIVATIVE_FORMATS,
+    DERIVATIVE_WIDTHS,
+    SOURCE_FORMATS,
+    image_derivatives,
+    snap_width,
+)
+from ..core.upload_sessions import (
+    append_chunk,
+    claim_completed,
+    create_session,
+    delete_session,
+    get_session,
+)
+from ..core.uploads import (
+    CONTENT_ADDRESSED_NAME,
+    StagedUpload,
+    acquire_blob,
+    blob_filename,
+    content_hash,
+    dedup_stats,
+    download_name,
+    release_blob,
+    serve_upload_file,
+    stream_upload,
+    too_large_error,
+    upload_metadata_cache,
+)
 
 router = APIRouter()
 
@@ -25,6 +65,14 @@ IMAGE_DIR.mkdir(exist_ok=True)
 FILE_DIR = UPLOAD_DIR / "files"
 FILE_DIR.mkdir(exist_ok=True)
 
+# 업로드 중인 임시 파일 디렉토리 (최종 위치로 rename 하도록 같은 파일시스템)
+TEMP_DIR = UPLOAD_DIR / "tmp"
+TEMP_DIR.mkdir(exist_ok=True)
+
+# 이어 올리기 세션의 임시 파일 디렉토리
+SESSION_DIR = TEMP_DIR / "sessions"
+SESSION_DIR.mkdir(exist_ok=True)
+
 # 허용되는 이미지 형식
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
 
@@ -47,55 +95,56 @@ MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 
 
-def generate_unique_filename(original_filename: str) -> str:
-    """고유한 파일명 생성"""
-    file_extension = Path(original_filename).suffix
-    unique_id = str(uuid.uuid4())
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f"{timestamp}_{unique_id}{file_extension}"
+# 업로드 종류별 저장 디렉토리와 오류 메시지용 이름
+UPLOAD_TYPES = {
+    "image": (IMAGE_DIR, "이미지"),
+    "file": (FILE_DIR, "파일"),
+}
 
 
-@router.post("/image")
-async def upload_image(
-    file: UploadFile = File(...), current_user: dict = Depends(get_current_user)
-):
-    """이미지 파일 업로드"""
+def resolve_file_type(content_type: Optional[str], filename: str) -> str:
+    """일반 파일 업로드 허용 형식 확인 (MIME 타입이 불확실하면 확장자로 추정)"""
+    if content_type in ALLOWED_FILE_TYPES:
+        return content_type
 
-    # 파일 타입 확인
-    content_type = file.content_type
-    if content_type not in ALLOWED_IMAGE_TYPES:
+    guessed_type, _ = mimetypes.guess_type(filename)
+    if guessed_type not in ALLOWED_FILE_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"지원하지 않는 이미지 형식입니다. 허용되는 형식: {', '.join(ALLOWED_IMAGE_TYPES)}",
+            detail="지원하지 않는 파일 형식입니다.",
         )
+    return guessed_type
 
-    # 파일 크기 확인
-    contents = await file.read()
-    if len(contents) > MAX_IMAGE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"이미지 파일 크기가 너무 큽니다. 최대 크기: {MAX_IMAGE_SIZE // (1024*1024)}MB",
-        )
 
-    try:
-        # 고유한 파일명 생성
-        filename = generate_unique_filename(file.filename)
-        file_path = IMAGE_DIR / filename
+async def save_upload(
+    staged: StagedUpload,
+    original_filename: str,
+    content_type: str,
+    upload_type: str,
+    current_user: dict,
+) -> dict:
+    """저장이 끝난 업로드를 blob으로 옮기고 업로드 기록 생성"""
+    directory, label = UPLOAD_TYPES[upload_type]
+    blob_id = None
 
-        # 파일 저장
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(contents)
+    try:
+        # 내용 해시 기반 파일명 (같은 내용은 파일 하나를 공유하고 참조 수만 증가)
+        filename = blob_filename(staged.sha256, original_filename)
+        file_path = directory / filename
+        blob_id = await acquire_blob(staged, directory, filename, content_type)
 
         # 데이터베이스에 파일 정보 저장
         uploads_collection = database.get_collection("uploads")
 
         upload_record = {
-            "original_filename": file.filename,
+            "original_filename": original_filename,
             "filename": filename,
             "file_path": str(file_path),
             "content_type": content_type,
-            "file_size": len(contents),
-            "upload_type": "image",
+            "file_size": staged.size,
+            "sha256": staged.sha256,
+            "blob_id": blob_id,
+            "upload_type": upload_type,
             "uploader_id": current_user["user_id"],
             "uploader_name": current_user["username"],
             "created_at": datetime.utcnow().isoformat(),
@@ -103,111 +152,210 @@ async def upload_image(
         }
 
         result = await uploads_collection.insert_one(upload_record)
+        upload_id = str(result.inserted_id)
+        upload_metadata_cache.set(upload_id, filename, original_filename, content_type)
 
-        # 웹에서 접근 가능한 URL 생성
-        file_url = f"/api/upload/serve/image/{filename}"
+        # 웹에서 접근 가능한 URL 생성 (파일은 공유 blob이므로 업로드 ID로 다운로드
+        # 파일명을 찾음)
+        file_url = f"/api/upload/serve/{upload_type}/{filename}"
+        if upload_type == "file":
+            file_url += f"?id={upload_id}"
 
         return {
             "success": True,
-            "file_id": str(result.inserted_id),
+            "file_id": upload_id,
             "filename": filename,
-            "original_filename": file.filename,
+            "original_filename": original_filename,
             "url": file_url,
-            "size": len(contents),
+            "size": staged.size,
             "content_type": content_type,
         }
 
     except Exception as e:
-        # 업로드 실패시 파일 삭제
-        if file_path.exists():
-            file_path.unlink()
+        # 업로드 실패시 임시 파일 삭제 및 blob 참조 해제
+        staged.discard()
+        if blob_id is not None:
+            await release_blob(blob_id)
 
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"이미지 업로드 실패: {str(e)}",
+            detail=f"{label} 업로드 실패: {str(e)}",
         )
 
 
-@router.post("/file")
-async def upload_file(
+@router.post("/image")
+async def upload_image(
     file: UploadFile = File(...), current_user: dict = Depends(get_current_user)
 ):
-    """일반 파일 업로드"""
+    """이미지 파일 업로드"""
 
     # 파일 타입 확인
     content_type = file.content_type
-    if content_type not in ALLOWED_FILE_TYPES:
-        # MIME 타입이 확실하지 않은 경우 파일 확장자로 다시 확인
-        guessed_type, _ = mimetypes.guess_type(file.filename)
-        if guessed_type not in ALLOWED_FILE_TYPES:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="지원하지 않는 파일 형식입니다.",
-            )
-        content_type = guessed_type
-
-    # 파일 크기 확인
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
+    if content_type not in ALLOWED_IMAGE_TYPES:
         raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"파일 크기가 너무 큽니다. 최대 크기: {MAX_FILE_SIZE // (1024*1024)}MB",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"지원하지 않는 이미지 형식입니다. 허용되는 형식: {', '.join(ALLOWED_IMAGE_TYPES)}",
         )
 
-    try:
-        # 고유한 파일명 생성
-        filename = generate_unique_filename(file.filename)
-        file_path = FILE_DIR / filename
+    # 청크 단위로 임시 파일에 저장 (크기 제한 초과 시 즉시 중단)
+    staged = await stream_upload(file, TEMP_DIR, MAX_IMAGE_SIZE, "이미지 파일")
+    return await save_upload(staged, file.filename, content_type, "image", current_user)
 
-        # 파일 저장
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(contents)
 
-        # 데이터베이스에 파일 정보 저장
-        uploads_collection = database.get_collection("uploads")
+@router.post("/file")
+async def upload_file(
+    file: UploadFile = File(...), current_user: dict = Depends(get_current_user)
+):
+    """일반 파일 업로드 (큰 파일은 `/sessions` 이어 올리기 사용 권장)"""
 
-        upload_record = {
-            "original_filename": file.filename,
-            "filename": filename,
-            "file_path": str(file_path),
-            "content_type": content_type,
-            "file_size": len(contents),
-            "upload_type": "file",
-            "uploader_id": current_user["user_id"],
-            "uploader_name": current_user["username"],
-            "created_at": datetime.utcnow().isoformat(),
-            "status": "active",
-        }
+    # 파일 타입 확인
+    content_type = resolve_file_type(file.content_type, file.filename)
 
-        result = await uploads_collection.insert_one(upload_record)
+    # 청크 단위로 임시 파일에 저장 (크기 제한 초과 시 즉시 중단)
+    staged = await stream_upload(file, TEMP_DIR, MAX_FILE_SIZE, "파일")
+    return await save_upload(staged, file.filename, content_type, "file", current_user)
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int = Field(..., ge=1, description="전체 파일 크기 (바이트)")
+    content_type: Optional[str] = None
+
+
+def session_headers(session: dict) -> dict:
+    return {
+        "Upload-Offset": str(session["offset"]),
+        "Upload-Length": str(session["length"]),
+        "Cache-Control": "no-store",
+    }
 
-        # 다운로드 URL 생성
-        file_url = f"/api/upload/serve/file/{filename}"
 
+@router.post("/sessions", status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    request: UploadSessionCreate, current_user: dict = Depends(get_current_user)
+):
+    """이어 올리기 업로드 세션 생성 (일반 파일)
+
+    이후 `PATCH /sessions/{id}`로 `Upload-Offset` 위치부터 청크를 보내고, 끊기면
+    `HEAD /sessions/{id}`로 받은 오프셋부터 이어서 보낸 뒤 `/complete`로 마무리한다.
+    """
+    content_type = resolve_file_type(request.content_type, request.filename)
+    if request.size > MAX_FILE_SIZE:
+        raise too_large_error("파일", MAX_FILE_SIZE)
+
+    try:
+        session = await create_session(
+            SESSION_DIR, request.filename, content_type, request.size, current_user
+        )
         return {
-            "success": True,
-            "file_id": str(result.inserted_id),
-            "filename": filename,
-            "original_filename": file.filename,
-            "url": file_url,
-            "size": len(contents),
-            "content_type": content_type,
+            "session_id": session["_id"],
+            "url": f"/api/upload/sessions/{session['_id']}",
+            "offset": 0,
+            "length": session["length"],
+            "expires_at": session["expires_at"].isoformat() + "Z",
         }
 
     except Exception as e:
-        # 업로드 실패시 파일 삭제
-        if file_path.exists():
-            file_path.unlink()
-
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"파일 업로드 실패: {str(e)}",
+            detail=f"업로드 세션 생성 실패: {str(e)}",
+        )
+
+
+@router.head("/sessions/{session_id}")
+async def get_upload_session_offset(
+    session_id: str, current_user: dict = Depends(get_current_user)
+):
+    """업로드 진행 위치 조회 (`Upload-Offset` 헤더)"""
+    session = await get_session(session_id, current_user)
+    return Response(status_code=status.HTTP_200_OK, headers=session_headers(session))
+
+
+@router.patch("/sessions/{session_id}")
+async def append_upload_session(
+    session_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    current_user: dict = Depends(get_current_user),
+):
+    """`Upload-Offset` 위치부터 요청 본문을 이어 쓰기 (본문은 원시 바이트)"""
+    session = await get_session(session_id, current_user)
+
+    # 선언한 크기를 넘는 청크는 본문을 받기 전에 거절
+    content_length = request.headers.get("content-length")
+    try:
+        chunk_length = int(content_length) if content_length else 0
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Content-Length가 올바르지 않습니다.",
+        )
+    if chunk_length > session["length"] - upload_offset:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="선언한 파일 크기를 초과했습니다.",
+        )
+
+    try:
+        offset = await append_chunk(session, upload_offset, request.stream())
+    except ClientDisconnect:
+        # 받은 만큼은 저장되어 있으므로 클라이언트가 HEAD 후 이어서 보냄
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="업로드 연결이 끊겼습니다.",
         )
 
+    session["offset"] = offset
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT, headers=session_headers(session)
+    )
+
+
+@router.post("/sessions/{session_id}/complete")
+async def complete_upload_session(
+    session_id: str, current_user: dict = Depends(get_current_user)
+):
+    """전송이 끝난 세션을 일반 업로드로 등록"""
+    session = await get_session(session_id, current_user)
+    if session["offset"] != session["length"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"업로드가 끝나지 않았습니다. ({session['offset']}/{session['length']})",
+        )
+
+    completed = await claim_completed(session_id, current_user["user_id"])
+    if completed is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="이미 완료되었거나 다른 요청이 처리 중인 세션입니다.",
+        )
+
+    session, staged = completed
+    return await save_upload(
+        staged, session["filename"], session["content_type"], "file", current_user
+    )
+
+
+@router.delete("/sessions/{session_id}")
+async def cancel_upload_session(
+    session_id: str, current_user: dict = Depends(get_current_user)
+):
+    """업로드 세션 취소 (임시 파일 삭제)"""
+    session = await get_session(session_id, current_user)
+    await delete_session(session)
+    return {"message": "업로드 세션이 취소되었습니다."}
+
 
 @router.get("/serve/image/{filename}")
-async def serve_image(filename: str):
-    """이미지 파일 서빙"""
+async def serve_image(
+    filename: str,
+    w: Optional[int] = Query(
+        None, ge=1, description="최대 너비 (허용 너비 중 가장 가까운 큰 값으로 맞춤)"
+    ),
+    fmt: Optional[str] = Query(None, description="출력 형식: webp, avif, jpeg, png"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """이미지 파일 서빙 (ETag/304, Range, `?w=&fmt=` 리사이즈/형식 변환 지원)"""
     file_path = IMAGE_DIR / filename
 
     if not file_path.exists():
@@ -215,61 +363,119 @@ async def serve_image(filename: str):
             status_code=status.HTTP_404_NOT_FOUND, detail="이미지를 찾을 수 없습니다."
         )
 
+    if fmt is not None and fmt not in DERIVATIVE_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"지원하지 않는 출력 형식입니다. 허용되는 형식: {', '.join(DERIVATIVE_FORMATS)}",
+        )
+
+    # 파생 이미지 (애니메이션 GIF 등 변환 대상이 아니면 원본 사용)
+    source_format = SOURCE_FORMATS.get(file_path.suffix.lower())
+    if (w is not None or fmt is not None) and source_format:
+        width = snap_width(w or DERIVATIVE_WIDTHS[-1])
+        output_format = fmt or source_format
+        source_hash = content_hash(filename)
+        derivative = await image_derivatives.get(
+            file_path, source_hash, width, output_format
+        )
+        if derivative is not None:
+            try:
+                return serve_upload_file(
+                    derivative,
+                    DERIVATIVE_FORMATS[output_format],
+                    if_none_match,
+                    etag=(
+                        f'"{source_hash}-w{width}-{output_format}"'
+                        if source_hash
+                        else None
+                    ),
+                    immutable=source_hash is not None,
+                )
+            except FileNotFoundError:
+                # 캐시에서 밀려나 지워진 경우 원본으로 응답
+                pass
+
     # MIME 타입 추정
     content_type, _ = mimetypes.guess_type(str(file_path))
     if not content_type:
         content_type = "application/octet-stream"
 
-    from fastapi.responses import FileResponse
+    return serve_upload_file(file_path, content_type, if_none_match)
 
-    return FileResponse(
-        path=file_path,
-        media_type=content_type,
-        headers={"Cache-Control": "public, max-age=3600"},  # 1시간 캐시
-    )
 
+async def load_download_metadata(
+    filename: str, upload_id: Optional[str]
+) -> Optional[Dict[str, str]]:
+    """다운로드 파일명/MIME 타입 (업로드 ID → 메모리 캐시 → 데이터베이스)
 
-@router.get("/serve/file/{filename}")
-async def serve_file(filename: str):
-    """일반 파일 서빙 (다운로드)"""
-    file_path = FILE_DIR / filename
+    ID가 없으면 저장 파일명으로 찾되, 여러 업로드가 공유하는 내용 주소 파일은
+    누구의 파일명인지 알 수 없으므로 찾지 않는다.
+    """
+    if upload_id:
+        metadata = upload_metadata_cache.get(upload_id)
+        if metadata is not None:
+            return metadata if metadata["filename"] == filename else None
+        query = {"_id": object_id_or_str(upload_id), "filename": filename}
+    elif CONTENT_ADDRESSED_NAME.match(filename):
+        return None
+    else:
+        query = {"filename": filename}
 
-    if not file_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="파일을 찾을 수 없습니다."
-        )
-
-    # 데이터베이스에서 원본 파일명 조회
     try:
-        uploads_collection = database.get_collection("uploads")
-        upload_record = await uploads_collection.find_one({"filename": filename})
-
-        original_filename = (
-            upload_record["original_filename"] if upload_record else filename
+        upload_record = await database.get_collection("uploads").find_one(
+            {**query, "status": "active"},
+            {"filename": 1, "original_filename": 1, "content_type": 1},
         )
+    except Exception as e:
+        print(f"⚠️ Upload metadata lookup failed ({filename}): {e}")
+        return None
+    if not upload_record:
+        return None
 
-        # MIME 타입 추정
-        content_type, _ = mimetypes.guess_type(str(file_path))
-        if not content_type:
-            content_type = "application/octet-stream"
+    metadata = {
+        "filename": upload_record["filename"],
+        "original_filename": upload_record["original_filename"],
+        "content_type": upload_record.get("content_type"),
+    }
+    if upload_id:
+        upload_metadata_cache.set(upload_id, **metadata)
+    return metadata
 
-        from fastapi.responses import FileResponse
 
-        return FileResponse(
-            path=file_path,
-            media_type=content_type,
-            filename=original_filename,
-            headers={
-                "Content-Disposition": f"attachment; filename={original_filename}"
-            },
+@router.get("/serve/file/{filename}")
+async def serve_file(
+    filename: str,
+    upload_id: Optional[str] = Query(
+        None, alias="id", description="업로드 ID (업로드 응답 URL에 포함)"
+    ),
+    if_none_match: Optional[str] = Header(None),
+):
+    """일반 파일 서빙 (다운로드, ETag/304, Range 지원)"""
+    file_path = FILE_DIR / filename
+
+    if not file_path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="파일을 찾을 수 없습니다."
         )
 
-    except Exception:  # noqa: F841
-        from fastapi.responses import FileResponse
+    # MIME 타입 추정
+    content_type, _ = mimetypes.guess_type(str(file_path))
+    if not content_type:
+        content_type = "application/octet-stream"
 
-        return FileResponse(
-            path=file_path, media_type="application/octet-stream", filename=filename
-        )
+    original_filename = ""
+    metadata = await load_download_metadata(filename, upload_id)
+    if metadata:
+        original_filename = download_name(metadata["original_filename"])
+        content_type = metadata["content_type"] or content_type
+
+    # 비ASCII 파일명은 FileResponse가 RFC 5987(filename*=) 형식으로 인코딩
+    return serve_upload_file(
+        file_path,
+        content_type,
+        if_none_match,
+        filename=original_filename or filename,
+    )
 
 
 @router.get("/list")
@@ -310,6 +516,19 @@ async def list_user_uploads(
         )
 
 
+@router.get("/stats/dedup")
+async def get_dedup_stats(current_user: dict = Depends(require_admin)):
+    """중복 제거 저장 효과 조회 (관리자 전용)"""
+    try:
+        return await dedup_stats()
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"저장 용량 통계 조회 실패: {str(e)}",
+        )
+
+
 @router.delete("/{file_id}")
 async def delete_upload(file_id: str, current_user: dict = Depends(get_current_user)):
     """업로드된 파일 삭제"""
@@ -317,7 +536,9 @@ async def delete_upload(file_id: str, current_user: dict = Depends(get_current_u
         uploads_collection = database.get_collection("uploads")
 
         # 파일 정보 조회
-        upload_record = await uploads_collection.find_one({"_id": file_id})
+        upload_record = await uploads_collection.find_one(
+            {"_id": object_id_or_str(file_id), "status": "active"}
+        )
 
         if not upload_record:
             raise HTTPException(
@@ -334,14 +555,11 @@ async def delete_upload(file_id: str, current_user: dict = Depends(get_current_u
                 detail="파일 삭제 권한이 없습니다.",
             )
 
-        # 물리적 파일 삭제
-        file_path = Path(upload_record["file_path"])
-        if file_path.exists():
-            file_path.unlink()
+        upload_metadata_cache.invalidate(str(upload_record["_id"]))
 
-        # 데이터베이스에서 soft delete
-        await uploads_collection.update_one(
-            {"_id": file_id},
+        # 데이터베이스에서 soft delete (동시 삭제 요청은 한 번만 처리)
+        result = await uploads_collection.update_one(
+            {"_id": upload_record["_id"], "status": "active"},
             {
                 "$set": {
                     "status": "deleted",
@@ -350,6 +568,13 @@ async def delete_upload(file_id: str, current_user: dict = Depends(get_current_u
             },
         )
 
+        # 물리적 파일 삭제 (공유 blob은 마지막 참조가 사라질 때만)
+        if result.modified_count:
+            if upload_record.get("blob_id"):
+                await release_blob(upload_record["blob_id"])
+            else:
+                Path(upload_record["file_path"]).unlink(missing_ok=True)
+
         return {"message": "파일이 삭제되었습니다."}
 
     except HTTPException:
@@ -0,0 +1,209 @@
+"""테스트용 인메모리 Motor 컬렉션 대역
+
+동시성 테스트를 위해 모든 연산은 요청 전송과 응답 수신(실제 DB 왕복)에 해당하는
+시점에 이벤트 루프에 제어를 넘겨 다른 코루틴이 끼어들 수 있게 하고, 연산 자체는
+문서 단위로 원자적이다.
+테스트에서 쓰는 필터/업데이트 연산자만 지원한다.
+"""
+
+import asyncio
+import copy
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+
+def _get(doc: Dict[str, Any], path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(doc, sub) for sub in condition):
+                return False
+            continue
+        value = _get(doc, key)
+        if (
+            isinstance(condition, dict)
+            and condition
+            and all(op.startswith("$") for op in condition)
+        ):
+            for op, operand in condition.items():
+                if op == "$gt" and not (value is not None and value > operand):
+                    return False
+                if op == "$gte" and not (value is not None and value >= operand):
+                    return False
+                if op == "$lt" and not (value is not None and value < operand):
+                    return False
+                if op == "$lte" and not (value is not None and value <= operand):
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _evaluate(doc: Dict[str, Any], expression: Any) -> Any:
+    """파이프라인 업데이트에서 쓰는 집계 표현식 일부"""
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _get(doc, expression[1:])
+    if isinstance(expression, dict) and len(expression) == 1:
+        op, args = next(iter(expression.items()))
+        if op == "$cond":
+            condition, then, otherwise = args
+            return _evaluate(doc, then if _evaluate(doc, condition) else otherwise)
+        if op == "$eq":
+            return _evaluate(doc, args[0]) == _evaluate(doc, args[1])
+        if op == "$ifNull":
+            value = _evaluate(doc, args[0])
+            return _evaluate(doc, args[1]) if value is None else value
+        if op == "$add":
+            return sum(_evaluate(doc, arg) for arg in args)
+    return expression
+
+
+def _apply_update(doc: Dict[str, Any], update: Any, inserted: bool) -> None:
+    if isinstance(update, list):
+        for stage in update:
+            values = {
+                key: _evaluate(doc, value) for key, value in stage["$set"].items()
+            }
+            doc.update(values)
+        return
+    for key, value in update.get("$set", {}).items():
+        doc[key] = value
+    for key, delta in update.get("$inc", {}).items():
+        doc[key] = doc.get(key, 0) + delta
+    if inserted:
+        for key, value in update.get("$setOnInsert", {}).items():
+            doc[key] = value
+
+
+def _project(doc: Optional[Dict[str, Any]], projection: Any) -> Optional[Dict]:
+    if doc is None:
+        return None
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    return {
+        key: value for key, value in doc.items() if key == "_id" or projection.get(key)
+    }
+
+
+class FakeCollection:
+    def __init__(self, unique: Optional[List[str]] = None):
+        self.docs: List[Dict[str, Any]] = []
+        self.unique = unique or []
+
+    def _find(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return next((doc for doc in self.docs if _matches(doc, query)), None)
+
+    def _check_unique(self, doc: Dict[str, Any]) -> None:
+        if not self.unique:
+            return
+        key = [doc.get(field) for field in self.unique]
+        for other in self.docs:
+            if other is not doc and [other.get(f) for f in self.unique] == key:
+                raise DuplicateKeyError("duplicate key")
+
+    async def _round_trip(self, operation, *args, **kwargs):
+        """요청 전송과 응답 수신 사이에 다른 코루틴이 실행될 수 있게 함"""
+        await asyncio.sleep(0)
+        try:
+            return operation(*args, **kwargs)
+        finally:
+            await asyncio.sleep(0)
+
+    def _insert_one(self, doc: Dict[str, Any]):
+        doc = copy.deepcopy(doc)
+        doc.setdefault("_id", ObjectId())
+        if self._find({"_id": doc["_id"]}) is not None:
+            raise DuplicateKeyError("duplicate key")
+        self._check_unique(doc)
+        self.docs.append(doc)
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    def _find_one_and_update(
+        self, query, update, projection, upsert, return_document
+    ) -> Optional[Dict[str, Any]]:
+        doc = self._find(query)
+        if doc is None:
+            if not upsert:
+                return None
+            doc = {
+                key: value
+                for key, value in query.items()
+                if not key.startswith("$") and not isinstance(value, dict)
+            }
+            doc.setdefault("_id", ObjectId())
+            _apply_update(doc, update, inserted=True)
+            self._check_unique(doc)
+            self.docs.append(doc)
+            if return_document == ReturnDocument.AFTER:
+                return _project(doc, projection)
+            return None
+
+        before = copy.deepcopy(doc)
+        _apply_update(doc, update, inserted=False)
+        after = doc if return_document == ReturnDocument.AFTER else before
+        return _project(after, projection)
+
+    def _delete_one(self, query):
+        doc = self._find(query)
+        if doc is not None:
+            self.docs.remove(doc)
+        return SimpleNamespace(deleted_count=int(doc is not None))
+
+    async def insert_one(self, doc: Dict[str, Any]):
+        return await self._round_trip(self._insert_one, doc)
+
+    async def find_one(self, query=None, projection=None):
+        return await self._round_trip(
+            lambda: _project(self._find(query or {}), projection)
+        )
+
+    async def find_one_and_update(
+        self,
+        query,
+        update,
+        projection=None,
+        upsert=False,
+        return_document=ReturnDocument.BEFORE,
+    ):
+        return await self._round_trip(
+            self._find_one_and_update,
+            query,
+            update,
+            projection,
+            upsert,
+            return_document,
+        )
+
+    async def update_one(self, query, update, upsert=False):
+        result = await self.find_one_and_update(
+            query, update, upsert=upsert, return_document=ReturnDocument.AFTER
+        )
+        return SimpleNamespace(matched_count=int(result is not None))
+
+    async def delete_one(self, query):
+        return await self._round_trip(self._delete_one, query)
+
+
+class FakeDatabase:
+    def __init__(self, **collections: FakeCollection):
+        self.collections = collections
+
+    def get_collection(self, name: str) -> FakeCollection:
+        return self.collections.setdefault(name, FakeCollection())
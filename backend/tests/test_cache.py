@@ -0,0 +1,21 @@
+from app.core.cache import ResponseCache
+
+
+def test_response_built_before_bump_is_not_cached():
+    cache = ResponseCache(max_entries=10, ttl_seconds=60)
+    version = cache.version("forum_posts")
+    assert cache.get("forum_posts", ("page", 1)) is None
+
+    # 응답을 만드는 사이 쓰기가 일어남
+    cache.bump("forum_posts")
+    cache.set("forum_posts", ("page", 1), b"stale", version)
+
+    assert cache.get("forum_posts", ("page", 1)) is None
+
+
+def test_response_is_cached_under_current_version():
+    cache = ResponseCache(max_entries=10, ttl_seconds=60)
+    version = cache.version("forum_posts")
+    cache.set("forum_posts", ("page", 1), b"fresh", version)
+
+    assert cache.get("forum_posts", ("page", 1)) == b"fresh"
@@ -0,0 +1,72 @@
+import asyncio
+import random
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.routers import forum
+
+from .fakes import FakeCollection, FakeDatabase
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake = FakeDatabase(
+        forum_votes=FakeCollection(unique=["post_id", "user_id", "type"]),
+        forum_replies=FakeCollection(),
+    )
+    monkeypatch.setattr(forum, "database", fake)
+    monkeypatch.setattr(forum.forum_events, "publish_reply_stats", lambda reply: None)
+    return fake
+
+
+def vote(reply_id, user_id: str, vote_type: str):
+    return forum.apply_vote(
+        "forum_replies", str(reply_id), "reply", vote_type, user_id, "Reply not found"
+    )
+
+
+async def test_concurrent_votes_keep_counters_consistent(fake_db):
+    reply_id = ObjectId()
+    fake_db.collections["forum_replies"].docs.append(
+        {"_id": reply_id, "likes": 0, "dislikes": 0}
+    )
+    rng = random.Random(42)
+    users = [f"user-{i}" for i in range(20)]
+
+    await asyncio.gather(
+        *(
+            vote(reply_id, rng.choice(users), rng.choice(["like", "dislike"]))
+            for _ in range(500)
+        )
+    )
+
+    votes = fake_db.collections["forum_votes"].docs
+    reply = fake_db.collections["forum_replies"].docs[0]
+    assert len(votes) == len({vote["user_id"] for vote in votes})
+    assert reply["likes"] == sum(v["vote_type"] == "like" for v in votes)
+    assert reply["dislikes"] == sum(v["vote_type"] == "dislike" for v in votes)
+
+
+async def test_vote_on_missing_target_leaves_no_vote(fake_db):
+    with pytest.raises(HTTPException) as exc_info:
+        await vote(ObjectId(), "user-1", "like")
+
+    assert exc_info.value.status_code == 404
+    assert fake_db.collections["forum_votes"].docs == []
+
+
+async def test_vote_on_deleted_target_restores_previous_vote(fake_db):
+    reply_id = ObjectId()
+    fake_db.collections["forum_replies"].docs.append(
+        {"_id": reply_id, "likes": 0, "dislikes": 0}
+    )
+    await vote(reply_id, "user-1", "like")
+    fake_db.collections["forum_replies"].docs[0]["status"] = "deleted"
+
+    with pytest.raises(HTTPException):
+        await vote(reply_id, "user-1", "dislike")
+
+    [stored] = fake_db.collections["forum_votes"].docs
+    assert stored["vote_type"] == "like"
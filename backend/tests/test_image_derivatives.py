@@ -0,0 +1,19 @@
+from app.core import image_derivatives
+from app.core.image_derivatives import ImageDerivativeCache
+
+
+def test_recently_used_derivative_is_not_evicted(tmp_path, monkeypatch):
+    cache = ImageDerivativeCache(tmp_path)
+    cache.max_bytes = 100
+    for name in ("old.webp", "new.webp"):
+        (tmp_path / name).write_bytes(b"x" * 60)
+
+    cache._add("old.webp", 60)
+    cache._add("new.webp", 60)
+    # 한도를 넘었지만 두 항목 모두 방금 내준 파일이므로 지우지 않음
+    assert (tmp_path / "old.webp").exists()
+
+    monkeypatch.setattr(image_derivatives, "EVICTION_GRACE_SECONDS", -1)
+    cache._evict()
+    assert not (tmp_path / "old.webp").exists()
+    assert cache.stats()["bytes"] == 60
@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from app.core import uploads
+from app.core.uploads import StagedUpload, acquire_blob, release_blob
+
+from .fakes import FakeCollection, FakeDatabase
+
+CONTENT = b"same content"
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+class PausedReleaseCollection(FakeCollection):
+    """`release_blob`이 마지막 참조를 줄인 직후(파일 삭제 전) 멈추는 컬렉션"""
+
+    def __init__(self):
+        super().__init__()
+        self.paused = asyncio.Event()
+        self.resume = asyncio.Event()
+        self.tombstone_seen = asyncio.Event()
+
+    async def find_one_and_update(self, query, update, *args, **kwargs):
+        result = await super().find_one_and_update(query, update, *args, **kwargs)
+        if "released_at" in update.get("$set", {}) and not self.resume.is_set():
+            self.paused.set()
+            await self.resume.wait()
+        return result
+
+    async def delete_one(self, query):
+        if "$or" in query:
+            # acquire_blob이 삭제 표시와 부딪혀 오래된 표시 정리를 시도함
+            self.tombstone_seen.set()
+        return await super().delete_one(query)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake = FakeDatabase(upload_blobs=FakeCollection())
+    monkeypatch.setattr(uploads, "database", fake)
+    monkeypatch.setattr(uploads, "BLOB_RETRY_DELAY", 0)
+    return fake
+
+
+def stage(tmp_path, name: str) -> StagedUpload:
+    temp = tmp_path / "temp"
+    temp.mkdir(exist_ok=True)
+    path = temp / name
+    path.write_bytes(CONTENT)
+    return StagedUpload(path, len(CONTENT), SHA256)
+
+
+async def test_acquire_during_release_recreates_blob(fake_db, tmp_path):
+    blobs = fake_db.collections["upload_blobs"] = PausedReleaseCollection()
+    directory = tmp_path / "files"
+    directory.mkdir()
+    filename = uploads.blob_filename(SHA256, "a.txt")
+
+    blob_id = await acquire_blob(
+        stage(tmp_path, "first"), directory, filename, "text/plain"
+    )
+    release = asyncio.create_task(release_blob(blob_id))
+    await blobs.paused.wait()
+
+    # refcount가 0이 되었지만 파일과 문서가 아직 남은 상태에서 같은 내용을 업로드
+    acquire = asyncio.create_task(
+        acquire_blob(stage(tmp_path, "second"), directory, filename, "text/plain")
+    )
+    await asyncio.wait_for(blobs.tombstone_seen.wait(), timeout=1)
+    assert not acquire.done()
+
+    blobs.resume.set()
+    assert await release
+    assert await acquire == blob_id
+
+    assert [(blob["_id"], blob["refcount"]) for blob in blobs.docs] == [(blob_id, 1)]
+    assert (directory / filename).read_bytes() == CONTENT
+
+
+async def test_last_release_removes_file(fake_db, tmp_path):
+    directory = tmp_path / "files"
+    directory.mkdir()
+    filename = uploads.blob_filename(SHA256, "a.txt")
+
+    first = await acquire_blob(
+        stage(tmp_path, "first"), directory, filename, "text/plain"
+    )
+    second = await acquire_blob(
+        stage(tmp_path, "second"), directory, filename, "text/plain"
+    )
+    assert not await release_blob(first)
+    assert (directory / filename).exists()
+    assert await release_blob(second)
+
+    assert fake_db.collections["upload_blobs"].docs == []
+    assert not (directory / filename).exists()
+    assert not any((tmp_path / "temp").iterdir())
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import upload_sessions
+from app.core.upload_sessions import append_chunk, create_session
+
+from .fakes import FakeCollection, FakeDatabase
+
+USER = {"user_id": "user-1", "username": "user"}
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake = FakeDatabase(upload_sessions=FakeCollection())
+    monkeypatch.setattr(upload_sessions, "database", fake)
+    monkeypatch.setattr(upload_sessions, "WRITE_LEASE_SECONDS", 0.03)
+    return fake
+
+
+async def chunks(*parts: bytes, pause: float = 0):
+    for index, part in enumerate(parts):
+        if index and pause:
+            await asyncio.sleep(pause)
+        yield part
+
+
+async def test_writer_that_lost_its_lease_stops_writing(fake_db, tmp_path):
+    session = await create_session(tmp_path, "a.bin", "text/plain", 100, USER)
+    stalled = asyncio.create_task(
+        append_chunk(session, 0, chunks(b"a" * 10, b"b" * 10, pause=0.05))
+    )
+    # 첫 요청이 멈춘 사이 점유가 만료되어 같은 오프셋의 재시도가 점유를 가져감
+    await asyncio.sleep(0.04)
+    offset = await append_chunk(session, 0, chunks(b"c" * 20))
+    with pytest.raises(HTTPException) as exc_info:
+        await stalled
+
+    assert offset == 20
+    assert exc_info.value.status_code == 409
+    assert fake_db.collections["upload_sessions"].docs[0]["offset"] == 20
+    assert (tmp_path / f"{session['_id']}.part").read_bytes() == b"c" * 20
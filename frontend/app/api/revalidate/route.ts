@@ -50,6 +50,16 @@ export async function POST(request: NextRequest) {
         await revalidatePath('/docs', 'layout')
         break
         
+      case 'blog-published':
+        // 예약 발행된 블로그 글 (slug 자리에 게시물 ID 전달)
+        if (slug) {
+          await revalidateTag(`blog-${slug}`)
+          await revalidatePath(`/blog/${slug}`)
+        }
+        await revalidateTag('blog-posts')
+        await revalidatePath('/blog')
+        break
+
       case 'bulk-update':
         // 전체 문서 시스템 갱신
         await revalidateTag('documents')